@@ -0,0 +1,123 @@
+"""
+Throughput of charts shared by several threads.
+
+    python benchmarks/threads.py [--counts 1000] [--seconds 2]
+
+Each scenario runs with 1, 2, 4 and 8 threads that share one chart and reports the number of
+operations per second:
+
+    xmr       each thread computes `to_dict()` of a shared XmR
+    window    each thread appends to a shared Window and reads `snapshot().to_dict()`
+    streaming each thread updates a shared Streaming and reads `to_dict()`
+
+Reads of a shared chart don't take locks, so on a free-threaded build of Python (3.13t) the
+throughput of `xmr` scales with the number of cores, and that of `window` up to the rate of
+appends.  Updates of `streaming` are serialized.  With the GIL the threads take turns.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+from statprocon import XmR
+from statprocon.charts.xmr.streaming import Streaming
+from statprocon.charts.xmr.window import Window
+
+THREADS = (1, 2, 4, 8)
+
+
+def run(threads: int, seconds: float, target) -> int:
+    """
+    Runs target(index, stop) in each thread and returns the total number of operations
+    """
+    stop = threading.Event()
+    totals = [0] * threads
+
+    def work(index: int):
+        totals[index] = target(index, stop)
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    time.sleep(seconds)
+    stop.set()
+    for w in workers:
+        w.join()
+    return sum(totals)
+
+
+def shared_xmr(counts):
+    xmr = XmR(counts)
+
+    def target(index, stop):
+        n = 0
+        while not stop.is_set():
+            xmr.to_dict()
+            n += 1
+        return n
+    return target
+
+
+def shared_window(counts):
+    window = Window(len(counts), counts)
+
+    def target(index, stop):
+        r = random.Random(index)
+        n = 0
+        while not stop.is_set():
+            window.append(round(r.uniform(0, 100), 2))
+            window.snapshot().to_dict()
+            n += 1
+        return n
+    return target
+
+
+def shared_streaming(counts):
+    stream = Streaming()
+    stream.extend(counts)
+
+    def target(index, stop):
+        r = random.Random(index)
+        n = 0
+        while not stop.is_set():
+            stream.update(round(r.uniform(0, 100), 2))
+            stream.to_dict()
+            n += 1
+        return n
+    return target
+
+
+SCENARIOS = {
+    'xmr': shared_xmr,
+    'window': shared_window,
+    'streaming': shared_streaming,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1].strip())
+    parser.add_argument('--counts', type=int, default=1000, help='Number of counts of each chart')
+    parser.add_argument('--seconds', type=float, default=2, help='Duration of each run')
+    parser.add_argument('scenarios', nargs='*', help=f'Scenarios to run: {", ".join(SCENARIOS)} (default all)')
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f'unknown scenario {name}')
+
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'Python {sys.version.split()[0]}, GIL {"enabled" if is_gil_enabled else "disabled"}, {os.cpu_count()} CPUs')
+
+    r = random.Random(0)
+    counts = [round(r.uniform(0, 100), 2) for _ in range(args.counts)]
+    for name in args.scenarios or SCENARIOS:
+        baseline = None
+        for threads in THREADS:
+            rate = run(threads, args.seconds, SCENARIOS[name](counts)) / args.seconds
+            baseline = baseline or rate
+            print(f'{name:<10} {threads} threads {rate:>12,.0f} ops/s {rate / baseline:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,4 @@
 from .charts.xmr.base import Base as XmR
 from .charts.xmr.limits.trending import Trending as XmRTrending
+from .charts.xbar.r import XbarR
+from .charts.xbar.s import XbarS
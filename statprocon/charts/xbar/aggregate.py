@@ -0,0 +1,177 @@
+import math
+
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..xmr.types import TYPE_NUMERIC
+
+
+class Subgroup:
+    """
+    Summary statistics of a subgroup of readings.
+    Readings are added one at a time so the subgroup never stores them.
+    Each reading is scaled to an integer by a power of ten, so the sum, sum of squares, minimum
+    and maximum are exact integers and the averages, ranges and standard deviations are the same
+    as those computed from the readings, without creating a Decimal for each reading.
+    """
+    __slots__ = ('n', 'exponent', '_sum', '_squares', '_minimum', '_maximum', 'label')
+
+    def __init__(self, label: Any = None):
+        self.n = 0
+        # The readings are added as integers times 10 ** exponent
+        self.exponent = 0
+        self._sum = 0
+        self._squares = 0
+        self._minimum = 0
+        self._maximum = 0
+        self.label = label
+
+    def add(self, x: TYPE_NUMERIC):
+        coefficient, exponent = _scaled(x)
+        if exponent < self.exponent:
+            scale = 10 ** (self.exponent - exponent)
+            self._sum *= scale
+            self._squares *= scale * scale
+            self._minimum *= scale
+            self._maximum *= scale
+            self.exponent = exponent
+        elif exponent > self.exponent:
+            coefficient *= 10 ** (exponent - self.exponent)
+
+        if not self.n:
+            self._minimum = self._maximum = coefficient
+        elif coefficient < self._minimum:
+            self._minimum = coefficient
+        elif coefficient > self._maximum:
+            self._maximum = coefficient
+        self.n += 1
+        self._sum += coefficient
+        self._squares += coefficient * coefficient
+
+    @property
+    def total(self) -> Decimal:
+        return Decimal(self._sum).scaleb(self.exponent)
+
+    @property
+    def minimum(self) -> Decimal:
+        return Decimal(self._minimum).scaleb(self.exponent)
+
+    @property
+    def maximum(self) -> Decimal:
+        return Decimal(self._maximum).scaleb(self.exponent)
+
+    @property
+    def mean(self) -> Decimal:
+        if not self.n:
+            return Decimal('0')
+        return (Decimal(self._sum) / self.n).scaleb(self.exponent)
+
+    @property
+    def range(self) -> Decimal:
+        return Decimal(self._maximum - self._minimum).scaleb(self.exponent)
+
+    @property
+    def standard_deviation(self) -> Decimal:
+        """
+        Sample standard deviation of the readings, from the exact
+        (n * sum of squares - sum ** 2) / (n * (n - 1))
+        """
+        n = self.n
+        variance = Decimal(n * self._squares - self._sum * self._sum) / (n * (n - 1))
+        return variance.sqrt().scaleb(self.exponent)
+
+    @classmethod
+    def from_values(cls, values: Iterable[TYPE_NUMERIC], label: Any = None) -> 'Subgroup':
+        result = cls(label)
+        for x in values:
+            result.add(x)
+        return result
+
+    def __repr__(self) -> str:
+        return f'Subgroup(n={self.n}, mean={self.mean}, range={self.range})'
+
+
+def subgroups_by_size(
+        readings: Iterable[TYPE_NUMERIC],
+        size: int,
+        include_partial: bool = False,
+) -> Iterator[Subgroup]:
+    """
+    Aggregates successive readings into subgroups of `size` readings in a single pass.
+    The label of each subgroup is the index of its first reading.
+
+    :param include_partial: If True, the last subgroup is included when it has fewer than
+        `size` readings
+    """
+    assert size >= 2
+
+    current = Subgroup(0)
+    for i, x in enumerate(readings):
+        current.add(x)
+        if current.n == size:
+            yield current
+            current = Subgroup(i + 1)
+
+    if include_partial and current.n:
+        yield current
+
+
+def subgroups_by_time(
+        readings: Iterable[Tuple[Any, TYPE_NUMERIC]],
+        width: Any,
+        origin: Optional[Any] = None,
+) -> Iterator[Subgroup]:
+    """
+    Aggregates (timestamp, reading) pairs into subgroups of readings in the same time bucket
+    in a single pass.  Readings must be in time order.  Buckets without readings are skipped.
+    The label of each subgroup is the start of its bucket.
+
+    Timestamps can be numbers with a numeric `width` or datetimes with a timedelta `width`.
+
+    :param origin: Start of the first bucket.  Defaults to the first timestamp
+    """
+    current: Optional[Subgroup] = None
+    bucket = 0
+    for t, x in readings:
+        if origin is None:
+            origin = t
+
+        b = math.floor((t - origin) / width)
+        if current is None or b != bucket:
+            if current is not None:
+                yield current
+            bucket = b
+            current = Subgroup(origin + b * width)
+        current.add(x)
+
+    if current is not None:
+        yield current
+
+
+def _scaled(x: TYPE_NUMERIC) -> Tuple[int, int]:
+    """
+    Returns (coefficient, exponent) such that x is exactly coefficient * 10 ** exponent.
+    Floats are taken as their shortest repr, the same as Decimal(str(x)).
+    """
+    if isinstance(x, int):
+        return x, 0
+    if isinstance(x, float):
+        text = repr(x)
+        whole, _, fraction = text.partition('.')
+        if fraction.isdigit():
+            fraction = fraction.rstrip('0')
+            return int(whole + fraction), -len(fraction)
+        x = Decimal(text)
+
+    sign, digits, exponent = x.as_tuple()
+    if not isinstance(exponent, int):
+        raise ValueError(f'Reading {x} is not finite')
+    coefficient = int(''.join(map(str, digits)))
+    return -coefficient if sign else coefficient, exponent
+
+
+TYPE_SUBGROUPS_INPUT = Iterable[Union[Subgroup, Iterable[TYPE_NUMERIC]]]
+
+
+def to_subgroups(subgroups: TYPE_SUBGROUPS_INPUT) -> List[Subgroup]:
+    return [s if isinstance(s, Subgroup) else Subgroup.from_values(s) for s in subgroups]
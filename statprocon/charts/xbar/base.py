@@ -0,0 +1,118 @@
+import abc
+import csv
+import io
+
+from decimal import Decimal
+from typing import List, Sequence
+
+from ..xmr.base import Base as XmR
+from ..xmr.constants import ROUNDING
+from .aggregate import Subgroup, TYPE_SUBGROUPS_INPUT, to_subgroups
+from .exceptions import InvalidSubgroupsError
+
+THREE = Decimal('3')
+
+
+class Base(abc.ABC):
+    # Prefix of the dispersion chart keys in `to_dict()`, i.e. 'r' or 's'
+    dispersion = ''
+
+    def __init__(self, subgroups: TYPE_SUBGROUPS_INPUT):
+        """
+        Average chart of subgroups of readings with the limits computed from the dispersion
+        within the subgroups.
+
+        Subgroups can have different sizes.  The limits for each subgroup are computed from
+        its size so they are only constant when all subgroups have the same size.
+
+        :param subgroups: `Subgroup` summaries, i.e. from `subgroups_by_size()` or
+            `subgroups_by_time()`, or lists of readings
+        """
+        self.subgroups: List[Subgroup] = to_subgroups(subgroups)
+        if len(self.subgroups) < 2:
+            raise InvalidSubgroupsError('Provide at least 2 subgroups')
+        if any(s.n < 2 for s in self.subgroups):
+            raise InvalidSubgroupsError('Subgroups must contain at least 2 readings')
+
+        self.sizes = [s.n for s in self.subgroups]
+        self.averages = [s.mean for s in self.subgroups]
+
+    def __repr__(self) -> str:
+        result = ''
+        for k, v in self.to_dict().items():
+            k_format = '{0: <9}'.format(k)
+            values = '[' + ', '.join(map(str, v)) + ']'
+            result += f'{k_format}: {values}\n'
+        return result
+
+    @abc.abstractmethod
+    def dispersions(self) -> Sequence[Decimal]:
+        """
+        The range or standard deviation of each subgroup
+        """
+
+    @abc.abstractmethod
+    def sigma(self) -> Decimal:
+        """
+        Estimate of the standard deviation of the readings from the dispersion within subgroups
+        """
+
+    @abc.abstractmethod
+    def dispersion_to_dict(self) -> dict:
+        pass
+
+    def x_central_line(self) -> Sequence[Decimal]:
+        """
+        The grand average of all readings
+        """
+        total = sum(Decimal(n) * x for n, x in zip(self.sizes, self.averages))
+        value = total / Decimal(sum(self.sizes))
+        return [round(value, ROUNDING)] * len(self.subgroups)
+
+    def upper_natural_process_limit(self) -> Sequence[Decimal]:
+        return [round(cl + w, ROUNDING) for cl, w in zip(self.x_central_line(), self._limit_widths())]
+
+    def lower_natural_process_limit(self) -> Sequence[Decimal]:
+        return [round(cl - w, ROUNDING) for cl, w in zip(self.x_central_line(), self._limit_widths())]
+
+    def x_to_dict(self) -> dict:
+        """
+        Return the values needed for the average chart as a dictionary
+        """
+        return {
+            'values': self.averages,
+            'unpl': self.upper_natural_process_limit(),
+            'cl': self.x_central_line(),
+            'lnpl': self.lower_natural_process_limit(),
+        }
+
+    def to_dict(self) -> dict:
+        result = {}
+        for k, v in self.x_to_dict().items():
+            result[f'x_{k}'] = v
+        for k, v in self.dispersion_to_dict().items():
+            result[f'{self.dispersion}_{k}'] = v
+        return result
+
+    def to_csv(self) -> str:
+        output = io.StringIO()
+        writer = csv.writer(output)
+
+        d = self.to_dict()
+        writer.writerow(d.keys())
+        writer.writerows(zip(*d.values()))
+        return output.getvalue()
+
+    def rule_1_x_indices_beyond_limits(self) -> List[bool]:
+        """
+        True at index i means that the average of subgroup i is beyond its natural process limits
+        """
+        return XmR._points_beyond_limits(
+            self.averages,
+            self.upper_natural_process_limit(),
+            self.lower_natural_process_limit(),
+        )
+
+    def _limit_widths(self) -> List[Decimal]:
+        sigma = self.sigma()
+        return [THREE * sigma / Decimal(n).sqrt() for n in self.sizes]
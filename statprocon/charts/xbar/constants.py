@@ -0,0 +1,34 @@
+import math
+
+from decimal import Decimal
+
+# Bias correction factors for subgroup ranges of size n
+# d2 is the mean and d3 is the standard deviation of the relative range R / sigma
+D2 = {
+    2: Decimal('1.128'), 3: Decimal('1.693'), 4: Decimal('2.059'), 5: Decimal('2.326'),
+    6: Decimal('2.534'), 7: Decimal('2.704'), 8: Decimal('2.847'), 9: Decimal('2.970'),
+    10: Decimal('3.078'), 11: Decimal('3.173'), 12: Decimal('3.258'), 13: Decimal('3.336'),
+    14: Decimal('3.407'), 15: Decimal('3.472'), 16: Decimal('3.532'), 17: Decimal('3.588'),
+    18: Decimal('3.640'), 19: Decimal('3.689'), 20: Decimal('3.735'), 21: Decimal('3.778'),
+    22: Decimal('3.819'), 23: Decimal('3.858'), 24: Decimal('3.895'), 25: Decimal('3.931'),
+}
+
+D3 = {
+    2: Decimal('0.853'), 3: Decimal('0.888'), 4: Decimal('0.880'), 5: Decimal('0.864'),
+    6: Decimal('0.848'), 7: Decimal('0.833'), 8: Decimal('0.820'), 9: Decimal('0.808'),
+    10: Decimal('0.797'), 11: Decimal('0.787'), 12: Decimal('0.778'), 13: Decimal('0.770'),
+    14: Decimal('0.763'), 15: Decimal('0.756'), 16: Decimal('0.750'), 17: Decimal('0.744'),
+    18: Decimal('0.739'), 19: Decimal('0.734'), 20: Decimal('0.729'), 21: Decimal('0.724'),
+    22: Decimal('0.720'), 23: Decimal('0.716'), 24: Decimal('0.712'), 25: Decimal('0.708'),
+}
+
+MAX_RANGE_SUBGROUP_SIZE = max(D2)
+
+
+def c4(n: int) -> Decimal:
+    """
+    Bias correction factor for the standard deviation of a subgroup of size n
+    """
+    assert n >= 2
+    value = math.sqrt(2 / (n - 1)) * math.exp(math.lgamma(n / 2) - math.lgamma((n - 1) / 2))
+    return Decimal(str(round(value, 6)))
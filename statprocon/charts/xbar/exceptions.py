@@ -0,0 +1,2 @@
+class InvalidSubgroupsError(Exception):
+    pass
@@ -0,0 +1,69 @@
+from decimal import Decimal
+from typing import List, Sequence
+
+from ..xmr.base import Base as XmR
+from ..xmr.constants import ROUNDING
+from .aggregate import TYPE_SUBGROUPS_INPUT
+from .base import Base, THREE
+from .constants import D2, D3, MAX_RANGE_SUBGROUP_SIZE
+from .exceptions import InvalidSubgroupsError
+
+
+class XbarR(Base):
+    dispersion = 'r'
+
+    def __init__(self, subgroups: TYPE_SUBGROUPS_INPUT):
+        """
+        Average and Range chart.
+        Subgroups must contain between 2 and 25 readings.
+
+        :param subgroups: `Subgroup` summaries or lists of readings
+        """
+        super().__init__(subgroups)
+        if max(self.sizes) > MAX_RANGE_SUBGROUP_SIZE:
+            raise InvalidSubgroupsError(
+                f'Subgroups must contain at most {MAX_RANGE_SUBGROUP_SIZE} readings. Use XbarS instead'
+            )
+
+    def dispersions(self) -> Sequence[Decimal]:
+        return self.ranges()
+
+    def ranges(self) -> Sequence[Decimal]:
+        return [s.range for s in self.subgroups]
+
+    def sigma(self) -> Decimal:
+        """
+        The average of the subgroup ranges divided by d2.
+        When all subgroups have the same size this is the average range divided by d2.
+        """
+        values = [r / D2[n] for r, n in zip(self.ranges(), self.sizes)]
+        return sum(values) / Decimal(len(values))
+
+    def r_central_line(self) -> Sequence[Decimal]:
+        sigma = self.sigma()
+        return [round(D2[n] * sigma, ROUNDING) for n in self.sizes]
+
+    def upper_range_limit(self) -> Sequence[Decimal]:
+        sigma = self.sigma()
+        return [round((D2[n] + THREE * D3[n]) * sigma, ROUNDING) for n in self.sizes]
+
+    def lower_range_limit(self) -> Sequence[Decimal]:
+        sigma = self.sigma()
+        return [round(max(D2[n] - THREE * D3[n], Decimal(0)) * sigma, ROUNDING) for n in self.sizes]
+
+    def r_to_dict(self) -> dict:
+        """
+        Return the values needed for the Range chart as a dictionary
+        """
+        return {
+            'values': self.ranges(),
+            'url': self.upper_range_limit(),
+            'cl': self.r_central_line(),
+            'lrl': self.lower_range_limit(),
+        }
+
+    def dispersion_to_dict(self) -> dict:
+        return self.r_to_dict()
+
+    def rule_1_r_indices_beyond_limits(self) -> List[bool]:
+        return XmR._points_beyond_limits(self.ranges(), self.upper_range_limit(), self.lower_range_limit())
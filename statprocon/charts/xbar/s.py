@@ -0,0 +1,63 @@
+from decimal import Decimal
+from typing import List, Sequence
+
+from ..xmr.base import Base as XmR
+from ..xmr.constants import ROUNDING
+from .base import Base, THREE
+from .constants import c4
+
+
+class XbarS(Base):
+    dispersion = 's'
+
+    def dispersions(self) -> Sequence[Decimal]:
+        return self.standard_deviations()
+
+    def standard_deviations(self) -> Sequence[Decimal]:
+        return [s.standard_deviation for s in self.subgroups]
+
+    def sigma(self) -> Decimal:
+        """
+        The average of the subgroup standard deviations divided by c4.
+        When all subgroups have the same size this is the average standard deviation divided by c4.
+        """
+        values = [s / c4(n) for s, n in zip(self.standard_deviations(), self.sizes)]
+        return sum(values) / Decimal(len(values))
+
+    def s_central_line(self) -> Sequence[Decimal]:
+        sigma = self.sigma()
+        return [round(c4(n) * sigma, ROUNDING) for n in self.sizes]
+
+    def upper_standard_deviation_limit(self) -> Sequence[Decimal]:
+        sigma = self.sigma()
+        return [round((c4(n) + self._width(n)) * sigma, ROUNDING) for n in self.sizes]
+
+    def lower_standard_deviation_limit(self) -> Sequence[Decimal]:
+        sigma = self.sigma()
+        return [round(max(c4(n) - self._width(n), Decimal(0)) * sigma, ROUNDING) for n in self.sizes]
+
+    def s_to_dict(self) -> dict:
+        """
+        Return the values needed for the Standard Deviation chart as a dictionary
+        """
+        return {
+            'values': self.standard_deviations(),
+            'usl': self.upper_standard_deviation_limit(),
+            'cl': self.s_central_line(),
+            'lsl': self.lower_standard_deviation_limit(),
+        }
+
+    def dispersion_to_dict(self) -> dict:
+        return self.s_to_dict()
+
+    def rule_1_s_indices_beyond_limits(self) -> List[bool]:
+        return XmR._points_beyond_limits(
+            self.standard_deviations(),
+            self.upper_standard_deviation_limit(),
+            self.lower_standard_deviation_limit(),
+        )
+
+    @staticmethod
+    def _width(n: int) -> Decimal:
+        # Three standard deviations of s / sigma
+        return THREE * (1 - c4(n) ** 2).sqrt()
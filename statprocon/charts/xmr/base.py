@@ -1,14 +1,20 @@
-import copy
+import asyncio
 import csv
+import functools
 import io
+import itertools
+import json
 import statistics
 import sys
 
+from concurrent.futures import Executor
 from decimal import Decimal
-from typing import cast, List, Optional, Sequence, Union
+from typing import cast, Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 from .constants import INVALID, ROUNDING
+from .ewma import exponential_moving_averages
 from .exceptions import InvalidCountsError
+from .rules import WHEELER, RuleSet
 from .types import (
     TYPE_COUNTS,
     TYPE_COUNTS_INPUT,
@@ -18,6 +24,11 @@ from .types import (
     TYPE_NUMERIC_INPUTS,
 )
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
 
 AVERAGE = 'average'
 MEDIAN = 'median'
@@ -33,8 +44,31 @@ SF_RANGES = {
     MEDIAN: Decimal('3.865'),
 }
 
+CSV_HEADER = ['x_values', 'x_unpl', 'x_cl', 'x_lnpl', 'mr_values', 'mr_url', 'mr_cl']
+
+# Keys of to_dict() that can be written as a single value by to_json() when they are constant
+LINE_KEYS = {'x_unpl', 'x_unpl_mid', 'x_cl', 'x_lnpl_mid', 'x_lnpl', 'mr_url', 'mr_cl'}
+
 
 class Base:
+    """
+    XmR chart.
+
+    Charts don't change after they are created.  Every method computes its result from the counts
+    and options without caching state, so a chart can be read by several threads at once.  The
+    counts list must not be modified.
+    """
+
+    # Charts with at most this many points are computed inline on the event loop by the async
+    # methods.  Larger charts are offloaded to an executor so they don't block other coroutines.
+    aio_inline_max_points = 10000
+
+    # Number of rows computed per executor call by `aiter_rows()`
+    aio_chunk_size = 5000
+
+    # Number of values in each string yielded by `iter_json()`
+    json_chunk_size = 10000
+
     def __init__(
             self,
             counts: TYPE_COUNTS_INPUT,
@@ -46,7 +80,9 @@ class Base:
     ):
         """
 
-        :param counts: list of data to be used by the X chart
+        :param counts: list of data to be used by the X chart.  Missing values can be given as None.
+            Moving ranges next to missing values are skipped, limits are computed from the values
+            that are present and missing values break runs for the detection rules.
         :param x_central_line_uses: Whether to use the 'average' or 'median' for computing the X
             central line.  Defaults to average.  If set to median, moving_range_uses will also be
             set to median.
@@ -66,6 +102,8 @@ class Base:
             raise InvalidCountsError('Provide at least 2 data points')
 
         self.counts = cast(List[Decimal], self.to_decimal_list(counts))
+        if len(counts) - self.counts.count(None) < 2:  # type: ignore[arg-type]
+            raise InvalidCountsError('Provide at least 2 data points that are not None')
         self.i = max(0, subset_start_index)
         self.j = len(counts)
         if subset_end_index:
@@ -73,6 +111,13 @@ class Base:
 
         assert self.i <= self.j
 
+        if not self.has_moving_range(self.counts, self.i, self.j):
+            if (self.i, self.j) == (0, len(counts)):
+                raise InvalidCountsError('Provide at least 2 successive data points that are not None')
+            raise InvalidCountsError(
+                f'Provide at least 2 successive data points that are not None between {self.i} and {self.j}'
+            )
+
         self._x_central_line_uses = x_central_line_uses
         if x_central_line_uses == MEDIAN:
             self._moving_range_uses = MEDIAN
@@ -232,8 +277,60 @@ class Base:
         output = io.StringIO()
         writer = csv.writer(output)
 
-        writer.writerow(['x_values', 'x_unpl', 'x_cl', 'x_lnpl', 'mr_values', 'mr_url', 'mr_cl'])
-        writer.writerows(zip(
+        writer.writerow(CSV_HEADER)
+        writer.writerows(self.iter_rows())
+        return output.getvalue()
+
+    def to_json(self, collapse_constant_lines: bool = False, use_float: bool = False, **kwargs) -> str:
+        """
+        Returns the result of `to_dict()` as JSON.  Decimals are written as JSON numbers without
+        loss of precision and missing values as null.
+
+        :param collapse_constant_lines: If set to True, lines and limits that have the same value
+            for every count are written as a single number instead of a list
+        :param use_float: If set to True, values are converted to floats, which is faster when
+            orjson is installed but may lose precision
+        :param kwargs: Arguments of `to_dict()`
+        """
+        if not use_float:
+            return ''.join(self.iter_json(collapse_constant_lines, **kwargs))
+
+        result: Dict[str, Any] = {}
+        for k, values in self.to_dict(**kwargs).items():
+            if collapse_constant_lines and _is_constant_line(k, values):
+                result[k] = _float(values[0])
+            else:
+                result[k] = list(map(_float, values))
+
+        if orjson is not None:
+            return orjson.dumps(result).decode()
+        return json.dumps(result, separators=(',', ':'))
+
+    def iter_json(self, collapse_constant_lines: bool = False, **kwargs) -> Iterator[str]:
+        """
+        Yields the JSON of `to_json()` in strings of at most `json_chunk_size` values so that large
+        charts can be written to a file or response without building the whole string
+        """
+        yield '{'
+        for n, (k, values) in enumerate(self.to_dict(**kwargs).items()):
+            yield f'{"," if n else ""}{json.dumps(k)}:'
+            if collapse_constant_lines and _is_constant_line(k, values):
+                yield _json_number(values[0])
+                continue
+
+            yield '['
+            size = self.json_chunk_size
+            for start in range(0, len(values), size):
+                chunk = _json_numbers(values[start:start + size])
+                yield f',{chunk}' if start else chunk
+            yield ']'
+        yield '}'
+
+    def iter_rows(self) -> Iterator[Tuple]:
+        """
+        Yields one tuple per count with the values of the columns in `CSV_HEADER`
+        """
+        return zip(
             self.counts,
             self.upper_natural_process_limit(),
             self.x_central_line(),
@@ -241,25 +338,81 @@ class Base:
             self.moving_ranges(),
             self.upper_range_limit(),
             self.mr_central_line()
-        ))
-        return output.getvalue()
+        )
+
+    @classmethod
+    async def acompute(cls, counts: TYPE_COUNTS_INPUT, *args, executor: Optional[Executor] = None, **kwargs):
+        """
+        Async version of the constructor.
+        Converting counts is done in `executor` when there are more than `aio_inline_max_points`
+        counts so that the event loop is not blocked.
+
+        :param executor: Optional executor to offload work to.  Defaults to the loop's default executor
+        :return: An instance of this class
+        """
+        func = functools.partial(cls, counts, *args, **kwargs)
+        if len(counts) <= cls.aio_inline_max_points:
+            return func()
+        return await asyncio.get_running_loop().run_in_executor(executor, func)
+
+    async def ato_dict(self, *args, executor: Optional[Executor] = None, **kwargs) -> dict:
+        """
+        Async version of `to_dict()`.  Accepts the same arguments.
+        """
+        return await self._aio_run(executor, functools.partial(self.to_dict, *args, **kwargs))
+
+    async def ato_csv(self, executor: Optional[Executor] = None) -> str:
+        """
+        Async version of `to_csv()`
+        """
+        return await self._aio_run(executor, self.to_csv)
+
+    async def aiter_rows(self, executor: Optional[Executor] = None) -> AsyncIterator[Tuple]:
+        """
+        Async version of `iter_rows()`.
+        Rows are computed in chunks of `aio_chunk_size` so that large charts hand control back to
+        the event loop between chunks.
+        """
+        rows: Optional[Iterator[Tuple]] = None
+
+        def next_chunk() -> List[Tuple]:
+            nonlocal rows
+            if rows is None:
+                # iter_rows() computes every column up front, so it is called in the executor too
+                rows = self.iter_rows()
+            return list(itertools.islice(rows, self.aio_chunk_size))
+
+        while True:
+            chunk = await self._aio_run(executor, next_chunk)
+            if not chunk:
+                return
+            for row in chunk:
+                yield row
+
+    async def _aio_run(self, executor: Optional[Executor], func):
+        if len(self.counts) <= self.aio_inline_max_points:
+            return func()
+        return await asyncio.get_running_loop().run_in_executor(executor, func)
 
     def moving_ranges(self) -> TYPE_MOVING_RANGES:
         """
         Moving ranges are the absolute differences between successive count values.
-        The first element will always be None
+        The first element will always be None.
+        The moving range is also None when either count is missing.
         """
-        result: list[TYPE_MOVING_RANGE_VALUE] = []
-        for i, c in enumerate(self.counts):
-            if i == 0:
+        result: list[TYPE_MOVING_RANGE_VALUE] = [None]
+        prev = self.counts[0]
+        for c in itertools.islice(self.counts, 1, None):
+            if c is None or prev is None:
                 result.append(None)
             else:
-                value = cast(Union[Decimal, int], abs(c - self.counts[i - 1]))
+                value = cast(Union[Decimal, int], abs(c - prev))
                 result.append(value)
+            prev = c
         return result
 
     def x_central_line(self) -> Sequence[Decimal]:
-        valid_values = self.counts[self.i:self.j]
+        valid_values = [c for c in itertools.islice(self.counts, self.i, self.j) if c is not None]
         if self._x_central_line_uses == AVERAGE:
             value = self._mean(valid_values)
         elif self._x_central_line_uses == MEDIAN:
@@ -273,8 +426,12 @@ class Base:
         result: List[Union[None, Decimal]] = [None] * (n - 1)
         nd = Decimal(n)
         for i in range(n-1, len(self.counts)):
-            ma = sum(self.counts[i-n+1:i+1]) / nd
-            result.append(ma)
+            window = self.counts[i-n+1:i+1]
+            if None in window:
+                # Averages of windows with missing values are also missing
+                result.append(None)
+            else:
+                result.append(sum(window) / nd)
 
         return result
 
@@ -285,20 +442,21 @@ class Base:
             Must be between 0 and 1 exclusive.
         :return:
         """
-        assert 0 < smoothing_factor < 1
+        return self.x_exponential_moving_averages([smoothing_factor])[0]
 
-        result: list[Decimal] = copy.deepcopy(self.counts)
-        smoothing_pct = Decimal('1') - Decimal(str(smoothing_factor))
-        for i in range(1, len(result)):
-            curr = result[i]
-            prev = result[i-1]
-            result[i] = round(prev + smoothing_pct * (curr - prev), ROUNDING)
-        return result
+    def x_exponential_moving_averages(self, smoothing_factors: Sequence[float]) -> List[List[Decimal]]:
+        """
+        Returns the Exponential Moving Average for the X data for each smoothing factor
+        computed in a single pass over the counts
+        :param smoothing_factors The smoothing factors to apply to the function.
+            Each must be between 0 and 1 exclusive.
+        """
+        return exponential_moving_averages(self.counts, smoothing_factors)
 
     def mr_central_line(self) -> Sequence[Decimal]:
         mr = self.moving_ranges()
         assert mr[0] is None
-        valid_values = cast(TYPE_COUNTS, mr[self.i + 1:self.j])
+        valid_values = cast(TYPE_COUNTS, [x for x in itertools.islice(mr, self.i + 1, self.j) if x is not None])
 
         if self._moving_range_uses == AVERAGE:
             value = self._mean(valid_values)
@@ -430,6 +588,11 @@ class Base:
         # negative is number of consecutive points below the line
         run = 0
         for i, (x, cl) in enumerate(zip(self.counts, self.x_central_line())):
+            if x is None:
+                # Missing values break the run
+                run = 0
+                continue
+
             if x > cl:
                 if run < 0:
                     run = 1
@@ -465,14 +628,19 @@ class Base:
         # negative value is point near lower limit
         near_limits = [0] * len(self.counts)
 
+        # Successive values cannot include the last missing value
+        last_missing = -1
+
         values = zip(self.counts, self.upper_halfway_line(), self.lower_halfway_line())
         for i, (x, upper_25, lower_25) in enumerate(values):
-            if x < lower_25:
+            if x is None:
+                last_missing = i
+            elif x < lower_25:
                 near_limits[i] = -1
             elif x > upper_25:
                 near_limits[i] = 1
 
-            if i >= 3:
+            if i - 3 > last_missing:
                 successive_values = near_limits[i - 3:i + 1]
                 if abs(sum(successive_values)) >= 3:
                     for j in range(i - 3, i + 1):
@@ -480,6 +648,25 @@ class Base:
 
         return result
 
+    def evaluate_rules(self, rule_set: Optional[RuleSet] = None) -> Dict[str, List[bool]]:
+        """
+        Evaluates the rules of a RuleSet on the X Chart in a single pass over the counts.
+        See `statprocon.charts.xmr.rules` for the WESTERN_ELECTRIC and NELSON rule sets and how to
+        define custom rules.
+
+        :param rule_set: Defaults to WHEELER, the rules of the rule_*_x methods.  Unlike
+            `rule_2_runs_about_central_line()`, points on the central line break runs for Rule 2
+        :return: dict of a list of boolean values of length(counts) for each rule by name
+        """
+        if rule_set is None:
+            rule_set = WHEELER
+        return rule_set.evaluate(
+            self.counts,
+            self.x_central_line(),
+            self.upper_natural_process_limit(),
+            self.lower_natural_process_limit(),
+        )
+
     @staticmethod
     def _points_beyond_limits(
             data: TYPE_MOVING_RANGES,
@@ -506,12 +693,93 @@ class Base:
         n = len(nums)
         return Decimal(str(s)) / Decimal(str(n))
 
+    @staticmethod
+    def has_moving_range(values: Sequence[Optional[Decimal]], start: int = 0, end: Optional[int] = None) -> bool:
+        """
+        Returns whether values[start:end] has 2 successive values that are not None,
+        which the moving range central line needs
+        """
+        end = len(values) if end is None else end
+        previous = None
+        for x in itertools.islice(values, start, end):
+            if x is not None and previous is not None:
+                return True
+            previous = x
+        return False
+
     @staticmethod
     def to_decimal_list(values: TYPE_NUMERIC_INPUTS) -> TYPE_MOVING_RANGES:
         result: List[Union[Decimal, None]] = []
         for x in values:
             if x is None:
                 result.append(None)
+            elif isinstance(x, Decimal):
+                # Decimals are immutable so they can be shared instead of converted again
+                result.append(x)
             else:
                 result.append(Decimal(str(x)))
         return result
+
+
+class Precomputed(Base):
+    def __init__(
+            self,
+            counts: List[Optional[Decimal]],
+            x_cl: Decimal,
+            mr_cl: Decimal,
+            x_central_line_uses: str = AVERAGE,
+            moving_range_uses: str = AVERAGE,
+            limit_floor: TYPE_NUMERIC = Decimal('-Infinity'),
+            moving_ranges: Optional[List[Optional[Decimal]]] = None,
+    ):
+        """
+        XmR chart of counts that are already Decimals with precomputed central lines, e.g. for
+        immutable snapshots of charts whose counts change
+
+        :param x_cl: The X central line
+        :param mr_cl: The moving range central line
+        :param moving_ranges: Optional precomputed moving ranges of counts
+        """
+        self.counts = counts  # type: ignore[assignment]
+        self.i = 0
+        self.j = len(counts)
+        self._x_central_line_uses = x_central_line_uses
+        self._moving_range_uses = moving_range_uses
+        self.limit_floor = limit_floor
+        self._x_cl = x_cl
+        self._mr_cl = mr_cl
+        self._moving_ranges = super().moving_ranges() if moving_ranges is None else moving_ranges
+
+    def moving_ranges(self) -> TYPE_MOVING_RANGES:
+        return self._moving_ranges
+
+    def x_central_line(self) -> Sequence[Decimal]:
+        return [self._x_cl] * len(self.counts)
+
+    def mr_central_line(self) -> Sequence[Decimal]:
+        return [self._mr_cl] * len(self.counts)
+
+
+def _is_constant_line(key: str, values: list) -> bool:
+    return key in LINE_KEYS and len(values) > 0 and values.count(values[0]) == len(values)
+
+
+def _json_number(value) -> str:
+    if value is None or (isinstance(value, Decimal) and not value.is_finite()):
+        return 'null'
+    return str(value)
+
+
+def _json_numbers(values: list) -> str:
+    if None not in values:
+        text = ','.join(map(str, values))
+        # Only Infinity and NaN, which aren't valid JSON, contain these letters
+        if 'I' not in text and 'N' not in text:
+            return text
+    return ','.join(map(_json_number, values))
+
+
+def _float(value) -> Optional[float]:
+    if value is None or (isinstance(value, Decimal) and not value.is_finite()):
+        return None
+    return float(value)
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from .base import AVERAGE, Base
+from .types import TYPE_COUNTS_INPUT, TYPE_NUMERIC
+
+
+class ChartCache:
+    def __init__(self, maxsize: int = 128, path: Optional[str] = None, chart_class: Type[Base] = Base):
+        """
+        Caches the results of `to_dict()` keyed by a hash of the counts and options.
+
+        Results are kept in memory with LRU eviction.  If `path` is provided, results are also
+        stored in a sqlite database so that they are available after the process restarts.
+
+        When the counts of a request that is not cached extend the counts of a cached result with
+        the same options, the Decimals of the cached counts are reused so only the new counts are
+        converted.  The chart itself is still computed from all of the counts.
+
+        :param maxsize: Maximum number of results kept in memory
+        :param path: Optional path of a sqlite database to persist results to
+        :param chart_class: The chart class used to compute results
+        """
+        assert maxsize > 0
+
+        self.maxsize = maxsize
+        self.chart_class = chart_class
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._keys_by_options: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS charts '
+                '(key TEXT PRIMARY KEY, options TEXT, length INTEGER, digest TEXT, value BLOB)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS charts_options ON charts (options, length)')
+            self._db.commit()
+
+    def to_dict(
+            self,
+            counts: TYPE_COUNTS_INPUT,
+            x_central_line_uses: str = AVERAGE,
+            moving_range_uses: str = AVERAGE,
+            subset_start_index: int = 0,
+            subset_end_index: Optional[int] = None,
+            limit_floor: TYPE_NUMERIC = Decimal('-Infinity'),
+            **kwargs,
+    ) -> dict:
+        """
+        Returns the cached result of `chart_class(counts, ...).to_dict(**kwargs)`.
+        The returned dict is shared by all callers and must not be modified.
+        """
+        chart_kwargs = {
+            'x_central_line_uses': x_central_line_uses,
+            'moving_range_uses': moving_range_uses,
+            'subset_start_index': subset_start_index,
+            'subset_end_index': subset_end_index,
+            'limit_floor': limit_floor,
+        }
+        options = json.dumps([chart_kwargs, kwargs], sort_keys=True, default=str)
+
+        # Hashing the counts is the slowest part of a hit and doesn't need the lock
+        digest = self._digests(counts, [])[0]
+        key = hashlib.blake2b((digest + options).encode(), digest_size=16).hexdigest()
+
+        with self._lock:
+            entry = self._get(key)
+            if entry:
+                self.hits += 1
+                return entry.value
+
+            self.misses += 1
+            # Cached results that could be a prefix of the counts are only looked up on a miss
+            lengths = self._prefix_lengths(options, len(counts))
+
+        prefix = None
+        if lengths:
+            prefix_digests = self._digests(counts, lengths)[1]
+            with self._lock:
+                prefix = self._longest_prefix(options, prefix_digests)
+
+        if prefix:
+            # The converted counts of the prefix are Decimals and are not converted again
+            counts = list(prefix.value['x_values']) + list(counts[prefix.length:])
+        value = self.chart_class(counts, **chart_kwargs).to_dict(**kwargs)  # type: ignore[arg-type]
+
+        with self._lock:
+            self._put(key, _Entry(options, len(counts), digest, value))
+        return value
+
+    def clear(self):
+        """
+        Removes all results from memory and from the database
+        """
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_options.clear()
+            if self._db:
+                self._db.execute('DELETE FROM charts')
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str) -> Optional['_Entry']:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        if self._db:
+            row = self._db.execute(
+                'SELECT options, length, digest, value FROM charts WHERE key = ?', (key,)
+            ).fetchone()
+            if row:
+                options, length, digest, value = row
+                entry = _Entry(options, length, digest, pickle.loads(value))
+                self._remember(key, entry)
+                return entry
+
+        return None
+
+    def _put(self, key: str, entry: '_Entry'):
+        self._remember(key, entry)
+        if self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO charts VALUES (?, ?, ?, ?, ?)',
+                (key, entry.options, entry.length, entry.digest, pickle.dumps(entry.value)),
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, entry: '_Entry'):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._keys_by_options.setdefault(entry.options, set()).add(key)
+
+        while len(self._entries) > self.maxsize:
+            old_key, old = self._entries.popitem(last=False)
+            keys = self._keys_by_options[old.options]
+            keys.discard(old_key)
+            if not keys:
+                del self._keys_by_options[old.options]
+
+    def _candidates(self, options: str, n: int) -> Iterable[Tuple[str, int, str]]:
+        for key in self._keys_by_options.get(options, ()):
+            entry = self._entries[key]
+            if entry.length < n:
+                yield key, entry.length, entry.digest
+
+        if self._db:
+            yield from self._db.execute(
+                'SELECT key, length, digest FROM charts WHERE options = ? AND length < ?', (options, n)
+            )
+
+    def _prefix_lengths(self, options: str, n: int) -> List[int]:
+        return sorted({length for _, length, _ in self._candidates(options, n)})
+
+    def _longest_prefix(self, options: str, prefix_digests: Dict[int, str]) -> Optional['_Entry']:
+        best: Optional[Tuple[int, str]] = None
+        for key, length, digest in self._candidates(options, max(prefix_digests, default=0) + 1):
+            if prefix_digests.get(length) == digest and (best is None or length > best[0]):
+                best = (length, key)
+
+        if best is None:
+            return None
+        return self._get(best[1])
+
+    @staticmethod
+    def _digests(counts: TYPE_COUNTS_INPUT, lengths: List[int]) -> Tuple[str, Dict[int, str]]:
+        """
+        Returns the digest of counts and the digests of counts[:length] for each length
+        in a single pass over counts
+        """
+        h = hashlib.blake2b(digest_size=16)
+        prefix_digests = {}
+        start = 0
+        for end in lengths + [len(counts)]:
+            if end > start:
+                h.update((','.join(map(str, counts[start:end])) + ',').encode())
+                start = end
+            prefix_digests[end] = h.hexdigest()
+        digest = prefix_digests.pop(len(counts))
+        return digest, prefix_digests
+
+
+class _Entry:
+    __slots__ = ('options', 'length', 'digest', 'value')
+
+    def __init__(self, options: str, length: int, digest: str, value: dict):
+        self.options = options
+        self.length = length
+        self.digest = digest
+        self.value = value
@@ -0,0 +1,78 @@
+import threading
+
+from decimal import Decimal
+from typing import Iterable, List, Optional, Sequence
+
+from .constants import ROUNDING
+from .types import TYPE_NUMERIC
+
+TYPE_SMOOTHING_FACTORS = Sequence[float]
+
+
+class ExponentialMovingAverage:
+    def __init__(self, smoothing_factors: TYPE_SMOOTHING_FACTORS = (0.9,), rounding: Optional[int] = ROUNDING):
+        """
+        Streaming Exponential Moving Averages for several smoothing factors at once.
+        Each call to `update()` takes constant time per smoothing factor.  Updates from several
+        threads are serialized by a lock.
+
+        :param smoothing_factors: The smoothing factors to apply.  Each must be between 0 and 1
+            exclusive.  The weight of each new value is 1 - smoothing_factor.
+        :param rounding: Number of decimal places each average is rounded to after every update,
+            as done by `Base.x_exponential_moving_average()`.  None to not round.
+        """
+        assert len(smoothing_factors) > 0
+        for f in smoothing_factors:
+            assert 0 < f < 1
+
+        self.smoothing_factors = list(smoothing_factors)
+        self.rounding = rounding
+        self._weights = [Decimal('1') - Decimal(str(f)) for f in smoothing_factors]
+        self.values: Optional[List[Decimal]] = None
+        self._lock = threading.Lock()
+
+    def update(self, x: Optional[TYPE_NUMERIC]) -> List[Decimal]:
+        """
+        Adds the next value and returns the current average for each smoothing factor.
+        A missing value (None) does not change the averages and returns None for each average.
+        """
+        if x is None:
+            return [None] * len(self._weights)  # type: ignore[list-item]
+
+        x = x if isinstance(x, Decimal) else Decimal(str(x))
+        with self._lock:
+            if self.values is None:
+                self.values = [x] * len(self._weights)
+                return self.values
+
+            values = []
+            for prev, w in zip(self.values, self._weights):
+                value = prev + w * (x - prev)
+                if self.rounding is not None:
+                    value = round(value, self.rounding)
+                values.append(value)
+
+            # A new list so the averages returned earlier aren't changed
+            self.values = values
+        return values
+
+    def extend(self, xs: Iterable[Optional[TYPE_NUMERIC]]) -> List[List[Decimal]]:
+        """
+        Adds each value and returns the averages of each smoothing factor for the new values
+        """
+        result: List[List[Decimal]] = [[] for _ in self._weights]
+        for x in xs:
+            for series, value in zip(result, self.update(x)):
+                series.append(value)
+        return result
+
+
+def exponential_moving_averages(
+        values: Iterable[Optional[TYPE_NUMERIC]],
+        smoothing_factors: TYPE_SMOOTHING_FACTORS,
+        rounding: Optional[int] = ROUNDING,
+) -> List[List[Decimal]]:
+    """
+    Returns the Exponential Moving Average of values for each smoothing factor in a single pass
+    """
+    return ExponentialMovingAverage(smoothing_factors, rounding).extend(values)
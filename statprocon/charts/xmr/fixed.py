@@ -0,0 +1,163 @@
+from decimal import Decimal, getcontext
+from typing import List, Optional, Sequence
+
+from .base import AVERAGE, Base, MEDIAN, SF_LIMITS, SF_RANGES
+from .constants import ROUNDING
+from .exceptions import InvalidCountsError
+from .types import TYPE_COUNTS_INPUT
+
+ROUNDING_SCALE = 10 ** ROUNDING
+
+
+class FixedPoint(Base):
+    def __init__(self, counts: TYPE_COUNTS_INPUT, *args, decimal_places: Optional[int] = None, **kwargs):
+        """
+        XmR chart that computes the central lines and limits with integer arithmetic.
+
+        Counts are scaled to integers with `decimal_places` decimal places so that sums, moving
+        ranges and scaling factor multiplications don't need Decimal arithmetic.  The results are
+        the same Decimal values that `Base` returns, including the rounding of every step, as long
+        as intermediate sums fit in the 28 significant digits of the default Decimal context and
+        no count is a negative zero.
+
+        Accepts the same arguments as `Base`.
+
+        :param decimal_places: Number of decimal places of the counts.  Defaults to the most
+            decimal places of any count.  A ValueError is raised if a count has more decimal places.
+        """
+        super().__init__(counts, *args, **kwargs)
+
+        places = decimal_places
+        if places is None:
+            places = max(-c.as_tuple().exponent for c in self.counts if c is not None)  # type: ignore[operator]
+            places = max(0, places)
+        assert places >= 0
+
+        self.decimal_places = places
+        self.scaled_counts = [None if c is None else _to_int(c, places) for c in self.counts]
+        self.scaled_moving_ranges = self._scaled_moving_ranges()
+
+        self._x_cl = self._central_line(self.scaled_counts[self.i:self.j], self._x_central_line_uses)
+        self._mr_cl = self._central_line(self.scaled_moving_ranges[self.i + 1:self.j], self._moving_range_uses)
+
+        sf_limits = _to_int(SF_LIMITS[self._moving_range_uses], ROUNDING)
+        sf_ranges = _to_int(SF_RANGES[self._moving_range_uses], ROUNDING)
+        x_cl = _to_int(self._x_cl, ROUNDING)
+        mr_cl = _to_int(self._mr_cl, ROUNDING)
+        width = sf_limits * mr_cl
+        scale = ROUNDING_SCALE * ROUNDING_SCALE
+
+        # Limits are computed from the rounded central lines as done by Base
+        self._url = _divide(sf_ranges * mr_cl, scale)
+        self._unpl = _divide(x_cl * ROUNDING_SCALE + width, scale)
+        self._lnpl = _divide(x_cl * ROUNDING_SCALE - width, scale)
+        if self._x_cl.is_zero() and self._x_cl.is_signed() and not width:
+            # -0.000 - 0.000 is -0.000 with Decimal
+            self._lnpl = self._lnpl.copy_negate()
+
+        unpl = _to_int(self._unpl, ROUNDING)
+        lnpl = _to_int(self._lnpl, ROUNDING)
+        self._unpl_mid = _divide((unpl - x_cl) * 5 + x_cl * 10, ROUNDING_SCALE * 10)
+        self._lnpl_mid = _divide((x_cl - lnpl) * 5 + lnpl * 10, ROUNDING_SCALE * 10)
+
+    def x_central_line(self) -> Sequence[Decimal]:
+        return [self._x_cl] * len(self.counts)
+
+    def mr_central_line(self) -> Sequence[Decimal]:
+        return [self._mr_cl] * len(self.counts)
+
+    def upper_range_limit(self) -> Sequence[Decimal]:
+        return [self._url] * len(self.counts)
+
+    def upper_natural_process_limit(self) -> Sequence[Decimal]:
+        return [self._unpl] * len(self.counts)
+
+    def lower_natural_process_limit(self) -> Sequence[Decimal]:
+        return [self._lnpl] * len(self.counts)
+
+    def upper_halfway_line(self) -> Sequence[Decimal]:
+        return [self._unpl_mid] * len(self.counts)
+
+    def lower_halfway_line(self) -> Sequence[Decimal]:
+        return [self._lnpl_mid] * len(self.counts)
+
+    def _scaled_moving_ranges(self) -> List[Optional[int]]:
+        result: List[Optional[int]] = [None]
+        prev = self.scaled_counts[0]
+        for c in self.scaled_counts[1:]:
+            result.append(None if c is None or prev is None else abs(c - prev))
+            prev = c
+        return result
+
+    def _central_line(self, values: Sequence[Optional[int]], uses: str) -> Decimal:
+        scale = 10 ** self.decimal_places
+        valid = [x for x in values if x is not None]
+        if not valid:
+            raise InvalidCountsError('No data points to compute the central line from')
+
+        if uses == AVERAGE:
+            return _divide(sum(valid), len(valid) * scale)
+
+        assert uses == MEDIAN
+        valid.sort()
+        n = len(valid)
+        if n % 2:
+            return _divide(valid[n // 2], scale)
+        return _divide(valid[n // 2 - 1] + valid[n // 2], 2 * scale)
+
+
+def _to_int(value: Decimal, places: int) -> int:
+    """
+    Returns value * 10 ** places as an integer.
+    Raises ValueError if value has more decimal places.
+    """
+    if not value.is_finite():
+        raise ValueError(f'{value} is not a finite number')
+
+    scaled = value.scaleb(places)
+    result = int(scaled)
+    if result != scaled:
+        raise ValueError(f'{value} has more than {places} decimal places')
+    return result
+
+
+def _divide(numerator: int, denominator: int) -> Decimal:
+    """
+    Returns numerator / denominator rounded the same way as dividing Decimals in the default
+    context and then rounding to ROUNDING decimal places, i.e. first to the context precision
+    and then to ROUNDING decimal places, both with the context rounding of ROUND_HALF_EVEN.
+    """
+    assert denominator > 0
+    sign = 1 if numerator < 0 else 0
+    a = abs(numerator)
+    b = denominator
+
+    if a:
+        precision = getcontext().prec
+        # Adjusted exponent of a / b, i.e. 10 ** e <= a / b < 10 ** (e + 1)
+        e = len(str(a)) - len(str(b))
+        if (a * 10 ** -e if e < 0 else a) < (b * 10 ** e if e > 0 else b):
+            e -= 1
+
+        # Round to the significant digits of the context
+        k = precision - 1 - e
+        if k >= 0:
+            coefficient = _round_half_even(a * 10 ** k, b)
+        else:
+            coefficient = _round_half_even(a, b * 10 ** -k)
+
+        # Round to ROUNDING decimal places
+        shift = ROUNDING - k
+        if shift >= 0:
+            a = coefficient * 10 ** shift
+        else:
+            a = _round_half_even(coefficient, 10 ** -shift)
+
+    return Decimal((sign, tuple(map(int, str(a))), -ROUNDING))
+
+
+def _round_half_even(numerator: int, denominator: int) -> int:
+    q, r = divmod(numerator, denominator)
+    if r * 2 > denominator or (r * 2 == denominator and q % 2):
+        q += 1
+    return q
@@ -0,0 +1,76 @@
+from decimal import Decimal
+from typing import List, Optional, Sequence
+
+from statprocon import XmR
+from statprocon.charts.xmr.constants import ROUNDING
+from statprocon.charts.xmr.ewma import ExponentialMovingAverage
+from statprocon.charts.xmr.types import TYPE_NUMERIC
+
+
+class EWMA:
+    def __init__(self, xmr: XmR, smoothing_factor: float = 0.9, width: TYPE_NUMERIC = 3):
+        """
+        Exponentially Weighted Moving Average control chart.
+        The averages start at the X central line of the XmR chart and the limits widen with each
+        point until they reach their asymptotic value.
+
+        :param xmr: The XmR chart providing the central line and the moving range used to estimate
+            the standard deviation
+        :param smoothing_factor: Must be between 0 and 1 exclusive.  The weight of each new value
+            is 1 - smoothing_factor, i.e. 0.9 gives new values a weight of 0.1
+        :param width: Number of standard deviations of the averages between the central line and
+            the limits
+        """
+        assert 0 < smoothing_factor < 1
+
+        self.xmr = xmr
+        self.smoothing_factor = smoothing_factor
+        self.width = Decimal(str(width))
+
+    def values(self) -> List[Optional[Decimal]]:
+        ewma = ExponentialMovingAverage([self.smoothing_factor], rounding=None)
+        ewma.update(self.xmr.x_central_line()[0])
+        result: List[Optional[Decimal]] = []
+        for x in self.xmr.counts:
+            value = ewma.update(x)[0]
+            result.append(None if value is None else round(value, ROUNDING))
+        return result
+
+    def central_line(self) -> Sequence[Decimal]:
+        return self.xmr.x_central_line()
+
+    def upper_control_limit(self) -> Sequence[Decimal]:
+        return [round(cl + w, ROUNDING) for cl, w in zip(self.central_line(), self._limit_widths())]
+
+    def lower_control_limit(self) -> Sequence[Decimal]:
+        return [round(cl - w, ROUNDING) for cl, w in zip(self.central_line(), self._limit_widths())]
+
+    def to_dict(self) -> dict:
+        return {
+            'values': self.values(),
+            'ucl': self.upper_control_limit(),
+            'cl': self.central_line(),
+            'lcl': self.lower_control_limit(),
+        }
+
+    def rule_1_indices_beyond_limits(self) -> List[bool]:
+        return XmR._points_beyond_limits(self.values(), self.upper_control_limit(), self.lower_control_limit())
+
+    def sigma(self) -> Decimal:
+        """
+        Estimate of the standard deviation of the counts from the natural process limits
+        """
+        return (self.xmr.upper_natural_process_limit()[0] - self.xmr.x_central_line()[0]) / 3
+
+    def _limit_widths(self) -> List[Decimal]:
+        weight = Decimal('1') - Decimal(str(self.smoothing_factor))
+        base = weight / (2 - weight)
+        scale = self.width * self.sigma()
+
+        result = []
+        decay = Decimal('1')
+        retained = (1 - weight) ** 2
+        for _ in self.xmr.counts:
+            decay *= retained
+            result.append(scale * (base * (1 - decay)).sqrt())
+        return result
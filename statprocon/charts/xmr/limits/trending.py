@@ -1,8 +1,9 @@
 from decimal import Decimal
-from typing import Sequence, Union
+from typing import Optional, Sequence, Union
 
 from statprocon import XmR
 from statprocon.charts.xmr.constants import INVALID
+from statprocon.charts.xmr.exceptions import InvalidCountsError
 
 
 class Trending(XmR):
@@ -23,6 +24,9 @@ class Trending(XmR):
         """
         Delegate all other attributes to self.xmr
         """
+        if item == 'xmr':
+            # Not set yet, e.g. while unpickling, so don't recurse through self.xmr
+            raise AttributeError(item)
         return getattr(self.xmr, item)
 
     def x_central_line(self) -> Sequence[Decimal]:
@@ -72,10 +76,10 @@ class Trending(XmR):
         Returns the trend or slope of the limit and central lines
         """
 
-        n = len(self.xmr.counts[self.i:self.j]) // 2
+        n = self._half_n()
         nd = Decimal(str(n))
 
-        half_average2 = sum(self.xmr.counts[(self.j-n):self.j]) / nd
+        half_average2 = self._valid_mean(self.xmr.counts[(self.j-n):self.j])
         half_average1 = self._half_average1()
 
         result = (half_average2 - half_average1) / nd
@@ -86,5 +90,14 @@ class Trending(XmR):
 
     def _half_average1(self) -> Decimal:
         n = self._half_n()
-        result = sum(self.xmr.counts[self.i:self.i+n]) / Decimal(str(n))
+        result = self._valid_mean(self.xmr.counts[self.i:self.i+n])
         return result
+
+    def _valid_mean(self, values: Sequence[Optional[Decimal]]) -> Decimal:
+        """
+        Average of the values that are not missing
+        """
+        valid = [x for x in values if x is not None]
+        if not valid:
+            raise InvalidCountsError('Provide data points that are not None in both halves of the counts')
+        return self._mean(valid)
@@ -0,0 +1,171 @@
+import math
+
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from .base import Base
+from .constants import ROUNDING
+
+RULE_1 = 1
+RULE_2 = 2
+RULE_3 = 4
+MR_RULE_1 = 8
+
+RULES = {
+    'rule_1': RULE_1,
+    'rule_2': RULE_2,
+    'rule_3': RULE_3,
+    'mr_rule_1': MR_RULE_1,
+}
+
+# Columns stored for each bucket of a level
+_COLUMNS = (
+    'x_count', 'x_sum', 'x_min', 'x_max',
+    'mr_count', 'mr_sum', 'mr_min', 'mr_max',
+    'unpl_sum', 'cl_sum', 'lnpl_sum',
+    'rules',
+)
+
+
+class Pyramid:
+    def __init__(self, xmr: Base, factor: int = 4):
+        """
+        Precomputes decimated levels of an XmR chart for zoomable charts.
+
+        Level 0 contains every point.  Each bucket of level k + 1 summarizes `factor` buckets of
+        level k with the minimum, maximum and average of the X values and moving ranges, the
+        average of the limits and whether any point in the bucket meets each detection rule.
+        Any window of the chart can then be returned with a bounded number of points while
+        every detection rule signal stays visible.
+
+        :param xmr: The chart to summarize.  XmRTrending charts are also supported
+        :param factor: The number of buckets of a level that are combined in the next level
+        """
+        assert factor >= 2
+
+        self.factor = factor
+        self.n = len(xmr.counts)
+        self.include_lnpl = xmr.is_lnpl_above_floor()
+        self.levels: List[Dict[str, list]] = [self._base_level(xmr)]
+
+        while len(self.levels[-1]['rules']) > 1:
+            self.levels.append(self._next_level(self.levels[-1]))
+
+    def bucket_size(self, level: int) -> int:
+        return self.factor ** level
+
+    def level_for(self, start: int, end: int, max_points: int) -> int:
+        """
+        Returns the most detailed level with at most `max_points` buckets between start and end
+        """
+        assert max_points > 0
+        for level in range(len(self.levels)):
+            size = self.bucket_size(level)
+            if (end - 1) // size - start // size + 1 <= max_points:
+                return level
+        return len(self.levels) - 1
+
+    def window(self, start: int = 0, end: Optional[int] = None, max_points: int = 2000) -> dict:
+        """
+        Returns the buckets of the most detailed level that covers counts[start:end] with at most
+        `max_points` buckets.  Buckets at the edges may include points outside the window.
+
+        :return: dict with the column lists 'index' (index of the first point of each bucket),
+            'x_min', 'x_max', 'x_mean', 'mr_min', 'mr_max', 'mr_mean', 'unpl', 'cl', 'lnpl' and a
+            list of booleans for each of 'rule_1', 'rule_2', 'rule_3' and 'mr_rule_1'
+        """
+        if end is None:
+            end = self.n
+        start = max(0, start)
+        end = min(self.n, end)
+        assert start < end
+
+        level = self.level_for(start, end, max_points)
+        size = self.bucket_size(level)
+        first = start // size
+        last = (end - 1) // size + 1
+        columns = {k: v[first:last] for k, v in self.levels[level].items()}
+
+        result = {
+            'index': list(range(first * size, last * size, size)),
+            'x_min': columns['x_min'],
+            'x_max': columns['x_max'],
+            'x_mean': list(map(_mean, columns['x_sum'], columns['x_count'])),
+            'mr_min': columns['mr_min'],
+            'mr_max': columns['mr_max'],
+            'mr_mean': list(map(_mean, columns['mr_sum'], columns['mr_count'])),
+            'unpl': list(map(_mean, columns['unpl_sum'], columns['x_count'])),
+            'cl': list(map(_mean, columns['cl_sum'], columns['x_count'])),
+            'lnpl': list(map(_mean, columns['lnpl_sum'], columns['x_count'])),
+        }
+        if not self.include_lnpl:
+            del result['lnpl']
+
+        for name, flag in RULES.items():
+            result[name] = [bool(r & flag) for r in columns['rules']]
+
+        return result
+
+    @staticmethod
+    def _base_level(xmr: Base) -> Dict[str, list]:
+        level: Dict[str, list] = {k: [] for k in _COLUMNS}
+        values = zip(
+            xmr.counts,
+            xmr.moving_ranges(),
+            xmr.upper_natural_process_limit(),
+            xmr.x_central_line(),
+            xmr.lower_natural_process_limit(),
+            xmr.rule_1_x_indices_beyond_limits(),
+            xmr.rule_2_runs_about_central_line(),
+            xmr.rule_3_runs_near_limits(),
+            xmr.rule_1_mr_indices_beyond_limits(),
+        )
+        for x, mr, unpl, cl, lnpl, r1, r2, r3, mr1 in values:
+            has_x = x is not None
+            has_mr = mr is not None
+            level['x_count'].append(int(has_x))
+            level['x_sum'].append(x if has_x else 0)
+            level['x_min'].append(x)
+            level['x_max'].append(x)
+            level['mr_count'].append(int(has_mr))
+            level['mr_sum'].append(mr if has_mr else 0)
+            level['mr_min'].append(mr)
+            level['mr_max'].append(mr)
+            level['unpl_sum'].append(unpl if has_x else 0)
+            level['cl_sum'].append(cl if has_x else 0)
+            level['lnpl_sum'].append(lnpl if has_x else 0)
+            level['rules'].append(r1 * RULE_1 | r2 * RULE_2 | r3 * RULE_3 | mr1 * MR_RULE_1)
+        return level
+
+    def _next_level(self, level: Dict[str, list]) -> Dict[str, list]:
+        f = self.factor
+        n = math.ceil(len(level['rules']) / f)
+        result: Dict[str, list] = {}
+        for k in ('x_count', 'x_sum', 'mr_count', 'mr_sum', 'unpl_sum', 'cl_sum', 'lnpl_sum'):
+            column = level[k]
+            result[k] = [sum(column[i * f:(i + 1) * f]) for i in range(n)]
+        for k, func in (('x_min', min), ('x_max', max), ('mr_min', min), ('mr_max', max)):
+            column = level[k]
+            result[k] = [_skip_none(func, column[i * f:(i + 1) * f]) for i in range(n)]
+
+        rules = level['rules']
+        result['rules'] = [_any_flags(rules[i * f:(i + 1) * f]) for i in range(n)]
+        return result
+
+
+def _mean(total, count: int) -> Optional[Decimal]:
+    if not count:
+        return None
+    return round(Decimal(total) / Decimal(count), ROUNDING)
+
+
+def _skip_none(func, values: list):
+    values = [v for v in values if v is not None]
+    return func(values) if values else None
+
+
+def _any_flags(flags: List[int]) -> int:
+    result = 0
+    for r in flags:
+        result |= r
+    return result
@@ -0,0 +1,394 @@
+"""
+Declarative detection rules evaluated in a single pass.
+
+Rules are defined by how far points are from the central line in units of sigma, where sigma is a
+third of the distance between the central line and the natural process limits:
+
+    Zone(count, of, beyond)  `count` out of `of` successive points more than `beyond` sigma from
+                             the central line on the same side.  Zone(1, 1, 3) is a point outside
+                             the limits and Zone(8, 8, 0) is a run of 8 points on one side.  With
+                             net=True, points beyond on the other side are subtracted from `count`
+    Within(length, sigma)    `length` successive points within `sigma` of the central line
+    Outside(length, sigma)   `length` successive points more than `sigma` from the central line on
+                             either side
+    Trend(length)            `length` successive points that steadily increase or decrease
+    Alternating(length)      `length` successive points that alternate up and down
+
+A `RuleSet` compiles its rules so that each point is compared with each distinct zone boundary
+once and every rule is then updated from those comparisons in the same pass.  Each rule keeps a
+constant amount of state, e.g. bitmasks of the last points beyond a boundary, so the same compiled
+rules evaluate whole charts with `RuleSet.evaluate()` and streams with `RuleSet.evaluator()`.
+
+As with the rules of `XmR`, every point of the successive points that meet a rule is flagged and
+missing points (None) break successive points.  Points on a zone boundary are not beyond it.
+"""
+import abc
+
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .constants import ROUNDING
+from .types import TYPE_NUMERIC
+
+
+class Rule(abc.ABC):
+    # Number of successive points that meet the rule
+    length = 1
+
+    def boundaries(self) -> Tuple[Decimal, ...]:
+        """
+        Zone boundaries used by the rule in units of sigma
+        """
+        return ()
+
+    @abc.abstractmethod
+    def state(self, bits: Dict[Decimal, int]) -> '_State':
+        pass
+
+    def __repr__(self) -> str:
+        args = ', '.join(f'{k}={v}' for k, v in vars(self).items())
+        return f'{type(self).__name__}({args})'
+
+
+class Zone(Rule):
+    def __init__(self, count: int, of: int, beyond: TYPE_NUMERIC, net: bool = False):
+        """
+        :param net: Whether points beyond on the other side count against `count`, as they do for
+            `rule_3_runs_near_limits()`
+        """
+        assert 0 < count <= of
+        self.count = count
+        self.of = of
+        self.beyond = Decimal(str(beyond))
+        self.net = net
+
+    @property
+    def length(self) -> int:  # type: ignore[override]
+        return self.of
+
+    def boundaries(self) -> Tuple[Decimal, ...]:
+        return (self.beyond,)
+
+    def state(self, bits: Dict[Decimal, int]) -> '_State':
+        return _ZoneState(self.count, self.of, bits[self.beyond], self.net)
+
+
+class Within(Rule):
+    def __init__(self, length: int, sigma: TYPE_NUMERIC):
+        assert length > 0
+        self.length = length
+        self.sigma = Decimal(str(sigma))
+
+    def boundaries(self) -> Tuple[Decimal, ...]:
+        return (self.sigma,)
+
+    def state(self, bits: Dict[Decimal, int]) -> '_State':
+        return _RunState(self.length, bits[self.sigma], beyond=False)
+
+
+class Outside(Rule):
+    def __init__(self, length: int, sigma: TYPE_NUMERIC):
+        assert length > 0
+        self.length = length
+        self.sigma = Decimal(str(sigma))
+
+    def boundaries(self) -> Tuple[Decimal, ...]:
+        return (self.sigma,)
+
+    def state(self, bits: Dict[Decimal, int]) -> '_State':
+        return _RunState(self.length, bits[self.sigma], beyond=True)
+
+
+class Trend(Rule):
+    def __init__(self, length: int):
+        assert length > 1
+        self.length = length
+
+    def state(self, bits: Dict[Decimal, int]) -> '_State':
+        return _TrendState(self.length)
+
+
+class Alternating(Rule):
+    def __init__(self, length: int):
+        assert length > 2
+        self.length = length
+
+    def state(self, bits: Dict[Decimal, int]) -> '_State':
+        return _AlternatingState(self.length)
+
+
+class _State(abc.ABC):
+    @abc.abstractmethod
+    def step(self, up: int, down: int, direction: Optional[int]) -> bool:
+        """
+        Updates the state with the next point and returns whether the rule is met by the
+        successive points ending at this point
+
+        :param up: Bitmask of the boundaries the point is above
+        :param down: Bitmask of the boundaries the point is below
+        :param direction: Sign of the difference from the previous point or None if there is no
+            previous point
+        """
+
+    @abc.abstractmethod
+    def reset(self):
+        pass
+
+
+class _ZoneState(_State):
+    __slots__ = ('count', 'of', 'bit', 'net', 'mask', 'up', 'down', 'filled')
+
+    def __init__(self, count: int, of: int, bit: int, net: bool):
+        self.count = count
+        self.of = of
+        self.bit = bit
+        self.net = net
+        self.mask = (1 << of) - 1
+        self.reset()
+
+    def reset(self):
+        self.up = 0
+        self.down = 0
+        self.filled = 0
+
+    def step(self, up: int, down: int, direction: Optional[int]) -> bool:
+        self.up = ((self.up << 1) | bool(up & self.bit)) & self.mask
+        self.down = ((self.down << 1) | bool(down & self.bit)) & self.mask
+        self.filled += 1
+        if self.filled < self.of:
+            return False
+        up_count = bin(self.up).count('1')
+        down_count = bin(self.down).count('1')
+        if self.net:
+            return abs(up_count - down_count) >= self.count
+        return up_count >= self.count or down_count >= self.count
+
+
+class _RunState(_State):
+    __slots__ = ('length', 'bit', 'beyond', 'run')
+
+    def __init__(self, length: int, bit: int, beyond: bool):
+        self.length = length
+        self.bit = bit
+        self.beyond = beyond
+        self.run = 0
+
+    def reset(self):
+        self.run = 0
+
+    def step(self, up: int, down: int, direction: Optional[int]) -> bool:
+        if bool((up | down) & self.bit) == self.beyond:
+            self.run += 1
+        else:
+            self.run = 0
+        return self.run >= self.length
+
+
+class _TrendState(_State):
+    __slots__ = ('length', 'increasing', 'decreasing')
+
+    def __init__(self, length: int):
+        self.length = length
+        self.reset()
+
+    def reset(self):
+        self.increasing = 0
+        self.decreasing = 0
+
+    def step(self, up: int, down: int, direction: Optional[int]) -> bool:
+        if direction is not None and direction > 0:
+            self.increasing += 1
+            self.decreasing = 1
+        elif direction is not None and direction < 0:
+            self.decreasing += 1
+            self.increasing = 1
+        else:
+            self.increasing = 1
+            self.decreasing = 1
+        return max(self.increasing, self.decreasing) >= self.length
+
+
+class _AlternatingState(_State):
+    __slots__ = ('length', 'run', 'direction')
+
+    def __init__(self, length: int):
+        self.length = length
+        self.reset()
+
+    def reset(self):
+        self.run = 0
+        self.direction = 0
+
+    def step(self, up: int, down: int, direction: Optional[int]) -> bool:
+        if not direction:
+            self.run = 1
+        elif direction == -self.direction:
+            self.run += 1
+        else:
+            self.run = 2
+        self.direction = direction or 0
+        return self.run >= self.length
+
+
+class RuleSet:
+    def __init__(self, rules: Dict[str, Rule]):
+        """
+        Compiles rules for evaluation in a single pass
+
+        :param rules: Rules by name
+        """
+        assert rules
+        self.rules = dict(rules)
+        # Each distinct boundary gets a bit in the bitmasks of the boundaries a point is beyond
+        self.boundaries = sorted({b for rule in self.rules.values() for b in rule.boundaries()})
+        self._bits = {b: 1 << i for i, b in enumerate(self.boundaries)}
+        self._factors = [b / 3 for b in self.boundaries]
+
+    def __or__(self, other: 'RuleSet') -> 'RuleSet':
+        return RuleSet({**self.rules, **other.rules})
+
+    def zone_boundaries(self, cl: Decimal, unpl: Decimal, lnpl: Decimal) -> Tuple[List[Decimal], List[Decimal]]:
+        """
+        Returns the upper and lower zone boundaries of `boundaries` for the given lines
+        """
+        upper = unpl - cl
+        lower = cl - lnpl
+        return (
+            [round(cl + upper * f, ROUNDING) for f in self._factors],
+            [round(cl - lower * f, ROUNDING) for f in self._factors],
+        )
+
+    def evaluator(self) -> 'RuleEvaluator':
+        return RuleEvaluator(self)
+
+    def evaluate(
+            self,
+            counts: Sequence[Optional[Decimal]],
+            central_line: Sequence[Decimal],
+            upper_limit: Sequence[Decimal],
+            lower_limit: Sequence[Decimal],
+    ) -> Dict[str, List[bool]]:
+        """
+        Returns a list of booleans for each rule that is True at index i when counts[i] is one of the
+        successive points that meet the rule
+        """
+        names = list(self.rules)
+        lengths = [self.rules[name].length for name in names]
+        n = len(counts)
+        flags = [[False] * n for _ in names]
+        # Index of the last point flagged by each rule so points are flagged at most once
+        flagged_until = [-1] * len(names)
+
+        evaluator = self.evaluator()
+        for i, points in enumerate(zip(counts, central_line, upper_limit, lower_limit)):
+            for r in evaluator._step(*points):
+                start = max(i - lengths[r] + 1, flagged_until[r] + 1)
+                result = flags[r]
+                for j in range(start, i + 1):
+                    result[j] = True
+                flagged_until[r] = i
+
+        return dict(zip(names, flags))
+
+
+class RuleEvaluator:
+    def __init__(self, rule_set: RuleSet):
+        """
+        Evaluates the rules of a RuleSet one point at a time, e.g. for streams of counts
+        """
+        self.rule_set = rule_set
+        self.names = list(rule_set.rules)
+        self._states = [rule.state(rule_set._bits) for rule in rule_set.rules.values()]
+        self._previous: Optional[Decimal] = None
+        self._lines: Optional[Tuple[Decimal, Decimal, Decimal]] = None
+        self._upper: List[Decimal] = []
+        self._lower: List[Decimal] = []
+
+    def update(
+            self,
+            x: Optional[TYPE_NUMERIC],
+            central_line: TYPE_NUMERIC,
+            upper_limit: TYPE_NUMERIC,
+            lower_limit: TYPE_NUMERIC,
+    ) -> List[str]:
+        """
+        Adds the next point and returns the names of the rules that are met by the successive
+        points ending at this point
+        """
+        def to_decimal(v):
+            return v if v is None or isinstance(v, Decimal) else Decimal(str(v))
+
+        fired = self._step(to_decimal(x), to_decimal(central_line), to_decimal(upper_limit), to_decimal(lower_limit))
+        return [self.names[r] for r in fired]
+
+    def extend(self, points: Iterable[Tuple]) -> List[List[str]]:
+        return [self.update(*p) for p in points]
+
+    def _step(self, x: Optional[Decimal], cl: Decimal, unpl: Decimal, lnpl: Decimal) -> List[int]:
+        if x is None:
+            for state in self._states:
+                state.reset()
+            self._previous = None
+            return []
+
+        lines = (cl, unpl, lnpl)
+        if lines != self._lines:
+            # Boundaries only need to be computed again when the lines change, e.g. trending limits
+            self._lines = lines
+            self._upper, self._lower = self.rule_set.zone_boundaries(cl, unpl, lnpl)
+
+        return self.advance(x, self._upper, self._lower)
+
+    def advance(self, x, upper: Sequence, lower: Sequence) -> List[int]:
+        """
+        Adds the next point given the upper and lower zone boundaries returned by
+        `RuleSet.zone_boundaries()` and returns the indexes in `names` of the rules that are met.
+
+        This skips converting the point and the lines of `update()`, e.g. for simulations that
+        compare float points with boundaries converted to floats.  The point must not be None.
+        """
+        up = 0
+        down = 0
+        bit = 1
+        for u, w in zip(upper, lower):
+            if x > u:
+                up |= bit
+            elif x < w:
+                down |= bit
+            bit <<= 1
+
+        previous = self._previous
+        direction = None if previous is None else (x > previous) - (x < previous)
+        self._previous = x
+
+        return [r for r, state in enumerate(self._states) if state.step(up, down, direction)]
+
+
+# The detection rules of `XmR`: points outside the limits, runs of 8 on one side of the central
+# line and 3 out of 4 points beyond the halfway lines on the same side, net of points beyond the
+# other halfway line.  The results are the same as those of the rule_*_x methods, except that
+# points on the central line break runs for Rule 2 while `rule_2_runs_about_central_line()` skips
+# them
+WHEELER = RuleSet({
+    'rule_1': Zone(1, 1, 3),
+    'rule_2': Zone(8, 8, 0),
+    'rule_3': Zone(3, 4, Decimal('1.5'), net=True),
+})
+
+WESTERN_ELECTRIC = RuleSet({
+    'we_1': Zone(1, 1, 3),
+    'we_2': Zone(2, 3, 2),
+    'we_3': Zone(4, 5, 1),
+    'we_4': Zone(8, 8, 0),
+})
+
+NELSON = RuleSet({
+    'nelson_1': Zone(1, 1, 3),
+    'nelson_2': Zone(9, 9, 0),
+    'nelson_3': Trend(6),
+    'nelson_4': Alternating(14),
+    'nelson_5': Zone(2, 3, 2),
+    'nelson_6': Zone(4, 5, 1),
+    'nelson_7': Within(15, 1),
+    'nelson_8': Outside(8, 1),
+})
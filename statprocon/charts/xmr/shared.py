@@ -0,0 +1,289 @@
+import json
+import struct
+import sys
+
+from decimal import Decimal
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Sequence, Set
+
+from statprocon.snapshot import PackedDecimals, encode_decimals, view_decimals
+
+from .base import Base
+
+MAGIC = b'SPM'
+VERSION = 2
+
+_HEADER = struct.Struct('<3sBI')
+
+# Columns of Decimals (or None) stored for each point, by the Base method that computes them
+COLUMNS = (
+    'moving_ranges',
+)
+
+# Lines stored as a single value when they are constant, as they are for XmR, and otherwise as a
+# column, e.g. for XmRTrending
+LINES = (
+    'x_central_line',
+    'mr_central_line',
+    'upper_range_limit',
+    'upper_natural_process_limit',
+    'lower_natural_process_limit',
+    'upper_halfway_line',
+    'lower_halfway_line',
+)
+
+# Rule masks stored as a byte per point, by the Base method that computes them
+RULES = (
+    'rule_1_x_indices_beyond_limits',
+    'rule_2_runs_about_central_line',
+    'rule_3_runs_near_limits',
+    'rule_1_mr_indices_beyond_limits',
+)
+
+# Names of the shared memory published by this process, and inherited by forked processes, which
+# share the registration of the name with the resource tracker
+_published: Set[str] = set()
+
+
+class SharedChart(Base):
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        """
+        XmR chart whose counts, lines, limits and rule masks are stored in shared memory.
+
+        A producer process computes a chart once and publishes it with `publish()`.  Other
+        processes `attach()` to it by name and get a read-only chart with the same results as the
+        published chart, e.g. for `to_dict()`, plotting and detection rules, without computing it
+        again.
+
+        Constant lines and limits are stored once and returned as `[value] * n` like `XmR` does.
+        The counts and moving ranges are returned as `PackedDecimals` sequences that decode values
+        from the packed integers in shared memory as they are read, so each process doesn't hold
+        its own Decimal objects of them.  They can't be used after the chart is closed.  Rule masks
+        can be read in place with `rule_mask()`.
+
+        Use `publish()` or `attach()` rather than instantiating this class directly.
+        """
+        self.shm = shm
+        self.owner = owner
+        buf = shm.buf
+        assert buf is not None
+        self._buf: Optional[memoryview] = buf.toreadonly()
+
+        magic, version, length = _HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise ValueError(f'{shm.name} is not a shared chart')
+        if version != VERSION:
+            raise ValueError(f'Unsupported shared chart version {version}')
+        meta = json.loads(bytes(buf[_HEADER.size:_HEADER.size + length]))
+
+        self.n: int = meta['n']
+        self.i = meta['i']
+        self.j = meta['j']
+        self._x_central_line_uses = meta['x_central_line_uses']
+        self._moving_range_uses = meta['moving_range_uses']
+        self.limit_floor = Decimal(meta['limit_floor'])
+        self._lines: Dict[str, Decimal] = {k: Decimal(v) for k, v in meta['lines'].items()}
+        start = _HEADER.size + length
+        self._offsets: Dict[str, int] = {k: start + v for k, v in meta['offsets'].items()}
+        self._columns: Dict[str, Sequence[Optional[Decimal]]] = {}
+
+    @classmethod
+    def publish(cls, xmr: Base, name: Optional[str] = None) -> 'SharedChart':
+        """
+        Computes the results of xmr and stores them in a new block of shared memory.
+
+        The returned chart owns the shared memory.  Call `unlink()` when the chart is no longer
+        needed by any process.
+
+        :param xmr: The chart to publish.  XmRTrending charts are also supported
+        :param name: Optional name of the shared memory.  A unique name is generated by default
+        """
+        columns = {'counts': encode_decimals(xmr.counts)}
+        for column in COLUMNS:
+            columns[column] = encode_decimals(getattr(xmr, column)())
+        lines = {}
+        for line in LINES:
+            values = getattr(xmr, line)()
+            if values and values.count(values[0]) == len(values):
+                lines[line] = str(values[0])
+            else:
+                columns[line] = encode_decimals(values)
+        for rule in RULES:
+            columns[rule] = bytes(getattr(xmr, rule)())
+
+        # Offsets of the columns from the end of the metadata
+        offsets = {}
+        position = 0
+        for k, chunk in columns.items():
+            offsets[k] = position
+            position += len(chunk)
+        chunks = list(columns.values())
+
+        meta = {
+            'n': len(xmr.counts),
+            'i': xmr.i,
+            'j': xmr.j,
+            'x_central_line_uses': xmr._x_central_line_uses,
+            'moving_range_uses': xmr._moving_range_uses,
+            'limit_floor': str(xmr.limit_floor),
+            'lines': lines,
+            'offsets': offsets,
+        }
+        data = json.dumps(meta, separators=(',', ':')).encode()
+        chunks.insert(0, _HEADER.pack(MAGIC, VERSION, len(data)) + data)
+        end = _HEADER.size + len(data) + position
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=end)
+        _published.add(shm.name)
+        buf = shm.buf
+        assert buf is not None
+        position = 0
+        for chunk in chunks:
+            buf[position:position + len(chunk)] = chunk
+            position += len(chunk)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedChart':
+        """
+        Returns a read-only chart of the shared memory published with `name`
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # Before Python 3.13 the resource tracker of this process would remove the shared memory
+            # when this process exits, even though it is still used by the publisher.  The
+            # publisher and processes forked from it share its registration, which is kept so the
+            # shared memory is removed if the publisher exits without unlinking it
+            if shm.name not in _published:
+                resource_tracker.unregister(shm._name, 'shared_memory')  # type: ignore[attr-defined]
+        return cls(shm)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        """
+        Closes the shared memory in this process.  Memoryviews returned by `rule_mask()` must be
+        released first.
+        """
+        if self._buf is not None:
+            for column in self._columns.values():
+                if isinstance(column, PackedDecimals):
+                    column.release()
+            self._columns.clear()
+            self._buf.release()
+            self._buf = None
+            self.shm.close()
+
+    def unlink(self):
+        """
+        Closes and removes the shared memory.  Only the process that published the chart should
+        call this.
+        """
+        self.close()
+        if self.owner:
+            self.shm.unlink()
+            _published.discard(self.shm.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
+
+    @property
+    def counts(self) -> Sequence[Optional[Decimal]]:  # type: ignore[override]
+        return self._column('counts')
+
+    def rule_mask(self, rule: str) -> memoryview:
+        """
+        Returns a read-only view of the shared memory with a byte per point that is 1 where the
+        point meets the rule and 0 otherwise.
+
+        :param rule: Name of the rule method, e.g. 'rule_1_x_indices_beyond_limits'
+        """
+        assert rule in RULES
+        offset = self._offsets[rule]
+        return self._view()[offset:offset + self.n]
+
+    def moving_ranges(self) -> Sequence[Optional[Decimal]]:  # type: ignore[override]
+        return self._column('moving_ranges')
+
+    def x_to_dict(self, *args, **kwargs) -> dict:
+        return _to_lists(super().x_to_dict(*args, **kwargs))
+
+    def mr_to_dict(self) -> dict:
+        return _to_lists(super().mr_to_dict())
+
+    def x_central_line(self) -> Sequence[Decimal]:
+        return self._line('x_central_line')
+
+    def mr_central_line(self) -> Sequence[Decimal]:
+        return self._line('mr_central_line')
+
+    def upper_range_limit(self) -> Sequence[Decimal]:
+        return self._line('upper_range_limit')
+
+    def upper_natural_process_limit(self) -> Sequence[Decimal]:
+        return self._line('upper_natural_process_limit')
+
+    def lower_natural_process_limit(self) -> Sequence[Decimal]:
+        return self._line('lower_natural_process_limit')
+
+    def upper_halfway_line(self) -> Sequence[Decimal]:
+        return self._line('upper_halfway_line')
+
+    def lower_halfway_line(self) -> Sequence[Decimal]:
+        return self._line('lower_halfway_line')
+
+    def rule_1_x_indices_beyond_limits(
+            self,
+            upper_limit: Optional[Decimal] = None,
+            lower_limit: Optional[Decimal] = None,
+    ) -> List[bool]:
+        if upper_limit is not None or lower_limit is not None:
+            return super().rule_1_x_indices_beyond_limits(upper_limit, lower_limit)
+        return self._rule('rule_1_x_indices_beyond_limits')
+
+    def rule_1_mr_indices_beyond_limits(self) -> List[bool]:
+        return self._rule('rule_1_mr_indices_beyond_limits')
+
+    def rule_2_runs_about_central_line(self) -> List[bool]:
+        return self._rule('rule_2_runs_about_central_line')
+
+    def rule_3_runs_near_limits(self) -> List[bool]:
+        return self._rule('rule_3_runs_near_limits')
+
+    def _view(self) -> memoryview:
+        if self._buf is None:
+            raise ValueError('The shared chart is closed')
+        return self._buf
+
+    def _column(self, name: str) -> Sequence[Optional[Decimal]]:
+        if name not in self._columns:
+            self._columns[name] = view_decimals(self._view(), self._offsets[name])[0]
+        return self._columns[name]
+
+    def _line(self, name: str) -> Sequence[Decimal]:
+        if name in self._lines:
+            self._view()
+            return [self._lines[name]] * self.n
+        return self._column(name)  # type: ignore[return-value]
+
+    def _rule(self, name: str) -> List[bool]:
+        mask = self.rule_mask(name)
+        try:
+            return [bool(b) for b in mask]
+        finally:
+            mask.release()
+
+
+def _to_lists(result: dict) -> dict:
+    # The dictionaries are used after the chart is closed, e.g. when returned by another process
+    return {k: list(v) if isinstance(v, PackedDecimals) else v for k, v in result.items()}
@@ -0,0 +1,127 @@
+import math
+import random
+import statistics
+
+from decimal import Decimal
+from typing import List, Optional
+
+from .exceptions import InvalidCountsError
+
+# Ratio between the capacities of successive levels
+CAPACITY_RATIO = 2 / 3
+
+
+class KLLSketch:
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """
+        KLL quantile sketch.
+
+        Values are kept in levels of compactors.  When the sketch is full, a level is sorted and
+        every other value is promoted to the next level where it stands for twice as many values.
+        The memory used is bounded by roughly 3 * k values plus a few per level, updates take
+        O(1) amortized time and sketches of different shards can be merged.
+
+        Until the first compaction, quantiles are exact.  Afterwards the rank of a returned quantile
+        is typically within about 1.5% of the number of values for k = 200.  Larger k gives smaller
+        errors with more memory.
+
+        :param k: Capacity of the top level
+        :param seed: Seed of the random choices made by compactions, for reproducible results
+        """
+        assert k >= 8
+
+        self.k = k
+        self.n = 0
+        self._random = random.Random(seed)
+        self._compactors: List[List[Decimal]] = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def is_exact(self) -> bool:
+        return len(self._compactors) == 1
+
+    def update(self, x: Decimal):
+        self._compactors[0].append(x)
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        """
+        Adds the values of another sketch to this sketch
+        """
+        while len(self._compactors) < len(other._compactors):
+            self._compactors.append([])
+        for items, other_items in zip(self._compactors, other._compactors):
+            items.extend(other_items)
+
+        self.n += other.n
+        self._size = sum(map(len, self._compactors))
+        self._update_max_size()
+        while self._size >= self._max_size:
+            self._compress()
+
+    def quantile(self, q: float) -> Decimal:
+        """
+        Returns the value with rank q * n among the values added
+        """
+        assert 0 <= q <= 1
+        if not self.n:
+            raise InvalidCountsError('No values have been added to the sketch')
+
+        if self.is_exact:
+            values = sorted(self._compactors[0])
+            return values[min(len(values) - 1, int(q * len(values)))]
+
+        weighted = sorted(
+            (x, 1 << h)
+            for h, items in enumerate(self._compactors)
+            for x in items
+        )
+        target = q * self.n
+        total = 0
+        for x, weight in weighted:
+            total += weight
+            if total >= target:
+                return x
+        return weighted[-1][0]
+
+    def median(self) -> Decimal:
+        """
+        Returns the median.  While the sketch is exact, this is the same as `statistics.median()`.
+        """
+        if self.is_exact and self.n:
+            return statistics.median(self._compactors[0])
+        return self.quantile(0.5)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._compactors) - level - 1
+        return max(2, math.ceil(self.k * CAPACITY_RATIO ** depth))
+
+    def _update_max_size(self):
+        self._max_size = sum(self._capacity(h) for h in range(len(self._compactors)))
+
+    def _compress(self):
+        for h, items in enumerate(self._compactors):
+            if len(items) < self._capacity(h):
+                continue
+
+            if h + 1 == len(self._compactors):
+                self._compactors.append([])
+                self._update_max_size()
+
+            items.sort()
+            # With an odd number of values, the smallest value stays in this level
+            start = len(items) % 2
+            offset = self._random.getrandbits(1)
+            self._compactors[h + 1].extend(items[start + offset::2])
+            del items[start:]
+
+            self._size = sum(map(len, self._compactors))
+            if self._size < self._max_size:
+                break
@@ -0,0 +1,187 @@
+import copy
+import threading
+
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+
+from .base import AVERAGE, MEDIAN, SF_LIMITS, SF_RANGES
+from .constants import ROUNDING
+from .exceptions import InvalidCountsError
+from .sketch import KLLSketch
+from .types import TYPE_NUMERIC
+
+
+class Streaming:
+    def __init__(
+            self,
+            x_central_line_uses: str = AVERAGE,
+            moving_range_uses: str = AVERAGE,
+            limit_floor: TYPE_NUMERIC = Decimal('-Infinity'),
+            k: int = 200,
+            seed: Optional[int] = None,
+    ):
+        """
+        XmR limits of an unbounded stream of counts computed with fixed memory.
+
+        Averages are computed from running sums and are the same as those of `XmR`.  Medians are
+        approximated with a `KLLSketch` of the counts or moving ranges.  While fewer than about
+        `k` values have been added they are exact, afterwards the rank of the median is typically
+        within about 1.5% of the number of values.
+
+        The counts are not stored, so the lines and limits are returned as single values rather
+        than a value per count.
+
+        A stream can be updated and read from several threads.  Updates are serialized by a lock,
+        and `to_dict()` returns lines and limits computed from the same counts.
+
+        :param k: Size of the sketches used for medians
+        :param seed: Seed of the sketches for reproducible results
+        """
+        assert x_central_line_uses in [AVERAGE, MEDIAN]
+        assert moving_range_uses in [AVERAGE, MEDIAN]
+
+        self._x_central_line_uses = x_central_line_uses
+        self._moving_range_uses = MEDIAN if x_central_line_uses == MEDIAN else moving_range_uses
+        self.limit_floor = limit_floor
+
+        self.n = 0
+        self._last: Optional[Decimal] = None
+        self._x_sum = Decimal('0')
+        self._x_n = 0
+        self._mr_sum = Decimal('0')
+        self._mr_n = 0
+        self._x_sketch = KLLSketch(k, seed) if self._x_central_line_uses == MEDIAN else None
+        self._mr_sketch = KLLSketch(k, seed) if self._moving_range_uses == MEDIAN else None
+
+        # Reentrant so the limits can compute the central lines while holding it
+        self._lock = threading.RLock()
+        self._version = 0
+        self._dict: Optional[Tuple[int, dict]] = None
+
+    def update(self, x: Optional[TYPE_NUMERIC]):
+        """
+        Adds the next count.  A missing count (None) is skipped and breaks the moving ranges.
+        """
+        with self._lock:
+            self._update(x)
+            self._version += 1
+
+    def extend(self, xs: Iterable[Optional[TYPE_NUMERIC]]):
+        with self._lock:
+            for x in xs:
+                self._update(x)
+            self._version += 1
+
+    def _update(self, x: Optional[TYPE_NUMERIC]):
+        self.n += 1
+        if x is None:
+            self._last = None
+            return
+
+        value = x if isinstance(x, Decimal) else Decimal(str(x))
+        self._x_sum += value
+        self._x_n += 1
+        if self._x_sketch is not None:
+            self._x_sketch.update(value)
+
+        if self._last is not None:
+            mr = abs(value - self._last)
+            self._mr_sum += mr
+            self._mr_n += 1
+            if self._mr_sketch is not None:
+                self._mr_sketch.update(mr)
+        self._last = value
+
+    def merge(self, other: 'Streaming'):
+        """
+        Adds the counts of another stream, e.g. from another shard of the same process.
+        The moving range between the last count of this stream and the first count of the other
+        stream is not included.
+        """
+        assert self._x_central_line_uses == other._x_central_line_uses
+        assert self._moving_range_uses == other._moving_range_uses
+
+        # Copy the other stream first so the two locks are never held together
+        with other._lock:
+            n, x_sum, x_n, mr_sum, mr_n = other.n, other._x_sum, other._x_n, other._mr_sum, other._mr_n
+            x_sketch = copy.deepcopy(other._x_sketch)
+            mr_sketch = copy.deepcopy(other._mr_sketch)
+
+        with self._lock:
+            self.n += n
+            self._x_sum += x_sum
+            self._x_n += x_n
+            self._mr_sum += mr_sum
+            self._mr_n += mr_n
+            if self._x_sketch is not None:
+                self._x_sketch.merge(x_sketch)  # type: ignore[arg-type]
+            if self._mr_sketch is not None:
+                self._mr_sketch.merge(mr_sketch)  # type: ignore[arg-type]
+            self._version += 1
+
+    def x_central_line(self) -> Decimal:
+        with self._lock:
+            if self._x_sketch is not None:
+                value = self._median(self._x_sketch)
+            else:
+                value = self._mean(self._x_sum, self._x_n)
+        return round(value, ROUNDING)
+
+    def mr_central_line(self) -> Decimal:
+        with self._lock:
+            if self._mr_sketch is not None:
+                value = self._median(self._mr_sketch)
+            else:
+                value = self._mean(self._mr_sum, self._mr_n)
+        return round(value, ROUNDING)
+
+    def upper_range_limit(self) -> Decimal:
+        return round(SF_RANGES[self._moving_range_uses] * self.mr_central_line(), ROUNDING)
+
+    def upper_natural_process_limit(self) -> Decimal:
+        sf = SF_LIMITS[self._moving_range_uses]
+        return round(self.x_central_line() + sf * self.mr_central_line(), ROUNDING)
+
+    def lower_natural_process_limit(self) -> Decimal:
+        """
+        Returns the Lower Natural Process Limit without taking into account the `limit_floor`
+        """
+        sf = SF_LIMITS[self._moving_range_uses]
+        return round(self.x_central_line() - sf * self.mr_central_line(), ROUNDING)
+
+    def is_lnpl_above_floor(self):
+        return self.lower_natural_process_limit() > self.limit_floor
+
+    def to_dict(self) -> dict:
+        """
+        Returns the lines and limits with the keys used by `XmR.to_dict()`.
+        The result is cached until the next update, so readers polling the stream share it.
+        """
+        cached = self._dict
+        if cached is not None and cached[0] == self._version:
+            return dict(cached[1])
+
+        with self._lock:
+            result = {
+                'x_unpl': self.upper_natural_process_limit(),
+                'x_cl': self.x_central_line(),
+                'x_lnpl': self.lower_natural_process_limit(),
+                'mr_url': self.upper_range_limit(),
+                'mr_cl': self.mr_central_line(),
+            }
+            if not self.is_lnpl_above_floor():
+                del result['x_lnpl']
+            self._dict = (self._version, result)
+        return dict(result)
+
+    @staticmethod
+    def _mean(total: Decimal, n: int) -> Decimal:
+        if not n:
+            raise InvalidCountsError('Not enough data points in the stream')
+        return Decimal(str(total)) / Decimal(str(n))
+
+    @staticmethod
+    def _median(sketch: KLLSketch) -> Decimal:
+        if not len(sketch):
+            raise InvalidCountsError('Not enough data points in the stream')
+        return sketch.median()
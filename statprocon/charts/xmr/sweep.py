@@ -0,0 +1,152 @@
+import itertools
+
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, cast
+
+from .base import AVERAGE, Base, MEDIAN, Precomputed
+from .constants import ROUNDING
+from .exceptions import InvalidCountsError
+from .types import TYPE_COUNTS_INPUT, TYPE_NUMERIC
+
+TYPE_SUBSET = Tuple[int, Optional[int]]
+
+# Rule methods counted for each configuration by the key used in the results
+RULES = {
+    'rule_1': 'rule_1_x_indices_beyond_limits',
+    'rule_2': 'rule_2_runs_about_central_line',
+    'rule_3': 'rule_3_runs_near_limits',
+    'mr_rule_1': 'rule_1_mr_indices_beyond_limits',
+}
+
+
+def sweep(
+        counts: TYPE_COUNTS_INPUT,
+        x_central_line_uses: Iterable[str] = (AVERAGE, MEDIAN),
+        moving_range_uses: Iterable[str] = (AVERAGE, MEDIAN),
+        limit_floors: Iterable[TYPE_NUMERIC] = (Decimal('-Infinity'),),
+        subsets: Iterable[TYPE_SUBSET] = ((0, None),),
+) -> List[dict]:
+    """
+    Computes the limits and the number of points that meet each detection rule for every
+    combination of options of one series.
+
+    The counts are converted and the moving ranges computed once.  The averages of each subset are
+    computed from prefix sums and the medians from a single sort of all the values, so each
+    configuration costs about as much as its detection rules.  The results are the same as those
+    of `XmR` with the same options.
+
+    Combinations that result in the same chart, e.g. a median X central line with either moving
+    range, are only included once.
+
+    :param x_central_line_uses: Values of `x_central_line_uses` to include
+    :param moving_range_uses: Values of `moving_range_uses` to include
+    :param limit_floors: Values of `limit_floor` to include
+    :param subsets: (subset_start_index, subset_end_index) pairs of the baseline windows to include
+    :return: list of a dict per configuration with the options, 'x_cl', 'unpl', 'lnpl' (None when
+        not above the floor), 'mr_cl', 'url' and the number of points that meet each rule in
+        `RULES`
+    """
+    values = cast(List[Optional[Decimal]], Base.to_decimal_list(counts))
+    n = len(values)
+    if n - values.count(None) < 2:
+        raise InvalidCountsError('Provide at least 2 data points that are not None')
+    if not Base.has_moving_range(values):
+        raise InvalidCountsError('Provide at least 2 successive data points that are not None')
+
+    prev = values[0]
+    moving_ranges: List[Optional[Decimal]] = [None]
+    for x in itertools.islice(values, 1, None):
+        moving_ranges.append(None if x is None or prev is None else abs(x - prev))
+        prev = x
+
+    x_stats = _Statistics(values)
+    mr_stats = _Statistics(moving_ranges)
+
+    configurations = []
+    for x_uses, mr_uses in itertools.product(x_central_line_uses, moving_range_uses):
+        assert x_uses in [AVERAGE, MEDIAN]
+        assert mr_uses in [AVERAGE, MEDIAN]
+        mr_uses = MEDIAN if x_uses == MEDIAN else mr_uses
+        if (x_uses, mr_uses) not in configurations:
+            configurations.append((x_uses, mr_uses))
+
+    floors = list(limit_floors)
+    result = []
+    for start, end in subsets:
+        i = max(0, start)
+        j = min(n, end) if end else n
+        assert i <= j
+        if not Base.has_moving_range(values, i, j):
+            raise InvalidCountsError(
+                f'Provide at least 2 successive data points that are not None between {i} and {j}'
+            )
+
+        for x_uses, mr_uses in configurations:
+            x_cl = round(x_stats.central_line(x_uses, i, j), ROUNDING)
+            mr_cl = round(mr_stats.central_line(mr_uses, i + 1, j), ROUNDING)
+            chart = Precomputed(values, x_cl, mr_cl, x_uses, mr_uses, moving_ranges=moving_ranges)
+            rules = {k: sum(getattr(chart, method)()) for k, method in RULES.items()}
+            unpl = chart.upper_natural_process_limit()[0]
+            lnpl = chart.lower_natural_process_limit()[0]
+            url = chart.upper_range_limit()[0]
+
+            for floor in floors:
+                result.append({
+                    'x_central_line_uses': x_uses,
+                    'moving_range_uses': mr_uses,
+                    'subset_start_index': start,
+                    'subset_end_index': end,
+                    'limit_floor': floor,
+                    'unpl': unpl,
+                    'x_cl': x_cl,
+                    'lnpl': lnpl if lnpl > floor else None,
+                    'url': url,
+                    'mr_cl': mr_cl,
+                    **rules,
+                })
+
+    return result
+
+
+class _Statistics:
+    def __init__(self, values: Sequence[Optional[Decimal]]):
+        """
+        Prefix sums and sorted order of values shared by the central lines of every subset
+        """
+        self.values = values
+        self.sums = [Decimal('0')]
+        self.counts = [0]
+        for x in values:
+            if x is None:
+                self.sums.append(self.sums[-1])
+                self.counts.append(self.counts[-1])
+            else:
+                self.sums.append(self.sums[-1] + x)
+                self.counts.append(self.counts[-1] + 1)
+        self._order: Optional[List[int]] = None
+        self._sorted: Dict[Tuple[int, int], List[Decimal]] = {}
+
+    def central_line(self, uses: str, i: int, j: int) -> Decimal:
+        if uses == AVERAGE:
+            n = self.counts[j] - self.counts[i]
+            if not n:
+                raise InvalidCountsError(f'No data points between {i} and {j}')
+            return Decimal(str(self.sums[j] - self.sums[i])) / Decimal(str(n))
+
+        values = self._sorted_values(i, j)
+        n = len(values)
+        if not n:
+            raise InvalidCountsError(f'No data points between {i} and {j}')
+        if n % 2:
+            return values[n // 2]
+        return (values[n // 2 - 1] + values[n // 2]) / 2
+
+    def _sorted_values(self, i: int, j: int) -> List[Decimal]:
+        if self._order is None:
+            # Sort once and take the values of each subset in sorted order in linear time
+            valid = [k for k, x in enumerate(self.values) if x is not None]
+            self._order = sorted(valid, key=lambda k: cast(Decimal, self.values[k]))
+        if (i, j) not in self._sorted:
+            self._sorted[(i, j)] = [self.values[k] for k in self._order if i <= k < j]  # type: ignore[misc]
+        return self._sorted[(i, j)]
+
@@ -13,7 +13,7 @@ else:
 TYPE_COUNT_VALUE: TypeAlias = Union[Decimal, int]
 TYPE_MOVING_RANGE_VALUE: TypeAlias = Union[Decimal, int, None]
 
-TYPE_COUNTS_INPUT: TypeAlias = Sequence[Union[TYPE_COUNT_VALUE, float]]
+TYPE_COUNTS_INPUT: TypeAlias = Sequence[Union[TYPE_COUNT_VALUE, float, None]]
 TYPE_COUNTS: TypeAlias = Sequence[TYPE_COUNT_VALUE]
 TYPE_MOVING_RANGES: TypeAlias = Sequence[TYPE_MOVING_RANGE_VALUE]
 
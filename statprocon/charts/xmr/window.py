@@ -0,0 +1,232 @@
+import bisect
+import threading
+
+from decimal import Decimal
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .base import AVERAGE, Base, MEDIAN, Precomputed
+from .constants import ROUNDING
+from .exceptions import InvalidCountsError
+from .types import TYPE_NUMERIC
+
+
+class Window(Base):
+    def __init__(
+            self,
+            size: int,
+            counts: Iterable[Optional[TYPE_NUMERIC]] = (),
+            x_central_line_uses: str = AVERAGE,
+            moving_range_uses: str = AVERAGE,
+            limit_floor: TYPE_NUMERIC = Decimal('-Infinity'),
+    ):
+        """
+        XmR chart of the last `size` counts.
+
+        Counts are appended to a preallocated ring buffer so memory stays constant.  The sums of
+        the counts and moving ranges in the window are updated as counts enter and leave the window
+        so appending a count and computing the limits take constant time.  With the median, sorted
+        copies of the window are kept up to date with binary search instead.
+
+        The same methods as `XmR` are available for the counts in the window.
+
+        Appends from several threads are serialized by a lock.  The central lines are published
+        after each append so reading them doesn't take the lock.  Other methods read the counts and
+        lines separately, so use `snapshot()` to read a consistent chart while counts are appended.
+
+        :param size: Maximum number of counts in the window
+        :param counts: Optional initial counts
+        """
+        assert size >= 2
+        assert x_central_line_uses in [AVERAGE, MEDIAN]
+        assert moving_range_uses in [AVERAGE, MEDIAN]
+
+        self.size = size
+        self.i = 0
+        self._x_central_line_uses = x_central_line_uses
+        self._moving_range_uses = MEDIAN if x_central_line_uses == MEDIAN else moving_range_uses
+        self.limit_floor = limit_floor
+
+        self._buffer: List[Optional[Decimal]] = [None] * size
+        self._start = 0
+        self._n = 0
+        self._counts: Optional[List[Optional[Decimal]]] = None
+
+        self._x_sum = Decimal('0')
+        self._x_n = 0
+        self._mr_sum = Decimal('0')
+        self._mr_n = 0
+        self._x_sorted: List[Decimal] = []
+        self._mr_sorted: List[Decimal] = []
+
+        self._lock = threading.Lock()
+        self._version = 0
+        # (x central line, moving range central line, number of counts) replaced after each append
+        self._lines: Tuple[Optional[Decimal], Optional[Decimal], int] = (None, None, 0)
+        self._snapshot: Optional[Tuple[int, Precomputed]] = None
+
+        self.extend(counts)
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def j(self) -> int:  # type: ignore[override]
+        return self._n
+
+    @property
+    def counts(self) -> List[Optional[Decimal]]:  # type: ignore[override]
+        """
+        The counts in the window from oldest to newest
+        """
+        counts = self._counts
+        if counts is None:
+            with self._lock:
+                if self._counts is None:
+                    self._counts = self._ordered_counts()
+                counts = self._counts
+        return counts
+
+    def snapshot(self) -> Precomputed:
+        """
+        Returns an immutable XmR chart of the counts currently in the window.
+        The same chart is returned until the next append.
+        """
+        cached = self._snapshot
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot[0] != self._version:
+                x_cl, mr_cl, _ = self._lines
+                if x_cl is None or mr_cl is None:
+                    raise InvalidCountsError('Not enough data points in the window')
+                chart = Precomputed(
+                    self._ordered_counts(),
+                    x_cl,
+                    mr_cl,
+                    self._x_central_line_uses,
+                    self._moving_range_uses,
+                    self.limit_floor,
+                )
+                self._snapshot = (self._version, chart)
+            return self._snapshot[1]
+
+    def append(self, x: Optional[TYPE_NUMERIC]):
+        """
+        Adds a count to the window, removing the oldest count when the window is full
+        """
+        with self._lock:
+            self._append(x)
+            self._publish()
+
+    def extend(self, xs: Iterable[Optional[TYPE_NUMERIC]]):
+        with self._lock:
+            for x in xs:
+                self._append(x)
+            self._publish()
+
+    def x_central_line(self) -> Sequence[Decimal]:
+        x_cl, _, n = self._lines
+        if x_cl is None:
+            raise InvalidCountsError('Not enough data points in the window')
+        return [x_cl] * n
+
+    def mr_central_line(self) -> Sequence[Decimal]:
+        _, mr_cl, n = self._lines
+        if mr_cl is None:
+            raise InvalidCountsError('Not enough data points in the window')
+        return [mr_cl] * n
+
+    def _ordered_counts(self) -> List[Optional[Decimal]]:
+        """
+        Returns the counts in the window from oldest to newest.  Called with the lock held.
+        """
+        end = self._start + self._n
+        return self._buffer[self._start:min(end, self.size)] + self._buffer[:max(0, end - self.size)]
+
+    def _append(self, x: Optional[TYPE_NUMERIC]):
+        value = None if x is None else (x if isinstance(x, Decimal) else Decimal(str(x)))
+
+        if self._n == self.size:
+            oldest = self._buffer[self._start]
+            self._remove_mr(oldest, self._buffer[(self._start + 1) % self.size])
+            self._remove_x(oldest)
+            self._start = (self._start + 1) % self.size
+            self._n -= 1
+
+        if self._n:
+            self._add_mr(self._buffer[(self._start + self._n - 1) % self.size], value)
+        self._add_x(value)
+
+        self._buffer[(self._start + self._n) % self.size] = value
+        self._n += 1
+
+    def _publish(self):
+        """
+        Replaces the central lines read by other threads.  Called with the lock held.
+        """
+        if self._x_central_line_uses == AVERAGE:
+            x_cl = self._incremental_mean(self._x_sum, self._x_n)
+        else:
+            x_cl = self._incremental_median(self._x_sorted)
+        if self._moving_range_uses == AVERAGE:
+            mr_cl = self._incremental_mean(self._mr_sum, self._mr_n)
+        else:
+            mr_cl = self._incremental_median(self._mr_sorted)
+
+        self._counts = None
+        self._lines = (
+            None if x_cl is None else round(x_cl, ROUNDING),
+            None if mr_cl is None else round(mr_cl, ROUNDING),
+            self._n,
+        )
+        self._version += 1
+
+    def _add_x(self, x: Optional[Decimal]):
+        if x is None:
+            return
+        self._x_sum += x
+        self._x_n += 1
+        if self._x_central_line_uses == MEDIAN:
+            bisect.insort(self._x_sorted, x)
+
+    def _remove_x(self, x: Optional[Decimal]):
+        if x is None:
+            return
+        self._x_sum -= x
+        self._x_n -= 1
+        if self._x_central_line_uses == MEDIAN:
+            del self._x_sorted[bisect.bisect_left(self._x_sorted, x)]
+
+    def _add_mr(self, prev: Optional[Decimal], x: Optional[Decimal]):
+        if prev is None or x is None:
+            return
+        mr = abs(x - prev)
+        self._mr_sum += mr
+        self._mr_n += 1
+        if self._moving_range_uses == MEDIAN:
+            bisect.insort(self._mr_sorted, mr)
+
+    def _remove_mr(self, prev: Optional[Decimal], x: Optional[Decimal]):
+        if prev is None or x is None:
+            return
+        mr = abs(x - prev)
+        self._mr_sum -= mr
+        self._mr_n -= 1
+        if self._moving_range_uses == MEDIAN:
+            del self._mr_sorted[bisect.bisect_left(self._mr_sorted, mr)]
+
+    @staticmethod
+    def _incremental_mean(total: Decimal, n: int) -> Optional[Decimal]:
+        if not n:
+            return None
+        return Decimal(str(total)) / Decimal(str(n))
+
+    @staticmethod
+    def _incremental_median(values: List[Decimal]) -> Optional[Decimal]:
+        n = len(values)
+        if not n:
+            return None
+        if n % 2:
+            return values[n // 2]
+        return (values[n // 2 - 1] + values[n // 2]) / 2
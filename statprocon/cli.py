@@ -0,0 +1,203 @@
+"""
+Compute XmR chart data for one or many series from CSV or JSONL files.
+
+Rows are read in a streaming fashion and grouped into series by the `--key` column.
+Rows of a series must be contiguous in the input, i.e. sorted by key, so that only one series
+is held in memory per worker at a time.
+"""
+import argparse
+import csv
+import functools
+import itertools
+import json
+import sys
+
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from decimal import Decimal
+from typing import Callable, Deque, IO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from statprocon import XmR, XmRTrending
+from statprocon.charts.xmr.base import AVERAGE, CSV_HEADER, MEDIAN
+from statprocon.charts.xmr.exceptions import InvalidCountsError
+
+RULE_HEADER = ['x_rule_1', 'x_rule_2', 'x_rule_3', 'mr_rule_1']
+CHARTS = ('xmr', 'trending')
+FORMATS = ('csv', 'jsonl')
+
+TYPE_SERIES = Tuple[Optional[str], list]
+TYPE_RESULT = Tuple[Optional[str], List[tuple]]
+
+LNPL_INDEX = CSV_HEADER.index('x_lnpl')
+
+
+def read_rows(f: IO[str], input_format: str) -> Iterator[dict]:
+    if input_format == 'csv':
+        yield from csv.DictReader(f)
+    else:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_series(
+        files: Sequence[str],
+        value: str,
+        key: Optional[str] = None,
+        input_format: Optional[str] = None,
+) -> Iterator[TYPE_SERIES]:
+    """
+    Yields (key, counts) for each series in the files.
+    Consecutive rows with the same key belong to the same series.
+    """
+    for path in files:
+        fmt = input_format or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+        if path == '-':
+            yield from _group(read_rows(sys.stdin, fmt), value, key)
+        else:
+            with open(path, newline='') as f:
+                yield from _group(read_rows(f, fmt), value, key)
+
+
+def compute(series: TYPE_SERIES, options: dict) -> TYPE_RESULT:
+    """
+    Returns the key and the output rows of a series.
+    The LNPL is blank when it is not above the limit floor, as in `XmR.to_dict()`.
+    """
+    key, counts = series
+    chart_kwargs = dict(options)
+    chart = chart_kwargs.pop('chart')
+
+    xmr = XmR(counts, **chart_kwargs)
+    if chart == 'trending':
+        xmr = XmRTrending(xmr)
+
+    rows = zip(
+        xmr.iter_rows(),
+        xmr.rule_1_x_indices_beyond_limits(),
+        xmr.rule_2_runs_about_central_line(),
+        xmr.rule_3_runs_near_limits(),
+        xmr.rule_1_mr_indices_beyond_limits(),
+    )
+    if xmr.is_lnpl_above_floor():
+        return key, [values + tuple(rules) for values, *rules in rows]
+    return key, [values[:LNPL_INDEX] + (None,) + values[LNPL_INDEX + 1:] + tuple(rules) for values, *rules in rows]
+
+
+def compute_all(
+        series: Iterable[TYPE_SERIES],
+        options: dict,
+        executor: Optional[Executor] = None,
+        max_pending: int = 2,
+) -> Iterator[TYPE_RESULT]:
+    """
+    Computes each series in order.
+    When an executor is provided, at most `max_pending` series are read ahead of the output.
+    Series that can't be charted, e.g. with fewer than 2 counts, are reported on stderr and skipped.
+    """
+    if executor is None:
+        for s in series:
+            yield from _skip_invalid(s[0], functools.partial(compute, s, options))
+        return
+
+    pending: Deque[Tuple[Optional[str], Future]] = deque()
+    for s in series:
+        pending.append((s[0], executor.submit(compute, s, options)))
+        if len(pending) >= max_pending:
+            key, future = pending.popleft()
+            yield from _skip_invalid(key, future.result)
+
+    while pending:
+        key, future = pending.popleft()
+        yield from _skip_invalid(key, future.result)
+
+
+def write_csv(out: IO[str], results: Iterable[TYPE_RESULT], key: Optional[str]):
+    writer = csv.writer(out)
+    writer.writerow(([key] if key else []) + CSV_HEADER + RULE_HEADER)
+    for k, rows in results:
+        prefix = (k,) if key else ()
+        writer.writerows(prefix + row for row in rows)
+
+
+def write_jsonl(out: IO[str], results: Iterable[TYPE_RESULT], key: Optional[str]):
+    header = CSV_HEADER + RULE_HEADER
+    for k, rows in results:
+        for row in rows:
+            values = ','.join(f'"{h}":{_json_value(v)}' for h, v in zip(header, row))
+            if key:
+                values = f'{json.dumps(key)}:{json.dumps(k)},' + values
+            out.write('{' + values + '}\n')
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog='statprocon', description=__doc__)
+    parser.add_argument('files', nargs='*', default=['-'], help='CSV or JSONL files. Use - for stdin (default)')
+    parser.add_argument('--value', default='value', help='Column containing the counts. Defaults to "value"')
+    parser.add_argument('--key', help='Column identifying the series of each row')
+    parser.add_argument('--input-format', choices=FORMATS, help='Defaults to the file extension or csv')
+    parser.add_argument('--output-format', choices=FORMATS, default='csv')
+    parser.add_argument('--chart', choices=CHARTS, default='xmr')
+    parser.add_argument('--x-central-line-uses', choices=(AVERAGE, MEDIAN), default=AVERAGE)
+    parser.add_argument('--moving-range-uses', choices=(AVERAGE, MEDIAN), default=AVERAGE)
+    parser.add_argument('--subset-start-index', type=int, default=0)
+    parser.add_argument('--subset-end-index', type=int)
+    parser.add_argument('--limit-floor', type=Decimal, default=Decimal('-Infinity'))
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+    args = parser.parse_args(argv)
+
+    options = {
+        'chart': args.chart,
+        'x_central_line_uses': args.x_central_line_uses,
+        'moving_range_uses': args.moving_range_uses,
+        'subset_start_index': args.subset_start_index,
+        'subset_end_index': args.subset_end_index,
+        'limit_floor': args.limit_floor,
+    }
+    series = read_series(args.files, args.value, args.key, args.input_format)
+    write = write_csv if args.output_format == 'csv' else write_jsonl
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            write(sys.stdout, compute_all(series, options, executor, max_pending=2 * args.workers), args.key)
+    else:
+        write(sys.stdout, compute_all(series, options), args.key)
+
+
+def _group(rows: Iterable[dict], value: str, key: Optional[str]) -> Iterator[TYPE_SERIES]:
+    if key is None:
+        yield None, [_count(row[value]) for row in rows]
+        return
+
+    for k, group in itertools.groupby(rows, key=lambda row: row[key]):
+        yield str(k), [_count(row[value]) for row in group]
+
+
+def _skip_invalid(key: Optional[str], result: Callable[[], TYPE_RESULT]) -> Iterator[TYPE_RESULT]:
+    try:
+        r = result()
+    except InvalidCountsError as e:
+        series = '' if key is None else f' {key}'
+        print(f'statprocon: skipping series{series}: {e}', file=sys.stderr)
+        return
+    yield r
+
+
+def _count(value):
+    # CSV values are strings which are converted to Decimal by XmR without loss
+    # Empty values are missing
+    if isinstance(value, str):
+        return Decimal(value) if value.strip() else None
+    return value
+
+
+def _json_value(value) -> str:
+    if value is None or (isinstance(value, Decimal) and not value.is_finite()):
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+DataFrame accessors that compute XmR chart columns for long-format data.
+
+Importing this module registers a `spc` accessor on pandas DataFrames and a `spc` namespace on
+Polars DataFrames for whichever of the libraries are installed:
+
+    import statprocon.dataframe
+
+    df.spc.xmr(value='v', by='metric')
+
+Each group is a separate series.  Moving ranges, limits and detection rules are computed with
+group-wise vectorized operations on floats rather than by building an XmR object per group, so
+the results are not rounded like the `Decimal` results of XmR.
+Points equal to the central line neither extend nor break a run for Rule 2.
+Missing values (NaN or null) are skipped by the limits and break runs like they do for XmR.
+"""
+from typing import Any, List, Union
+
+from statprocon.charts.xmr.base import AVERAGE, MEDIAN, SF_LIMITS, SF_RANGES
+
+TYPE_BY = Union[None, str, List[str]]
+
+COLUMNS = (
+    'x_unpl',
+    'x_cl',
+    'x_lnpl',
+    'mr_values',
+    'mr_url',
+    'mr_cl',
+    'x_rule_1',
+    'x_rule_2',
+    'x_rule_3',
+    'mr_rule_1',
+)
+
+
+def _uses(x_central_line_uses: str, moving_range_uses: str):
+    assert x_central_line_uses in [AVERAGE, MEDIAN]
+    assert moving_range_uses in [AVERAGE, MEDIAN]
+
+    if x_central_line_uses == MEDIAN:
+        moving_range_uses = MEDIAN
+
+    return (
+        x_central_line_uses,
+        moving_range_uses,
+        float(SF_LIMITS[moving_range_uses]),
+        float(SF_RANGES[moving_range_uses]),
+    )
+
+
+def _agg(uses: str) -> str:
+    return 'mean' if uses == AVERAGE else 'median'
+
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None  # type: ignore[assignment]
+
+if pd is not None:
+    import numpy as np
+
+    @pd.api.extensions.register_dataframe_accessor('spc')
+    class PandasAccessor:
+        def __init__(self, df):
+            self._df = df
+
+        def xmr(
+                self,
+                value: str,
+                by: TYPE_BY = None,
+                x_central_line_uses: str = AVERAGE,
+                moving_range_uses: str = AVERAGE,
+        ):
+            """
+            Returns a copy of the DataFrame with the XmR chart columns in `COLUMNS` added
+
+            :param value: Column containing the counts
+            :param by: Optional column or list of columns identifying each series
+            :param x_central_line_uses: Whether to use the 'average' or 'median' for computing the X
+                central line
+            :param moving_range_uses: Whether to use the 'average' or 'median' moving range
+            """
+            x_uses, mr_uses, sf_limits, sf_ranges = _uses(x_central_line_uses, moving_range_uses)
+
+            df = self._df
+            x = df[value].astype('float64')
+            keys: Any
+            if by is None:
+                keys = np.zeros(len(df), dtype=np.int8)
+            elif isinstance(by, str):
+                keys = df[by]
+            else:
+                keys = [df[c] for c in by]
+
+            g = x.groupby(keys, sort=False)
+            mr = g.diff().abs()
+            x_cl = g.transform(_agg(x_uses))
+            mr_cl = mr.groupby(keys, sort=False).transform(_agg(mr_uses))
+
+            unpl = x_cl + sf_limits * mr_cl
+            lnpl = x_cl - sf_limits * mr_cl
+            url = sf_ranges * mr_cl
+
+            # Rule 2: runs of 8 or more points on the same side of the central line
+            missing = x.isna()
+            group = g.ngroup()
+            side = np.sign(x - x_cl).replace(0, np.nan).mask(missing, 0).groupby(group, sort=False).ffill()
+            new_run = side.ne(side.groupby(group, sort=False).shift())
+            # Runs are numbered within each group, so rows of groups may be interleaved
+            run_id = new_run.groupby(group, sort=False).cumsum()
+            run_length = (x.ne(x_cl) & ~missing).groupby([group, run_id], sort=False).transform('sum')
+            rule_2 = side.notna() & side.ne(0) & (run_length >= 8)
+
+            # Rule 3: 3 out of 4 successive points beyond the halfway lines on the same side
+            upper_mid = (x_cl + unpl) / 2
+            lower_mid = (x_cl + lnpl) / 2
+            near = pd.Series(np.where(x > upper_mid, 1, np.where(x < lower_mid, -1, 0)), index=x.index)
+            # Windows of the last 4 points of the group.  A shift before the start of the group is
+            # NaN, so windows of fewer than 4 points don't trigger
+            window = near.astype('float64')
+            window_missing = missing
+            for shift in range(1, 4):
+                window = window + near.groupby(group, sort=False).shift(shift)
+                window_missing = window_missing | missing.groupby(group, sort=False).shift(shift, fill_value=False)
+            trigger = (window.abs() >= 3) & ~window_missing
+            rule_3 = trigger
+            for shift in range(1, 4):
+                # A window ending at i + shift of the same group includes i
+                rule_3 = rule_3 | trigger.groupby(group, sort=False).shift(-shift, fill_value=False)
+
+            return df.assign(
+                x_unpl=unpl,
+                x_cl=x_cl,
+                x_lnpl=lnpl,
+                mr_values=mr,
+                mr_url=url,
+                mr_cl=mr_cl,
+                x_rule_1=(x > unpl) | (x < lnpl),
+                x_rule_2=rule_2,
+                x_rule_3=rule_3,
+                mr_rule_1=mr > url,
+            )
+
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover
+    pl = None  # type: ignore[assignment]
+
+if pl is not None:
+    @pl.api.register_dataframe_namespace('spc')
+    class PolarsNamespace:
+        def __init__(self, df):
+            self._df = df
+
+        def xmr(
+                self,
+                value: str,
+                by: TYPE_BY = None,
+                x_central_line_uses: str = AVERAGE,
+                moving_range_uses: str = AVERAGE,
+        ):
+            """
+            Returns the DataFrame with the XmR chart columns in `COLUMNS` added
+
+            :param value: Column containing the counts
+            :param by: Optional column or list of columns identifying each series
+            :param x_central_line_uses: Whether to use the 'average' or 'median' for computing the X
+                central line
+            :param moving_range_uses: Whether to use the 'average' or 'median' moving range
+            """
+            x_uses, mr_uses, sf_limits, sf_ranges = _uses(x_central_line_uses, moving_range_uses)
+
+            group = '__statprocon_group'
+            run = '__statprocon_run'
+            over: List[str] = [group] if by is None else ([by] if isinstance(by, str) else list(by))
+
+            x = pl.col(value).cast(pl.Float64)
+            x_cl = pl.col('x_cl')
+            mr = pl.col('mr_values')
+
+            df = self._df.with_columns(pl.lit(0).alias(group)) if by is None else self._df
+            df = df.with_columns(x.diff().abs().over(over).alias('mr_values'))
+            df = df.with_columns(
+                getattr(x, _agg(x_uses))().over(over).alias('x_cl'),
+                getattr(mr, _agg(mr_uses))().over(over).alias('mr_cl'),
+            )
+            df = df.with_columns(
+                (x_cl + sf_limits * pl.col('mr_cl')).alias('x_unpl'),
+                (x_cl - sf_limits * pl.col('mr_cl')).alias('x_lnpl'),
+                (sf_ranges * pl.col('mr_cl')).alias('mr_url'),
+            )
+
+            # Rule 2: runs of 8 or more points on the same side of the central line
+            side = (
+                pl.when(x.is_null()).then(0).when(x > x_cl).then(1).when(x < x_cl).then(-1).otherwise(None)
+                .forward_fill().over(over)
+            )
+            df = df.with_columns(side.alias('__statprocon_side'))
+            side_col = pl.col('__statprocon_side')
+            new_run = side_col.ne_missing(side_col.shift(1).over(over)).fill_null(True)
+            # Runs are numbered within each group, so rows of groups may be interleaved
+            df = df.with_columns(new_run.cum_sum().over(over).alias(run))
+            run_length = (x != x_cl).sum().over(over + [run])
+
+            # Rule 3: 3 out of 4 successive points beyond the halfway lines on the same side
+            upper_mid = (x_cl + pl.col('x_unpl')) / 2
+            lower_mid = (x_cl + pl.col('x_lnpl')) / 2
+            near = pl.when(x > upper_mid).then(1).when(x < lower_mid).then(-1).otherwise(0)
+            window_missing = x.is_null().cast(pl.Int32).rolling_sum(4).over(over) > 0
+            df = df.with_columns(
+                ((near.rolling_sum(4).over(over).abs() >= 3) & ~window_missing)
+                .fill_null(False).alias('__statprocon_trigger'),
+            )
+            trigger = pl.col('__statprocon_trigger')
+            rule_3 = trigger
+            for shift in range(1, 4):
+                rule_3 = rule_3 | trigger.shift(-shift).over(over).fill_null(False)
+
+            df = df.with_columns(
+                ((x > pl.col('x_unpl')) | (x < pl.col('x_lnpl'))).fill_null(False).alias('x_rule_1'),
+                (side_col.is_not_null() & (side_col != 0) & (run_length >= 8)).fill_null(False).alias('x_rule_2'),
+                rule_3.alias('x_rule_3'),
+                (mr > pl.col('mr_url')).fill_null(False).alias('mr_rule_1'),
+            )
+            return df.drop([c for c in (group, run, '__statprocon_side', '__statprocon_trigger') if c in df.columns])
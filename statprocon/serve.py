@@ -0,0 +1,329 @@
+"""
+Local chart server
+
+Computes XmR chart data for several consumers so that popular charts are only computed once.
+Identical concurrent requests are coalesced, queued requests are computed in batches that share
+the conversion of the counts and the charts of requests with the same counts, and results are kept
+in an LRU cache keyed by a hash of the counts and options.
+
+Start the server over HTTP:
+
+    python -m statprocon.serve --port 8765
+
+or over a Unix socket:
+
+    python -m statprocon.serve --socket /tmp/statprocon.sock
+
+POST a JSON object (or a list of objects to send a batch) to `/xmr`:
+
+    {"counts": [3, 4, 5], "moving_range_uses": "median"}
+
+The response contains the result of `to_dict()` (or a list of them for a batch).
+"""
+import argparse
+import hashlib
+import http.server
+import json
+import queue
+import socketserver
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple, Union
+
+from statprocon import XmR, XmRTrending
+from statprocon.charts.xmr.base import AVERAGE, MEDIAN
+from statprocon.charts.xmr.types import TYPE_COUNTS_INPUT
+
+
+CHART_OPTIONS = (
+    'x_central_line_uses',
+    'moving_range_uses',
+    'subset_start_index',
+    'subset_end_index',
+    'limit_floor',
+)
+TO_DICT_OPTIONS = (
+    'include_halfway_lines',
+    'moving_average_points',
+    'include_exponential_moving_average',
+)
+CHARTS = {
+    'xmr': lambda xmr: xmr,
+    'trending': XmRTrending,
+}
+
+
+def request_key(payload: dict) -> str:
+    """
+    Returns a content hash of the counts and options of a request.
+    Requests with the same counts and options have the same key.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(','.join(map(str, payload['counts'])).encode())
+    options = {k: v for k, v in payload.items() if k != 'counts'}
+    h.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def validate(payload) -> dict:
+    """
+    Raises ValueError if the request cannot be computed
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('counts'), list):
+        raise ValueError('Request must be an object with a list of "counts"')
+
+    unknown = set(payload) - set(CHART_OPTIONS) - set(TO_DICT_OPTIONS) - {'counts', 'chart'}
+    if unknown:
+        raise ValueError(f'Unknown options: {", ".join(sorted(unknown))}')
+
+    if payload.get('chart', 'xmr') not in CHARTS:
+        raise ValueError(f'"chart" must be one of: {", ".join(CHARTS)}')
+
+    for k in ('x_central_line_uses', 'moving_range_uses'):
+        if k in payload and payload[k] not in (AVERAGE, MEDIAN):
+            raise ValueError(f'"{k}" must be one of: {AVERAGE}, {MEDIAN}')
+
+    if 'subset_start_index' in payload and not _is_int(payload['subset_start_index']):
+        raise ValueError('"subset_start_index" must be an integer')
+    if payload.get('subset_end_index') is not None and not _is_int(payload['subset_end_index']):
+        raise ValueError('"subset_end_index" must be an integer or null')
+    points = payload.get('moving_average_points')
+    if points is not None and (not _is_int(points) or points < 1):
+        raise ValueError('"moving_average_points" must be a positive integer or null')
+
+    for k in ('include_halfway_lines', 'include_exponential_moving_average'):
+        if k in payload and not isinstance(payload[k], bool):
+            raise ValueError(f'"{k}" must be true or false')
+
+    if 'limit_floor' in payload:
+        floor = payload['limit_floor']
+        try:
+            if isinstance(floor, bool) or Decimal(str(floor)).is_nan():
+                raise InvalidOperation
+        except InvalidOperation:
+            raise ValueError('"limit_floor" must be a number') from None
+
+    return payload
+
+
+def compute(payload: dict) -> bytes:
+    """
+    Computes the chart for a request and returns the JSON encoded result
+    """
+    result = compute_batch([payload])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def compute_batch(payloads: List[dict]) -> List[Union[bytes, Exception]]:
+    """
+    Computes the charts for several requests and returns the JSON encoded result, or the exception
+    raised, of each request.
+
+    The counts of requests with the same counts are converted once, and requests with the same
+    counts and chart options share an XmR, e.g. the 'xmr' and 'trending' charts of a series.
+    """
+    decimals: Dict[str, TYPE_COUNTS_INPUT] = {}
+    charts: Dict[Tuple[str, str], XmR] = {}
+    results: List[Union[bytes, Exception]] = []
+    for payload in payloads:
+        try:
+            kwargs = {k: payload[k] for k in CHART_OPTIONS if k in payload}
+            if 'limit_floor' in kwargs:
+                kwargs['limit_floor'] = Decimal(str(kwargs['limit_floor']))
+
+            counts_key = hashlib.blake2b(','.join(map(str, payload['counts'])).encode(), digest_size=16).hexdigest()
+            if counts_key not in decimals:
+                decimals[counts_key] = XmR.to_decimal_list(payload['counts'])
+
+            chart_key = (counts_key, json.dumps(kwargs, sort_keys=True, default=str))
+            if chart_key not in charts:
+                charts[chart_key] = XmR(decimals[counts_key], **kwargs)
+
+            chart = CHARTS[payload.get('chart', 'xmr')](charts[chart_key])
+            results.append(chart.to_json(**{k: payload[k] for k in TO_DICT_OPTIONS if k in payload}).encode())
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class ChartService:
+    def __init__(self, cache_size: int = 256, max_batch: int = 64, workers: int = 1):
+        """
+        Computes charts on worker threads.
+
+        :param cache_size: Maximum number of results kept in the LRU cache
+        :param max_batch: Maximum number of queued requests a worker computes at once with
+            `compute_batch()`
+        :param workers: Number of worker threads
+        """
+        assert cache_size >= 0
+        assert max_batch > 0
+
+        self.cache_size = cache_size
+        self.max_batch = max_batch
+
+        self._cache: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._workers = [
+            threading.Thread(target=self._work, name=f'statprocon-serve-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._workers:
+            t.start()
+
+    def submit(self, payload: dict) -> Future:
+        """
+        Returns a Future with the JSON encoded result of the request.
+        A request that is already cached or being computed is not computed again.
+        """
+        key = request_key(validate(payload))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                f: Future = Future()
+                f.set_result(self._cache[key])
+                return f
+
+            if key in self._pending:
+                return self._pending[key]
+
+            f = Future()
+            self._pending[key] = f
+
+        self._queue.put((key, payload, f))
+        return f
+
+    def compute(self, payload: dict) -> bytes:
+        return self.submit(payload).result()
+
+    def compute_many(self, payloads: List[dict]) -> List[bytes]:
+        futures = [self.submit(p) for p in payloads]
+        return [f.result() for f in futures]
+
+    def close(self):
+        for _ in self._workers:
+            self._queue.put(None)
+        for t in self._workers:
+            t.join()
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            results = compute_batch([payload for _, payload, _ in batch])
+            for (key, _, f), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    with self._lock:
+                        del self._pending[key]
+                    f.set_exception(result)
+                    continue
+
+                with self._lock:
+                    del self._pending[key]
+                    if self.cache_size:
+                        self._cache[key] = result
+                        if len(self._cache) > self.cache_size:
+                            self._cache.popitem(last=False)
+                f.set_result(result)
+
+    def _next_batch(self) -> Optional[List[Tuple[str, dict, Future]]]:
+        item = self._queue.get()
+        if item is None:
+            return None
+
+        batch = [item]
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Put the stop signal back to be handled after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    service: ChartService
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/xmr':
+            self._respond(404, b'{"error": "Not Found"}')
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length))
+            if isinstance(payload, list):
+                body = b'[' + b','.join(self.service.compute_many(payload)) + b']'
+            else:
+                body = self.service.compute(payload)
+        except Exception as e:
+            self._respond(400, json.dumps({'error': str(e)}).encode())
+            return
+
+        self._respond(200, body)
+
+    def address_string(self) -> str:
+        # Unix socket clients don't have an address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def _respond(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(
+        service: ChartService,
+        host: str = '127.0.0.1',
+        port: int = 8765,
+        socket_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+    handler = type('ServiceHandler', (Handler,), {'service': service})
+    if socket_path:
+        return socketserver.ThreadingUnixStreamServer(socket_path, handler)
+    return http.server.ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog='python -m statprocon.serve', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--socket', help='Listen on this Unix socket path instead of HTTP host and port')
+    parser.add_argument('--cache-size', type=int, default=256)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    service = ChartService(cache_size=args.cache_size, max_batch=args.max_batch, workers=args.workers)
+    server = make_server(service, args.host, args.port, args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def _is_int(value) -> bool:
+    # JSON true and false are decoded as bools, which are ints in Python
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Monte Carlo simulation of the run lengths of detection rules.
+
+    from statprocon.simulate import simulate
+
+    result = simulate(shift=1, runs=10000, seed=1)
+    result.arl
+
+Each simulated series is drawn from a normal distribution with a standard deviation of 1.  When a
+`baseline` length is given, the limits of each series are computed by XmR from that many in-control
+points, otherwise the true limits of 0 +/- 3 are used.  The monitored points that follow have a mean
+of `shift` and are evaluated one at a time by the compiled rules of a `RuleSet` until every rule
+has signaled or `max_length` points have been monitored.
+
+Series are simulated in batches with a random generator seeded from `seed` and the batch number,
+so the results are the same for a seed whether or not the batches run in separate processes.
+"""
+import collections
+import random
+import statistics
+
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from statprocon.charts.xmr.base import AVERAGE, Base
+from statprocon.charts.xmr.rules import WHEELER, RuleSet
+
+# Run lengths of the series of a batch, by rule name and with None for each series in which the
+# rule didn't signal
+TYPE_BATCH = Tuple[List[Optional[int]], Dict[str, List[Optional[int]]]]
+
+
+class SimulationResult:
+    def __init__(self, run_lengths: List[Optional[int]], rule_run_lengths: Dict[str, List[Optional[int]]], max_length: int):
+        """
+        Run lengths of simulated series.  A run length is the number of monitored points up to and
+        including the first point at which a rule signaled.
+
+        :param run_lengths: Run length of each series until any rule signaled, or None if no rule
+            signaled within max_length points
+        :param rule_run_lengths: Run lengths of each rule by name
+        """
+        self.run_lengths = run_lengths
+        self.rule_run_lengths = rule_run_lengths
+        self.max_length = max_length
+
+    @property
+    def runs(self) -> int:
+        return len(self.run_lengths)
+
+    @property
+    def censored(self) -> int:
+        """
+        Number of series in which no rule signaled
+        """
+        return self.run_lengths.count(None)
+
+    @property
+    def arl(self) -> float:
+        """
+        Average Run Length until any rule signals.  Series without a signal count as max_length, so
+        this is a lower bound when some series are censored.
+        """
+        return self._arl(self.run_lengths)
+
+    def rule_arl(self, name: str) -> float:
+        """
+        Average Run Length until the rule signals
+        """
+        return self._arl(self.rule_run_lengths[name])
+
+    @property
+    def false_alarm_rate(self) -> float:
+        """
+        Signals per monitored point.  For series without a shift, every signal is a false alarm.
+        """
+        signals = self.runs - self.censored
+        return signals / sum(self._lengths(self.run_lengths))
+
+    def distribution(self) -> Dict[int, int]:
+        """
+        Returns the number of series by run length, excluding censored series
+        """
+        return dict(sorted(collections.Counter(x for x in self.run_lengths if x is not None).items()))
+
+    def quantile(self, q: float) -> int:
+        """
+        Returns the run length that q of the series signaled within, counting censored series as
+        max_length
+        """
+        assert 0 <= q <= 1
+        lengths = sorted(self._lengths(self.run_lengths))
+        return lengths[min(len(lengths) - 1, int(q * len(lengths)))]
+
+    def _lengths(self, run_lengths: List[Optional[int]]) -> List[int]:
+        return [self.max_length if x is None else x for x in run_lengths]
+
+    def _arl(self, run_lengths: List[Optional[int]]) -> float:
+        return statistics.mean(self._lengths(run_lengths))
+
+
+def simulate(
+        rule_set: RuleSet = WHEELER,
+        shift: float = 0,
+        runs: int = 1000,
+        max_length: int = 5000,
+        baseline: Optional[int] = None,
+        x_central_line_uses: str = AVERAGE,
+        moving_range_uses: str = AVERAGE,
+        seed: Optional[int] = None,
+        batch_size: int = 100,
+        workers: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Simulates series and returns the run lengths of the rules
+
+    :param rule_set: The rules to evaluate.  Defaults to the detection rules of XmR
+    :param shift: Mean of the monitored points in units of the standard deviation
+    :param runs: Number of series to simulate
+    :param max_length: Maximum number of monitored points of each series
+    :param baseline: Number of in-control points to compute the limits of each series from.  The
+        true limits are used by default
+    :param x_central_line_uses: Option of XmR for the limits computed from the baseline
+    :param moving_range_uses: Option of XmR for the limits computed from the baseline
+    :param seed: Seed for reproducible results
+    :param batch_size: Number of series simulated by each task
+    :param workers: Number of processes to simulate batches in.  Batches are simulated in this
+        process by default
+    """
+    assert runs > 0
+    assert max_length > 0
+    assert baseline is None or baseline >= 2
+
+    if seed is None:
+        seed = random.randrange(1 << 63)
+
+    batches = []
+    for b, start in enumerate(range(0, runs, batch_size)):
+        size = min(batch_size, runs - start)
+        batches.append((rule_set, shift, size, max_length, baseline, x_central_line_uses, moving_range_uses, f'{seed}:{b}'))
+
+    if workers and workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(_simulate_batch, batches))
+    else:
+        results = list(map(_simulate_batch, batches))
+
+    run_lengths: List[Optional[int]] = []
+    rule_run_lengths: Dict[str, List[Optional[int]]] = {name: [] for name in rule_set.rules}
+    for batch_run_lengths, batch_rule_run_lengths in results:
+        run_lengths.extend(batch_run_lengths)
+        for name, values in batch_rule_run_lengths.items():
+            rule_run_lengths[name].extend(values)
+
+    return SimulationResult(run_lengths, rule_run_lengths, max_length)
+
+
+def _simulate_batch(args: tuple) -> TYPE_BATCH:
+    rule_set, shift, size, max_length, baseline, x_central_line_uses, moving_range_uses, seed = args
+    rng = random.Random(seed)
+    gauss = rng.gauss
+    names = list(rule_set.rules)
+
+    true_boundaries = _boundaries(rule_set, Decimal(0), Decimal(3), Decimal(-3))
+
+    run_lengths: List[Optional[int]] = []
+    rule_run_lengths: Dict[str, List[Optional[int]]] = {name: [] for name in names}
+    for _ in range(size):
+        if baseline is None:
+            upper, lower = true_boundaries
+        else:
+            xmr = Base(
+                [gauss(0, 1) for _ in range(baseline)],
+                x_central_line_uses=x_central_line_uses,
+                moving_range_uses=moving_range_uses,
+            )
+            upper, lower = _boundaries(
+                rule_set,
+                xmr.x_central_line()[0],
+                xmr.upper_natural_process_limit()[0],
+                xmr.lower_natural_process_limit()[0],
+            )
+
+        evaluator = rule_set.evaluator()
+        advance = evaluator.advance
+        first: List[Optional[int]] = [None] * len(names)
+        remaining = len(names)
+        t = 0
+        while remaining and t < max_length:
+            t += 1
+            for r in advance(gauss(shift, 1), upper, lower):
+                if first[r] is None:
+                    first[r] = t
+                    remaining -= 1
+
+        signaled = [x for x in first if x is not None]
+        run_lengths.append(min(signaled) if signaled else None)
+        for name, x in zip(names, first):
+            rule_run_lengths[name].append(x)
+
+    return run_lengths, rule_run_lengths
+
+
+def _boundaries(rule_set: RuleSet, cl: Decimal, unpl: Decimal, lnpl: Decimal) -> Tuple[List[float], List[float]]:
+    # Points are floats, which are compared with float boundaries much faster than with Decimals
+    upper, lower = rule_set.zone_boundaries(cl, unpl, lnpl)
+    return list(map(float, upper)), list(map(float, lower))
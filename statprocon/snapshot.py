@@ -0,0 +1,464 @@
+"""
+Compact binary snapshots of charts and streaming state.
+
+    from statprocon import snapshot
+
+    data = snapshot.dumps(xmr)
+    xmr = snapshot.loads(data)
+
+`XmR`, `XmRTrending`, `Window` and `Streaming` objects are supported.  A snapshot starts with a
+header of the magic bytes, the format version and the type of object, followed by the options and
+summary state of the object such as running sums, and then the packed columns of Decimals.
+
+Decimal columns are stored as arrays of the smallest integer type that fits the coefficients, with
+either a single exponent shared by the column or an exponent byte per value, so values are
+restored with the same digits and exponent.  Columns that don't fit in 64-bit integers, e.g. values
+with more than 18 digits, are stored as text.  Restored `Window` and `Streaming` objects continue to accept new counts
+without replaying the counts that were added before the snapshot.
+"""
+import collections.abc
+import json
+import struct
+import sys
+
+from array import array
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union, cast
+
+from statprocon.charts.xmr.base import Base, MEDIAN
+from statprocon.charts.xmr.limits.trending import Trending
+from statprocon.charts.xmr.sketch import KLLSketch
+from statprocon.charts.xmr.streaming import Streaming
+from statprocon.charts.xmr.window import Window
+
+MAGIC = b'SPC'
+VERSION = 1
+
+TYPE_XMR = 1
+TYPE_TRENDING = 2
+TYPE_WINDOW = 3
+TYPE_STREAMING = 4
+
+# Kinds of Decimal columns
+COLUMN_SHARED_EXPONENT = 0
+COLUMN_EXPONENTS = 1
+COLUMN_TEXT = 2
+
+_HEADER = struct.Struct('<3sBB')
+_UINT32 = struct.Struct('<I')
+_COLUMN = struct.Struct('<BIcB')
+_INT32 = struct.Struct('<i')
+
+# Integer types of packed coefficients by increasing size
+_TYPECODES = ('b', 'h', 'i', 'q')
+
+# Length of the state of random.Random
+_RANDOM_STATE = struct.Struct('<625I')
+
+
+def dumps(obj) -> bytes:
+    """
+    Returns a snapshot of obj
+    """
+    chunks: List[bytes] = []
+    if type(obj) is Base:
+        type_code = TYPE_XMR
+        _dump_xmr(obj, chunks)
+    elif type(obj) is Trending:
+        type_code = TYPE_TRENDING
+        _dump_xmr(obj.xmr, chunks)
+    elif type(obj) is Window:
+        type_code = TYPE_WINDOW
+        _dump_window(obj, chunks)
+    elif type(obj) is Streaming:
+        type_code = TYPE_STREAMING
+        _dump_streaming(obj, chunks)
+    else:
+        raise TypeError(f'Snapshots of {type(obj).__name__} are not supported')
+
+    return _HEADER.pack(MAGIC, VERSION, type_code) + b''.join(chunks)
+
+
+def loads(data: bytes):
+    """
+    Returns the object of a snapshot returned by `dumps()`
+    """
+    view = memoryview(data)
+    if len(view) < _HEADER.size:
+        raise ValueError('Not a statprocon snapshot')
+    magic, version, type_code = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError('Not a statprocon snapshot')
+    if version != VERSION:
+        raise ValueError(f'Unsupported snapshot version {version}')
+
+    reader = _Reader(view, _HEADER.size)
+    if type_code == TYPE_XMR:
+        return _load_xmr(reader)
+    if type_code == TYPE_TRENDING:
+        return Trending(_load_xmr(reader))
+    if type_code == TYPE_WINDOW:
+        return _load_window(reader)
+    if type_code == TYPE_STREAMING:
+        return _load_streaming(reader)
+    raise ValueError(f'Unknown snapshot type {type_code}')
+
+
+def _dump_xmr(xmr: Base, chunks: List[bytes]):
+    _dump_meta({
+        'x_central_line_uses': xmr._x_central_line_uses,
+        'moving_range_uses': xmr._moving_range_uses,
+        'i': xmr.i,
+        'j': xmr.j,
+        'limit_floor': str(xmr.limit_floor),
+    }, chunks)
+    chunks.append(encode_decimals(xmr.counts))
+
+
+def _load_xmr(reader: '_Reader') -> Base:
+    meta = reader.meta()
+    xmr = Base.__new__(Base)
+    xmr.counts = reader.decimals()  # type: ignore[assignment]
+    xmr.i = meta['i']
+    xmr.j = meta['j']
+    xmr._x_central_line_uses = meta['x_central_line_uses']
+    xmr._moving_range_uses = meta['moving_range_uses']
+    xmr.limit_floor = Decimal(meta['limit_floor'])
+    return xmr
+
+
+def _dump_window(window: Window, chunks: List[bytes]):
+    # The sums and counts are read together so they match when counts are appended concurrently
+    with window._lock:
+        _dump_meta({
+            'size': window.size,
+            'x_central_line_uses': window._x_central_line_uses,
+            'moving_range_uses': window._moving_range_uses,
+            'limit_floor': str(window.limit_floor),
+            'x_sum': str(window._x_sum),
+            'x_n': window._x_n,
+            'mr_sum': str(window._mr_sum),
+            'mr_n': window._mr_n,
+        }, chunks)
+        chunks.append(encode_decimals(window._ordered_counts()))
+
+
+def _load_window(reader: '_Reader') -> Window:
+    meta = reader.meta()
+    counts = reader.decimals()
+    size = meta['size']
+
+    window = Window(
+        size,
+        x_central_line_uses=meta['x_central_line_uses'],
+        moving_range_uses=meta['moving_range_uses'],
+        limit_floor=Decimal(meta['limit_floor']),
+    )
+    window._buffer = counts + [None] * (size - len(counts))
+    window._start = 0
+    window._n = len(counts)
+    window._x_sum = Decimal(meta['x_sum'])
+    window._x_n = meta['x_n']
+    window._mr_sum = Decimal(meta['mr_sum'])
+    window._mr_n = meta['mr_n']
+    window._x_sorted = []
+    window._mr_sorted = []
+    # The sorted copies are only used for medians and are rebuilt from the counts in the window
+    if window._x_central_line_uses == MEDIAN:
+        window._x_sorted = sorted(c for c in counts if c is not None)
+    if window._moving_range_uses == MEDIAN:
+        window._mr_sorted = sorted(
+            abs(b - a) for a, b in zip(counts, counts[1:]) if a is not None and b is not None
+        )
+    window._publish()
+    return window
+
+
+def _dump_streaming(stream: Streaming, chunks: List[bytes]):
+    # The sketches must not be compacted by another thread while they are written
+    with stream._lock:
+        sketches = [s for s in (stream._x_sketch, stream._mr_sketch) if s is not None]
+        _dump_meta({
+            'x_central_line_uses': stream._x_central_line_uses,
+            'moving_range_uses': stream._moving_range_uses,
+            'limit_floor': str(stream.limit_floor),
+            'n': stream.n,
+            'last': None if stream._last is None else str(stream._last),
+            'x_sum': str(stream._x_sum),
+            'x_n': stream._x_n,
+            'mr_sum': str(stream._mr_sum),
+            'mr_n': stream._mr_n,
+            'x_sketch': stream._x_sketch is not None,
+            'mr_sketch': stream._mr_sketch is not None,
+        }, chunks)
+        for sketch in sketches:
+            _dump_sketch(sketch, chunks)
+
+
+def _load_streaming(reader: '_Reader') -> Streaming:
+    meta = reader.meta()
+    stream = Streaming(meta['x_central_line_uses'], meta['moving_range_uses'])
+    stream.limit_floor = Decimal(meta['limit_floor'])
+    stream.n = meta['n']
+    stream._last = None if meta['last'] is None else Decimal(meta['last'])
+    stream._x_sum = Decimal(meta['x_sum'])
+    stream._x_n = meta['x_n']
+    stream._mr_sum = Decimal(meta['mr_sum'])
+    stream._mr_n = meta['mr_n']
+    stream._x_sketch = _load_sketch(reader) if meta['x_sketch'] else None
+    stream._mr_sketch = _load_sketch(reader) if meta['mr_sketch'] else None
+    return stream
+
+
+def _dump_sketch(sketch: KLLSketch, chunks: List[bytes]):
+    version, state, gauss_next = sketch._random.getstate()
+    _dump_meta({
+        'k': sketch.k,
+        'n': sketch.n,
+        'levels': len(sketch._compactors),
+        'random_version': version,
+        'gauss_next': gauss_next,
+    }, chunks)
+    chunks.append(_RANDOM_STATE.pack(*state))
+    for items in sketch._compactors:
+        chunks.append(encode_decimals(items))
+
+
+def _load_sketch(reader: '_Reader') -> KLLSketch:
+    meta = reader.meta()
+    sketch = KLLSketch(meta['k'])
+    sketch.n = meta['n']
+    state = reader.unpack(_RANDOM_STATE)
+    sketch._random.setstate((meta['random_version'], state, meta['gauss_next']))
+    sketch._compactors = [
+        reader.decimals() for _ in range(meta['levels'])  # type: ignore[misc]
+    ]
+    sketch._size = sum(map(len, sketch._compactors))
+    sketch._update_max_size()
+    return sketch
+
+
+def _dump_meta(meta: Dict[str, Any], chunks: List[bytes]):
+    data = json.dumps(meta, separators=(',', ':')).encode()
+    chunks.append(_UINT32.pack(len(data)))
+    chunks.append(data)
+
+
+def encode_decimals(values: Sequence[Optional[Decimal]]) -> bytes:
+    """
+    Returns a column of Decimals (or None) packed as integers when possible
+    """
+    n = len(values)
+    flags = bytes(v is None for v in values)
+    has_nulls = any(flags)
+    coefficients: List[int] = []
+    exponents = array('b')
+    try:
+        for v in values:
+            if v is None:
+                coefficients.append(0)
+                exponents.append(0)
+                continue
+            # Parsing the string is faster than as_tuple() for the usual notation
+            text = str(v)
+            point = text.find('.')
+            if 'E' in text:
+                tuple_exponent = v.as_tuple().exponent
+                if not isinstance(tuple_exponent, int):
+                    raise ValueError
+                exponent = tuple_exponent
+                coefficient = int(v.scaleb(-exponent))
+            elif point < 0:
+                exponent = 0
+                coefficient = int(text)
+            else:
+                exponent = point + 1 - len(text)
+                coefficient = int(text[:point] + text[point + 1:])
+            if not coefficient and text[0] == '-':
+                # -0 can't be stored as an integer
+                raise OverflowError
+            coefficients.append(coefficient)
+            exponents.append(exponent)
+        packed = _pack_integers(coefficients)
+    except (OverflowError, ValueError):
+        # Infinity and NaN raise ValueError
+        data = '\n'.join('' if v is None else str(v) for v in values).encode()
+        return _COLUMN.pack(COLUMN_TEXT, n, b'u', 0) + _UINT32.pack(len(data)) + data
+
+    chunks = []
+    present = {e for e, f in zip(exponents, flags) if not f}
+    if len(present) <= 1:
+        kind = COLUMN_SHARED_EXPONENT
+        chunks.append(_INT32.pack(present.pop() if present else 0))
+    else:
+        kind = COLUMN_EXPONENTS
+    if has_nulls:
+        chunks.append(flags)
+    if kind == COLUMN_EXPONENTS:
+        chunks.append(exponents.tobytes())
+    chunks.append(packed.tobytes())
+    return _COLUMN.pack(kind, n, packed.typecode.encode(), has_nulls) + b''.join(chunks)
+
+
+def decode_decimals(view: memoryview, offset: int) -> Tuple[List[Optional[Decimal]], int]:
+    """
+    Returns the column of Decimals encoded by `encode_decimals()` at offset and the offset after it
+    """
+    values, offset = view_decimals(view, offset)
+    if isinstance(values, PackedDecimals):
+        result = list(values)
+        values.release()
+        return result, offset
+    return cast(List[Optional[Decimal]], values), offset
+
+
+def view_decimals(view: memoryview, offset: int) -> Tuple[Sequence[Optional[Decimal]], int]:
+    """
+    Returns the column of Decimals encoded by `encode_decimals()` at offset, without decoding its
+    packed integers, and the offset after it.  Columns stored as text are decoded to a list.
+    """
+    kind, n, typecode, has_nulls = _COLUMN.unpack_from(view, offset)
+    offset += _COLUMN.size
+
+    if kind == COLUMN_TEXT:
+        (length,) = _UINT32.unpack_from(view, offset)
+        offset += _UINT32.size
+        text = bytes(view[offset:offset + length]).decode()
+        offset += length
+        if not n:
+            return [], offset
+        return [Decimal(s) if s else None for s in text.split('\n')], offset
+
+    shared = 0
+    if kind == COLUMN_SHARED_EXPONENT:
+        (shared,) = _INT32.unpack_from(view, offset)
+        offset += _INT32.size
+    elif kind != COLUMN_EXPONENTS:
+        raise ValueError(f'Unknown column kind {kind}')
+
+    nulls = None
+    if has_nulls:
+        nulls = view[offset:offset + n]
+        offset += n
+
+    exponents = None
+    if kind == COLUMN_EXPONENTS:
+        exponents = view[offset:offset + n].cast('b')
+        offset += n
+
+    coefficients: Union[memoryview, array]
+    size = struct.calcsize(typecode.decode()) * n
+    if sys.byteorder == 'big':
+        coefficients = array(typecode.decode())
+        coefficients.frombytes(view[offset:offset + size])
+        coefficients.byteswap()
+    else:
+        coefficients = view[offset:offset + size].cast(typecode.decode())
+    offset += size
+
+    return PackedDecimals(coefficients, shared, exponents, nulls), offset
+
+
+class PackedDecimals(collections.abc.Sequence):
+    def __init__(
+            self,
+            coefficients: Union[memoryview, array],
+            exponent: int = 0,
+            exponents: Optional[memoryview] = None,
+            nulls: Optional[memoryview] = None,
+    ):
+        """
+        Read-only sequence of a column encoded by `encode_decimals()`.  Values are decoded from the
+        packed integers each time they are read, so the column is not held as Decimal objects.
+
+        :param coefficients: The integer coefficients of the values, e.g. for `numpy.frombuffer()`
+        :param exponent: The exponent shared by the values
+        :param exponents: The exponent of each value instead of a shared exponent
+        :param nulls: A byte per value that is 1 where the value is None
+        """
+        self.coefficients = coefficients
+        self.exponent = exponent
+        self.exponents = exponents
+        self.nulls = nulls
+
+    def __len__(self) -> int:
+        return len(self.coefficients)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if self.nulls is not None and self.nulls[i]:
+            return None
+        exponent = self.exponent if self.exponents is None else self.exponents[i]
+        return Decimal(self.coefficients[i]).scaleb(exponent)
+
+    def __iter__(self) -> Iterator[Optional[Decimal]]:
+        values: Iterator[Decimal]
+        if self.exponents is not None:
+            values = (Decimal(c).scaleb(e) for c, e in zip(self.coefficients, self.exponents))
+        elif self.exponent:
+            values = (Decimal(c).scaleb(self.exponent) for c in self.coefficients)
+        else:
+            values = map(Decimal, self.coefficients)
+
+        if self.nulls is None:
+            return iter(values)
+        return (None if f else v for v, f in zip(values, self.nulls))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, collections.abc.Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f'PackedDecimals({list(self)!r})'
+
+    def release(self):
+        """
+        Releases the views of the buffer the column was read from
+        """
+        for view in (self.coefficients, self.exponents, self.nulls):
+            if isinstance(view, memoryview):
+                view.release()
+
+
+def _pack_integers(values: List[int]) -> array:
+    """
+    Returns values in an array of the smallest little-endian integer type they fit in
+    Raises OverflowError if they don't fit in 64-bit integers.
+    """
+    low = min(values, default=0)
+    high = max(values, default=0)
+    for typecode in _TYPECODES:
+        result = array(typecode)
+        bits = result.itemsize * 8 - 1
+        if -(1 << bits) <= low and high < (1 << bits):
+            result.fromlist(values)
+            if sys.byteorder == 'big':
+                result.byteswap()
+            return result
+    raise OverflowError
+
+
+class _Reader:
+    def __init__(self, view: memoryview, offset: int):
+        self.view = view
+        self.offset = offset
+
+    def meta(self) -> Dict[str, Any]:
+        (length,) = _UINT32.unpack_from(self.view, self.offset)
+        self.offset += _UINT32.size
+        data = bytes(self.view[self.offset:self.offset + length])
+        self.offset += length
+        return json.loads(data)
+
+    def decimals(self) -> List[Optional[Decimal]]:
+        values, self.offset = decode_decimals(self.view, self.offset)
+        return values
+
+    def unpack(self, s: struct.Struct) -> tuple:
+        values = s.unpack_from(self.view, self.offset)
+        self.offset += s.size
+        return values
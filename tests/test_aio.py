@@ -0,0 +1,56 @@
+import threading
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from statprocon import XmR
+
+
+class AsyncTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_acompute_inline(self):
+        counts = [3, 4, 5]
+        xmr = await XmR.acompute(counts)
+        self.assertEqual(xmr.to_dict(), XmR(counts).to_dict())
+
+    async def test_acompute_executor(self):
+        counts = list(range(50))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            xmr = await _Offloaded.acompute(counts, moving_range_uses='median', executor=executor)
+            d = await xmr.ato_dict(include_halfway_lines=True, executor=executor)
+
+        expected = XmR(counts, moving_range_uses='median').to_dict(include_halfway_lines=True)
+        self.assertIsInstance(xmr, _Offloaded)
+        self.assertEqual(d, expected)
+
+    async def test_ato_csv(self):
+        xmr = _Offloaded([3, 4, 5])
+        self.assertEqual(await xmr.ato_csv(), XmR([3, 4, 5]).to_csv())
+
+    async def test_aiter_rows_chunks(self):
+        counts = list(range(23))
+        xmr = _Offloaded(counts)
+        rows = [row async for row in xmr.aiter_rows()]
+        self.assertEqual(rows, list(xmr.iter_rows()))
+        self.assertEqual(len(rows), len(counts))
+
+    async def test_aiter_rows_computes_columns_in_executor(self):
+        xmr = _Offloaded(list(range(23)))
+        threads = []
+        upper_natural_process_limit = xmr.upper_natural_process_limit
+
+        def record_thread():
+            threads.append(threading.current_thread())
+            return upper_natural_process_limit()
+
+        xmr.upper_natural_process_limit = record_thread  # type: ignore[method-assign]
+        rows = [row async for row in xmr.aiter_rows()]
+
+        self.assertEqual(len(rows), 23)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+
+class _Offloaded(XmR):
+    aio_inline_max_points = 2
+    aio_chunk_size = 5
+
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR
+from statprocon.charts.xmr.cache import ChartCache
+
+
+class ChartCacheTestCase(unittest.TestCase):
+    def test_hit(self):
+        cache = ChartCache()
+        counts = [3, 4, 5]
+
+        first = cache.to_dict(counts, moving_range_uses='median')
+        second = cache.to_dict(list(counts), moving_range_uses='median')
+
+        self.assertIs(first, second)
+        self.assertEqual(first, XmR(counts, moving_range_uses='median').to_dict())
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_options_are_part_of_key(self):
+        cache = ChartCache()
+        counts = [3, 4, 5, 10]
+
+        cache.to_dict(counts)
+        cache.to_dict(counts, subset_end_index=3)
+        cache.to_dict(counts, limit_floor=0)
+        d = cache.to_dict(counts, include_halfway_lines=True)
+
+        self.assertEqual(cache.misses, 4)
+        self.assertIn('x_unpl_mid', d)
+
+    def test_lru_eviction(self):
+        cache = ChartCache(maxsize=2)
+        cache.to_dict([1, 2])
+        cache.to_dict([3, 4])
+        cache.to_dict([1, 2])
+        cache.to_dict([5, 6])
+
+        self.assertEqual(len(cache), 2)
+        cache.to_dict([1, 2])
+        self.assertEqual(cache.hits, 2)
+        cache.to_dict([3, 4])
+        self.assertEqual(cache.misses, 4)
+
+    def test_append_reuses_prefix(self):
+        cache = ChartCache()
+        counts = [1.5, 2.25, 3, 10, 4]
+        prefix = cache.to_dict(counts[:3])
+
+        d = cache.to_dict(counts)
+
+        self.assertEqual(d, XmR(counts).to_dict())
+        for a, b in zip(prefix['x_values'], d['x_values']):
+            self.assertIs(a, b)
+
+    def test_hit_does_not_look_up_prefixes(self):
+        cache = ChartCache()
+        counts = [1, 2, 3, 4]
+        cache.to_dict(counts[:2])
+        cache.to_dict(counts)
+
+        lookups = []
+        original = cache._candidates
+
+        def candidates(*args):
+            lookups.append(args)
+            return original(*args)
+
+        cache._candidates = candidates  # type: ignore[method-assign]
+        cache.to_dict(counts)
+        cache.to_dict(counts[:2])
+
+        self.assertEqual(lookups, [])
+        self.assertEqual(cache.hits, 2)
+
+    def test_persistence(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, 'cache.sqlite')
+        counts = [Decimal('1.5'), 2, 3, 4]
+
+        cache = ChartCache(path=path)
+        expected = cache.to_dict(counts)
+        cache.close()
+
+        cache = ChartCache(path=path)
+        self.assertEqual(cache.to_dict(counts), expected)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+        d = cache.to_dict(counts + [8])
+        self.assertEqual(d, XmR(counts + [8]).to_dict())
+
+        cache.clear()
+        cache.to_dict(counts)
+        self.assertEqual(cache.misses, 2)
+        cache.close()
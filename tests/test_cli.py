@@ -0,0 +1,91 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+
+from statprocon import XmR, cli
+
+
+class CliTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def test_csv_grouped_by_key(self):
+        path = self._write('data.csv', 'metric,v\na,3\na,4\na,5\nb,10\nb,50\nb,40\nb,30\n')
+
+        output = self._main([path, '--key', 'metric', '--value', 'v'])
+        rows = list(csv.DictReader(io.StringIO(output)))
+
+        self.assertEqual([r['metric'] for r in rows], ['a'] * 3 + ['b'] * 4)
+        self.assertEqual(rows[0]['x_cl'], str(XmR([3, 4, 5]).x_central_line()[0]))
+        self.assertEqual(rows[3]['x_unpl'], str(XmR([10, 50, 40, 30]).upper_natural_process_limit()[0]))
+        self.assertEqual(rows[0]['mr_values'], '')
+        self.assertEqual(rows[0]['x_rule_1'], 'False')
+
+    def test_jsonl_output(self):
+        lines = [{'id': 1, 'value': v} for v in [3, 4, 5]] + [{'id': 2, 'value': v} for v in [1.5, 2]]
+        path = self._write('data.jsonl', ''.join(json.dumps(line) + '\n' for line in lines))
+
+        output = self._main([path, '--key', 'id', '--output-format', 'jsonl', '--chart', 'trending'])
+        rows = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['id'], '1')
+        self.assertIsNone(rows[3]['mr_values'])
+        self.assertEqual(rows[4]['x_values'], 2)
+        self.assertIs(rows[4]['x_rule_2'], False)
+
+    def test_single_series_options(self):
+        path = self._write('data.csv', 'value\n1\n2\n3\n4\n')
+
+        output = self._main([path, '--moving-range-uses', 'median', '--limit-floor', '0'])
+        rows = list(csv.DictReader(io.StringIO(output)))
+
+        self.assertNotIn('key', rows[0])
+        self.assertEqual(rows[0]['mr_url'], str(XmR([1, 2, 3, 4], moving_range_uses='median').upper_range_limit()[0]))
+        self.assertEqual([r['x_lnpl'] for r in rows], [''] * 4)
+
+        output = self._main([path, '--limit-floor', '-10', '--output-format', 'jsonl'])
+        rows = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(rows[0]['x_lnpl'], float(XmR([1, 2, 3, 4]).lower_natural_process_limit()[0]))
+
+    def test_invalid_series_are_skipped(self):
+        path = self._write('data.csv', 'metric,value\na,1\nb,3\nb,4\nc,\nc,2\nd,5\nd,6\n')
+
+        for workers in ['1', '2']:
+            err = io.StringIO()
+            with contextlib.redirect_stderr(err):
+                output = self._main([path, '--key', 'metric', '--workers', workers])
+            rows = list(csv.DictReader(io.StringIO(output)))
+
+            self.assertEqual([r['metric'] for r in rows], ['b', 'b', 'd', 'd'])
+            self.assertIn('skipping series a:', err.getvalue())
+            self.assertIn('skipping series c:', err.getvalue())
+
+    def test_compute_all_with_executor(self):
+        series = [(str(i), [i, i + 1, i * 2]) for i in range(1, 6)]
+        options = {'chart': 'xmr'}
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(cli.compute_all(iter(series), options, executor, max_pending=2))
+
+        self.assertEqual(results, [cli.compute(s, options) for s in series])
+
+    def _main(self, argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            cli.main(argv)
+        return out.getvalue()
+
+    def _write(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
@@ -0,0 +1,110 @@
+import unittest
+
+from statprocon import XmR
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None  # type: ignore[assignment]
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None  # type: ignore[assignment]
+
+if pd is not None or pl is not None:
+    import statprocon.dataframe  # noqa: F401  registers the accessors
+
+SERIES = {
+    # Table 8.1 from Making Sense of Data, see XmRTestCase.test_rule_2
+    'smokers': [21.3, 20.2, 20.9, 21.0, 18.8, 19.6, 18.7, 18.6, 18.1, 18.9, 19.2, 18.2, 17.3, 19.0],
+    # Figure 9.9 from Making Sense of Data, see XmRTestCase.test_rule_3
+    'peak_flow': [120, 140, 100, 150, 260, 150, 100, 120, 300, 300, 275, 300, 140, 1750, 150, 150, 190, 180],
+    'accounts': [
+        55.6, 54.7, 54.9, 54.8, 56.9, 55.7, 53.8, 54.8, 53.4, 57.0, 59.4, 63.2,
+        60.9, 60.7, 58.6, 57.3, 56.9, 58.1, 58.3, 50.9, 53.3, 52.5, 50.8, 52.9,
+    ],
+    'gaps': [
+        55.6, 54.7, None, 54.8, 56.9, 55.7, 53.8, 54.8, 53.4, 57.0, 59.4, 63.2,
+        60.9, 60.7, 58.6, None, 56.9, 58.1, 58.3, 50.9, 53.3, 52.5, 50.8, 52.9,
+    ],
+}
+
+
+class DataFrameTestCase(unittest.TestCase):
+    @unittest.skipIf(pd is None, 'pandas is not installed')
+    def test_pandas(self):
+        df = pd.DataFrame(self._rows())
+        for uses in ('average', 'median'):
+            result = df.spc.xmr(value='v', by='metric', moving_range_uses=uses)
+            for name, group in result.groupby('metric', sort=False):
+                self._assert_matches_xmr(group.to_dict('list'), SERIES[name], uses)
+
+    @unittest.skipIf(pd is None, 'pandas is not installed')
+    def test_pandas_interleaved_rows(self):
+        df = pd.DataFrame(self._interleaved_rows())
+        for uses in ('average', 'median'):
+            result = df.spc.xmr(value='v', by='metric', moving_range_uses=uses)
+            for name, group in result.groupby('metric', sort=False):
+                self._assert_matches_xmr(group.to_dict('list'), SERIES[name], uses)
+
+    @unittest.skipIf(pd is None, 'pandas is not installed')
+    def test_pandas_single_series(self):
+        counts = SERIES['accounts']
+        result = pd.DataFrame({'v': counts}).spc.xmr(value='v')
+        self._assert_matches_xmr(result.to_dict('list'), counts, 'average')
+
+    @unittest.skipIf(pl is None, 'polars is not installed')
+    def test_polars(self):
+        df = pl.DataFrame(self._rows())
+        for uses in ('average', 'median'):
+            result = df.spc.xmr(value='v', by='metric', moving_range_uses=uses)
+            self.assertEqual(set(result.columns), {'metric', 'v', *statprocon.dataframe.COLUMNS})
+            for name in SERIES:
+                group = result.filter(pl.col('metric') == name)
+                self._assert_matches_xmr(group.to_dict(as_series=False), SERIES[name], uses)
+
+    @unittest.skipIf(pl is None, 'polars is not installed')
+    def test_polars_interleaved_rows(self):
+        df = pl.DataFrame(self._interleaved_rows())
+        for uses in ('average', 'median'):
+            result = df.spc.xmr(value='v', by='metric', moving_range_uses=uses)
+            for name in SERIES:
+                group = result.filter(pl.col('metric') == name)
+                self._assert_matches_xmr(group.to_dict(as_series=False), SERIES[name], uses)
+
+    @unittest.skipIf(pl is None, 'polars is not installed')
+    def test_polars_single_series(self):
+        counts = SERIES['accounts']
+        result = pl.DataFrame({'v': counts}).spc.xmr(value='v')
+        self._assert_matches_xmr(result.to_dict(as_series=False), counts, 'average')
+
+    @staticmethod
+    def _rows():
+        return {
+            'metric': [name for name, counts in SERIES.items() for _ in counts],
+            'v': [v for counts in SERIES.values() for v in counts],
+        }
+
+    @staticmethod
+    def _interleaved_rows():
+        # Rows of the series alternate, e.g. long-format data sorted by time
+        rows = []
+        for i in range(max(len(counts) for counts in SERIES.values())):
+            rows.extend((name, counts[i]) for name, counts in SERIES.items() if i < len(counts))
+        return {
+            'metric': [name for name, _ in rows],
+            'v': [v for _, v in rows],
+        }
+
+    def _assert_matches_xmr(self, actual: dict, counts: list, moving_range_uses: str):
+        xmr = XmR(counts, moving_range_uses=moving_range_uses)
+        self.assertAlmostEqual(actual['x_cl'][0], float(xmr.x_central_line()[0]), places=2)
+        self.assertAlmostEqual(actual['mr_cl'][0], float(xmr.mr_central_line()[0]), places=2)
+        self.assertAlmostEqual(actual['x_unpl'][0], float(xmr.upper_natural_process_limit()[0]), places=2)
+        self.assertAlmostEqual(actual['x_lnpl'][0], float(xmr.lower_natural_process_limit()[0]), places=2)
+        self.assertAlmostEqual(actual['mr_url'][0], float(xmr.upper_range_limit()[0]), places=2)
+        self.assertListEqual(list(actual['x_rule_1']), xmr.rule_1_x_indices_beyond_limits())
+        self.assertListEqual(list(actual['x_rule_2']), xmr.rule_2_runs_about_central_line())
+        self.assertListEqual(list(actual['x_rule_3']), xmr.rule_3_runs_near_limits())
+        self.assertListEqual(list(actual['mr_rule_1']), xmr.rule_1_mr_indices_beyond_limits())
@@ -0,0 +1,71 @@
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR
+from statprocon.charts.xmr.ewma import ExponentialMovingAverage, exponential_moving_averages
+from statprocon.charts.xmr.limits.ewma import EWMA
+
+COUNTS = [139.1, 145.2, 142.7, 143.9, 140.6, 147.1, 146.4, 142.3, 143.3, 144.5]
+
+
+class EWMATestCase(unittest.TestCase):
+    def test_multiple_smoothing_factors(self):
+        xmr = XmR(COUNTS)
+        factors = [0.9, 0.5, 0.2]
+
+        result = xmr.x_exponential_moving_averages(factors)
+
+        self.assertEqual(len(result), 3)
+        for f, series in zip(factors, result):
+            self.assertListEqual(series, xmr.x_exponential_moving_average(f))
+
+    def test_does_not_modify_counts(self):
+        xmr = XmR(COUNTS)
+        counts = list(xmr.counts)
+        xmr.x_exponential_moving_averages([0.5])
+        self.assertListEqual(xmr.counts, counts)
+
+    def test_streaming(self):
+        ewma = ExponentialMovingAverage([0.9, 0.5])
+        for x in COUNTS[:5]:
+            ewma.update(x)
+        tail = ewma.extend(COUNTS[5:])
+
+        expected = exponential_moving_averages(COUNTS, [0.9, 0.5])
+        self.assertListEqual(tail[0], expected[0][5:])
+        self.assertListEqual(tail[1], expected[1][5:])
+        self.assertEqual(ewma.values, [expected[0][-1], expected[1][-1]])
+
+    def test_unrounded(self):
+        result = exponential_moving_averages([0, 1, 1], [0.5], rounding=None)
+        self.assertListEqual(result[0], [0, Decimal('0.5'), Decimal('0.75')])
+
+    def test_ewma_chart(self):
+        xmr = XmR(COUNTS)
+        chart = EWMA(xmr, smoothing_factor=0.8)
+
+        cl = xmr.x_central_line()[0]
+        sigma = (xmr.upper_natural_process_limit()[0] - cl) / 3
+        ucl = chart.upper_control_limit()
+        lcl = chart.lower_control_limit()
+
+        # The first limit is width * sigma * weight away from the central line
+        self.assertEqual(ucl[0], round(cl + 3 * sigma * Decimal('0.2'), 3))
+        self.assertEqual(lcl[0], round(cl - 3 * sigma * Decimal('0.2'), 3))
+        for a, b in zip(ucl, ucl[1:]):
+            self.assertLessEqual(a, b)
+        asymptote = cl + 3 * sigma * (Decimal('0.2') / Decimal('1.8')).sqrt()
+        self.assertLess(abs(ucl[-1] - asymptote), Decimal('0.05'))
+
+        values = chart.values()
+        self.assertEqual(values[0], round(cl + Decimal('0.2') * (Decimal('139.1') - cl), 3))
+        self.assertEqual(len(chart.to_dict()['lcl']), len(COUNTS))
+        self.assertListEqual(chart.rule_1_indices_beyond_limits(), [False] * len(COUNTS))
+
+    def test_ewma_chart_detects_small_shift(self):
+        counts = [10, 11, 9, 10, 11, 9, 10, 10, 11, 9] + [11, 11.5, 11, 12, 11, 11.5, 11, 11.5]
+        xmr = XmR(counts, subset_end_index=10)
+
+        self.assertFalse(any(xmr.rule_1_x_indices_beyond_limits()))
+        self.assertTrue(any(EWMA(xmr, smoothing_factor=0.8).rule_1_indices_beyond_limits()))
@@ -0,0 +1,89 @@
+import random
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR, XmRTrending
+from statprocon.charts.xmr.fixed import FixedPoint
+
+LINES = [
+    'x_central_line',
+    'mr_central_line',
+    'upper_range_limit',
+    'upper_natural_process_limit',
+    'lower_natural_process_limit',
+    'upper_halfway_line',
+    'lower_halfway_line',
+]
+
+
+class FixedPointTestCase(unittest.TestCase):
+    def test_verifying_software(self):
+        # pg 382 of Making Sense of Data
+        counts = [5045, 4350, 4350, 3975, 4290, 4430, 4485, 4285, 3980, 3925, 3645, 3760, 3300, 3685, 3463, 5200]
+        self._assert_same_as_decimal(counts)
+        self.assertEqual(FixedPoint(counts).to_csv(), XmR(counts).to_csv())
+
+    def test_median(self):
+        # pg. 145 of Making Sense of Data
+        counts = [2.5, 2.3, 16.3, 6.3, 7.6, 16.3, 7.1, 7.8, 7.8, 9.9, 10.5, -4.8]
+        self._assert_same_as_decimal(counts, moving_range_uses='median')
+        self._assert_same_as_decimal(counts, x_central_line_uses='median')
+        self._assert_same_as_decimal(counts[:-1], x_central_line_uses='median')
+
+    def test_random_counts(self):
+        r = random.Random(1)
+        for _ in range(200):
+            n = r.randint(2, 30)
+            places = r.randint(0, 4)
+            counts = [round(r.uniform(-100, 100), places) for _ in range(n)]
+            if n > 3 and r.random() < 0.3:
+                counts[r.randrange(n)] = None
+            kwargs = r.choice([{}, {'moving_range_uses': 'median'}, {'x_central_line_uses': 'median'}])
+            if r.random() < 0.3:
+                kwargs['subset_start_index'] = r.randint(0, n // 2)
+                kwargs['subset_end_index'] = r.randint(n // 2 + 2, n + 1)
+            try:
+                XmR(counts, **kwargs).upper_natural_process_limit()
+            except Exception:
+                continue
+            self._assert_same_as_decimal(counts, **kwargs)
+
+    def test_rounding_ties(self):
+        # 0.0005 rounds to 0.000 and 0.0015 rounds to 0.002
+        self._assert_same_as_decimal([Decimal('0.0005'), Decimal('0.0005')])
+        self._assert_same_as_decimal([Decimal('0.0015'), Decimal('0.0015')])
+        self._assert_same_as_decimal([Decimal('-0.0004'), Decimal('0.0000')])
+        self._assert_same_as_decimal([1, 2, 2])
+
+    def test_decimal_places(self):
+        counts = [1.25, 2.5, 3]
+        xmr = FixedPoint(counts)
+        self.assertEqual(xmr.decimal_places, 2)
+        self.assertEqual(xmr.scaled_counts, [125, 250, 300])
+
+        self.assertEqual(FixedPoint(counts, decimal_places=4).scaled_counts, [12500, 25000, 30000])
+        with self.assertRaises(ValueError):
+            FixedPoint(counts, decimal_places=1)
+
+    def test_trending(self):
+        counts = [
+            539, 558, 591, 556, 540, 590, 606, 643, 657, 602,
+            596, 640, 691, 723, 701, 802, 749, 762, 807, 781,
+        ]
+        self.assertEqual(
+            XmRTrending(FixedPoint(counts)).to_dict(),
+            XmRTrending(XmR(counts)).to_dict(),
+        )
+
+    def _assert_same_as_decimal(self, counts, **kwargs):
+        expected = XmR(counts, **kwargs)
+        actual = FixedPoint(counts, **kwargs)
+        for line in LINES:
+            # Compare strings so that the exponents of the Decimals must also match
+            self.assertEqual(
+                list(map(str, getattr(actual, line)())),
+                list(map(str, getattr(expected, line)())),
+                f'{line} {counts} {kwargs}',
+            )
+        self.assertEqual(actual.rule_3_runs_near_limits(), expected.rule_3_runs_near_limits())
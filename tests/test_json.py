@@ -0,0 +1,50 @@
+import json
+import unittest
+
+from decimal import Decimal
+from unittest import mock
+
+from statprocon import XmR, XmRTrending
+from statprocon.charts.xmr import base
+
+
+class JSONTestCase(unittest.TestCase):
+    def setUp(self):
+        self.counts = [5045, 4350, 4350, 3975, 4290, 4430, 4485, 4285, 3980, 3925, 3645, 3760, 3300, 3685, 3463, 5200]
+
+    def test_same_as_to_dict(self):
+        for xmr in [XmR(self.counts), XmR([Decimal('1.25'), None, 3, 2.5]), XmRTrending(XmR(self.counts))]:
+            result = json.loads(xmr.to_json(include_halfway_lines=True), parse_float=Decimal)
+            self.assertEqual(result, xmr.to_dict(include_halfway_lines=True))
+
+    def test_iter_json(self):
+        xmr = XmR(self.counts)
+        xmr.json_chunk_size = 3
+        chunks = list(xmr.iter_json(moving_average_points=2))
+        self.assertGreater(len(chunks), 20)
+        self.assertEqual(''.join(chunks), xmr.to_json(moving_average_points=2))
+        self.assertEqual(json.loads(''.join(chunks), parse_float=Decimal), xmr.to_dict(moving_average_points=2))
+
+    def test_collapse_constant_lines(self):
+        xmr = XmR(self.counts)
+        result = json.loads(xmr.to_json(collapse_constant_lines=True), parse_float=Decimal)
+        self.assertEqual(result['x_cl'], xmr.x_central_line()[0])
+        self.assertEqual(result['mr_url'], xmr.upper_range_limit()[0])
+        self.assertEqual(len(result['x_values']), len(self.counts))
+
+        trending = XmRTrending(xmr)
+        result = json.loads(trending.to_json(collapse_constant_lines=True), parse_float=Decimal)
+        self.assertEqual(result['x_cl'], trending.x_central_line())
+
+    def test_not_finite(self):
+        xmr = XmR([1, 2, 3])
+        with mock.patch.object(XmR, 'upper_range_limit', return_value=[Decimal('NaN'), Decimal('Infinity'), 1]):
+            result = json.loads(xmr.to_json())
+        self.assertEqual(result['mr_url'], [None, None, 1])
+
+    def test_use_float(self):
+        xmr = XmR(self.counts + [None])
+        expected = {k: [None if v is None else float(v) for v in values] for k, values in xmr.to_dict().items()}
+        self.assertEqual(json.loads(xmr.to_json(use_float=True)), expected)
+        with mock.patch.object(base, 'orjson', None):
+            self.assertEqual(json.loads(xmr.to_json(use_float=True)), expected)
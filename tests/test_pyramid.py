@@ -0,0 +1,66 @@
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR, XmRTrending
+from statprocon.charts.xmr.pyramid import Pyramid
+
+
+class PyramidTestCase(unittest.TestCase):
+    def setUp(self):
+        # Peak flow rates from pg 130 of Making Sense of Data with a single extreme value
+        base = [120, 140, 100, 150, 260, 150, 100, 120, 300, 300, 275, 300, 140, 170, 150, 150, 190, 180]
+        self.counts = base * 50
+        self.counts[700] = 1750
+        self.xmr = XmR(self.counts)
+        self.pyramid = Pyramid(self.xmr)
+
+    def test_levels(self):
+        sizes = [len(level['rules']) for level in self.pyramid.levels]
+        self.assertEqual(sizes, [900, 225, 57, 15, 4, 1])
+
+        top = self.pyramid.levels[-1]
+        self.assertEqual(top['x_sum'], [sum(self.counts)])
+        self.assertEqual(top['x_max'], [1750])
+        self.assertEqual(top['mr_min'], [0])
+
+    def test_full_detail_window(self):
+        w = self.pyramid.window(10, 20)
+
+        self.assertEqual(w['index'], list(range(10, 20)))
+        self.assertEqual(w['x_min'], self.xmr.counts[10:20])
+        self.assertEqual(w['x_max'], self.xmr.counts[10:20])
+        self.assertEqual(w['mr_max'], self.xmr.moving_ranges()[10:20])
+        self.assertEqual(w['unpl'], self.xmr.upper_natural_process_limit()[10:20])
+        self.assertEqual(w['rule_2'], self.xmr.rule_2_runs_about_central_line()[10:20])
+
+    def test_window_is_bounded_and_keeps_signals(self):
+        w = self.pyramid.window(max_points=20)
+
+        self.assertLessEqual(len(w['index']), 20)
+        self.assertEqual(w['index'][0], 0)
+        self.assertEqual(max(w['x_max']), 1750)
+
+        rule_1 = self.xmr.rule_1_x_indices_beyond_limits()
+        signals = [i for i, b in enumerate(w['rule_1']) if b]
+        size = w['index'][1]
+        self.assertEqual(signals, sorted({i // size for i, b in enumerate(rule_1) if b}))
+
+    def test_window_means(self):
+        w = self.pyramid.window(0, 16, max_points=4)
+
+        self.assertEqual(w['index'], [0, 4, 8, 12])
+        self.assertEqual(w['x_mean'][0], Decimal('127.500'))
+        self.assertEqual(w['mr_mean'][0], Decimal('36.667'))
+        self.assertEqual(w['cl'], self.xmr.x_central_line()[:4])
+
+    def test_trending(self):
+        counts = [
+            539, 558, 591, 556, 540, 590, 606, 643, 657, 602,
+            596, 640, 691, 723, 701, 802, 749, 762, 807, 781,
+        ]
+        trending = XmRTrending(XmR(counts))
+        w = Pyramid(trending, factor=2).window(max_points=5)
+
+        self.assertEqual(w['index'], [0, 4, 8, 12, 16])
+        self.assertLess(w['cl'][0], w['cl'][1])
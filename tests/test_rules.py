@@ -0,0 +1,146 @@
+import random
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR, XmRTrending
+from statprocon.charts.xmr.rules import (
+    NELSON,
+    WESTERN_ELECTRIC,
+    WHEELER,
+    Alternating,
+    Outside,
+    RuleSet,
+    Trend,
+    Within,
+    Zone,
+)
+
+
+def flagged(flags):
+    return [i for i, f in enumerate(flags) if f]
+
+
+class RulesTestCase(unittest.TestCase):
+    def setUp(self):
+        r = random.Random(0)
+        self.counts = [round(r.gauss(50, 10), 3) + (15 if 200 < i < 230 else 0) for i in range(500)]
+
+    def test_wheeler_same_as_xmr(self):
+        for counts in [self.counts, self.counts[:100] + [None] + self.counts[100:]]:
+            xmr = XmR(counts)
+            result = xmr.evaluate_rules()
+            self.assertEqual(result['rule_1'], xmr.rule_1_x_indices_beyond_limits())
+            self.assertEqual(result['rule_2'], xmr.rule_2_runs_about_central_line())
+            self.assertEqual(result['rule_3'], xmr.rule_3_runs_near_limits())
+
+    def test_wheeler_same_as_xmr_for_random_series(self):
+        r = random.Random(1)
+        for _ in range(300):
+            counts = [round(r.gauss(50, 10), 1) for _ in range(30)]
+            xmr = XmR(counts)
+            result = xmr.evaluate_rules()
+            self.assertEqual(result['rule_1'], xmr.rule_1_x_indices_beyond_limits())
+            self.assertEqual(result['rule_3'], xmr.rule_3_runs_near_limits())
+
+    def test_wheeler_rule_3_is_net_of_other_side(self):
+        # 3 points above the upper halfway line and 1 below the lower halfway line
+        counts = [0, 0, 2, 2, -2, 2, 0, 0]
+        cl, unpl, lnpl = [Decimal(0)] * 8, [Decimal(3)] * 8, [Decimal(-3)] * 8
+        self.assertEqual(flagged(WHEELER.evaluate(counts, cl, unpl, lnpl)['rule_3']), [])
+
+        rule_set = RuleSet({'zone': Zone(3, 4, Decimal('1.5'))})
+        self.assertEqual(flagged(rule_set.evaluate(counts, cl, unpl, lnpl)['zone']), [2, 3, 4, 5])
+
+    def test_wheeler_rule_2_points_on_central_line(self):
+        # The point on the central line is skipped by rule_2_runs_about_central_line() but breaks
+        # the run for WHEELER
+        counts = [1] * 4 + [0] + [1] * 4
+        cl, unpl, lnpl = [Decimal(0)] * 9, [Decimal(3)] * 9, [Decimal(-3)] * 9
+        self.assertEqual(flagged(WHEELER.evaluate(counts, cl, unpl, lnpl)['rule_2']), [])
+
+        xmr = XmR(counts + [-1] * 8)
+        self.assertEqual(xmr.x_central_line()[0], 0)
+        self.assertTrue(xmr.rule_2_runs_about_central_line()[8])
+        self.assertEqual(flagged(xmr.evaluate_rules()['rule_2']), list(range(9, 17)))
+
+    def test_trending(self):
+        trending = XmRTrending(XmR([x + i / 10 for i, x in enumerate(self.counts[:100])]))
+        result = trending.evaluate_rules(WHEELER)
+        self.assertEqual(result['rule_1'], trending.rule_1_x_indices_beyond_limits())
+        self.assertEqual(result['rule_3'], trending.rule_3_runs_near_limits())
+
+    def test_lines(self):
+        # sigma is 1
+        cl = [Decimal(0)] * 20
+        unpl = [Decimal(3)] * 20
+        lnpl = [Decimal(-3)] * 20
+
+        counts = [0, 2.5, 0, 2.5, 0, 0, 1.5, 1.5, 1.5, -0.5, 1.5] + [0] * 9
+        result = WESTERN_ELECTRIC.evaluate(counts, cl, unpl, lnpl)
+        self.assertEqual(flagged(result['we_1']), [])
+        self.assertEqual(flagged(result['we_2']), [1, 2, 3])
+        self.assertEqual(flagged(result['we_3']), [6, 7, 8, 9, 10])
+        self.assertEqual(flagged(result['we_4']), [])
+
+    def test_nelson(self):
+        n = 30
+        cl = [Decimal(0)] * n
+        unpl = [Decimal(3)] * n
+        lnpl = [Decimal(-3)] * n
+
+        trend = [-2, -1.5, -1, -0.5, 0.5, 1, 0.2] + [0] * 23
+        self.assertEqual(flagged(NELSON.evaluate(trend, cl, unpl, lnpl)['nelson_3']), [0, 1, 2, 3, 4, 5])
+
+        alternating = [0.1, -0.1] * 7 + [0.1, 0.1] + [0] * 14
+        self.assertEqual(flagged(NELSON.evaluate(alternating, cl, unpl, lnpl)['nelson_4']), list(range(15)))
+
+        within = [0.5] * 16 + [2] + [0.5] * 13
+        self.assertEqual(flagged(NELSON.evaluate(within, cl, unpl, lnpl)['nelson_7']), list(range(16)))
+
+        outside = [1.5, -1.5] * 4 + [0] * 22
+        self.assertEqual(flagged(NELSON.evaluate(outside, cl, unpl, lnpl)['nelson_8']), list(range(8)))
+
+    def test_missing_values_break_rules(self):
+        cl = [Decimal(0)] * 9
+        unpl = [Decimal(3)] * 9
+        lnpl = [Decimal(-3)] * 9
+        rule_set = RuleSet({'run': Zone(4, 4, 0), 'trend': Trend(4)})
+        result = rule_set.evaluate([1, 2, None, 3, 4, 5, 6, 7, 8], cl, unpl, lnpl)
+        self.assertEqual(flagged(result['run']), [3, 4, 5, 6, 7, 8])
+        self.assertEqual(flagged(result['trend']), [3, 4, 5, 6, 7, 8])
+
+    def test_streaming(self):
+        xmr = XmR(self.counts)
+        rule_set = NELSON | WHEELER
+        batch = xmr.evaluate_rules(rule_set)
+        points = zip(xmr.counts, xmr.x_central_line(), xmr.upper_natural_process_limit(), xmr.lower_natural_process_limit())
+        fired = rule_set.evaluator().extend(points)
+        for name, rule in rule_set.rules.items():
+            for i, names in enumerate(fired):
+                if name in names:
+                    # All the successive points ending at i are flagged
+                    self.assertTrue(all(batch[name][i - rule.length + 1:i + 1]))
+
+    def test_advance_with_precomputed_boundaries(self):
+        xmr = XmR(self.counts)
+        rule_set = NELSON | WHEELER
+        upper, lower = rule_set.zone_boundaries(
+            xmr.x_central_line()[0],
+            xmr.upper_natural_process_limit()[0],
+            xmr.lower_natural_process_limit()[0],
+        )
+        upper, lower = list(map(float, upper)), list(map(float, lower))
+
+        evaluator = rule_set.evaluator()
+        names = [[evaluator.names[r] for r in evaluator.advance(float(x), upper, lower)] for x in xmr.counts]
+        points = zip(xmr.counts, xmr.x_central_line(), xmr.upper_natural_process_limit(), xmr.lower_natural_process_limit())
+        self.assertEqual(names, rule_set.evaluator().extend(points))
+
+    def test_custom_rule(self):
+        rule_set = RuleSet({'custom': Outside(2, 2), 'calm': Within(3, Decimal('0.5')), 'alt': Alternating(3)})
+        self.assertEqual(rule_set.boundaries, [Decimal('0.5'), Decimal(2)])
+        evaluator = rule_set.evaluator()
+        self.assertEqual(evaluator.update(2.5, 0, 3, -3), [])
+        self.assertEqual(evaluator.update(-2.5, 0, 3, -3), ['custom'])
+        self.assertEqual(evaluator.update(0, 0, 3, -3), ['alt'])
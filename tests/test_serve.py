@@ -0,0 +1,148 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+import urllib.request
+
+from decimal import Decimal
+
+from statprocon import XmR, XmRTrending, serve
+from statprocon.charts.xmr.exceptions import InvalidCountsError
+
+
+class ServeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def counting_compute_batch(payloads):
+            self.calls.extend(payloads)
+            return original(payloads)
+
+        original = serve.compute_batch
+        serve.compute_batch = counting_compute_batch
+        self.addCleanup(setattr, serve, 'compute_batch', original)
+
+        self.service = serve.ChartService(cache_size=2)
+        self.addCleanup(self.service.close)
+
+    def test_compute(self):
+        counts = [3, 4, 5]
+        result = json.loads(self.service.compute({'counts': counts}), parse_float=Decimal)
+        self.assertEqual(result, XmR(counts).to_dict())
+
+    def test_invalid_requests(self):
+        with self.assertRaises(ValueError):
+            self.service.submit({'values': [1, 2]})
+
+        with self.assertRaises(ValueError):
+            self.service.submit({'counts': [1, 2], 'colour': 'red'})
+
+        with self.assertRaises(InvalidCountsError):
+            self.service.compute({'counts': [1]})
+
+        invalid_options = [
+            ({'x_central_line_uses': 'foo'}, '"x_central_line_uses" must be one of: average, median'),
+            ({'moving_range_uses': None}, '"moving_range_uses" must be one of: average, median'),
+            ({'subset_start_index': '1'}, '"subset_start_index" must be an integer'),
+            ({'subset_end_index': True}, '"subset_end_index" must be an integer or null'),
+            ({'moving_average_points': 0}, '"moving_average_points" must be a positive integer or null'),
+            ({'include_halfway_lines': 1}, '"include_halfway_lines" must be true or false'),
+            ({'limit_floor': 'low'}, '"limit_floor" must be a number'),
+        ]
+        for options, message in invalid_options:
+            with self.assertRaisesRegex(ValueError, message):
+                self.service.submit({'counts': [1, 2], **options})
+
+        valid = {'counts': [1, 2], 'subset_end_index': None, 'limit_floor': '0', 'include_halfway_lines': True}
+        self.assertEqual(serve.validate(valid), valid)
+
+    def test_identical_requests_are_computed_once(self):
+        payload = {'counts': [1, 2, 3, 4], 'moving_range_uses': 'median'}
+        results = self.service.compute_many([payload, dict(payload), payload])
+        self.service.compute(dict(payload))
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len(set(results)), 1)
+
+    def test_batch_shares_counts_and_charts(self):
+        charts = []
+
+        class CountingXmR(XmR):
+            def __init__(self, counts, *args, **kwargs):
+                charts.append(counts)
+                super().__init__(counts, *args, **kwargs)
+
+        original = serve.XmR
+        serve.XmR = CountingXmR
+        self.addCleanup(setattr, serve, 'XmR', original)
+
+        counts = [3, 4, 5, 10]
+        payloads = [
+            {'counts': counts},
+            {'counts': list(counts), 'chart': 'trending'},
+            {'counts': counts, 'include_halfway_lines': True},
+            {'counts': counts, 'moving_range_uses': 'median'},
+            {'counts': [1]},
+        ]
+        results = serve.compute_batch(payloads)
+
+        # One chart for each chart options, and the counts are converted once for both
+        self.assertEqual(len(charts), 3)
+        self.assertIs(charts[0], charts[1])
+        self.assertEqual(json.loads(results[1], parse_float=Decimal), XmRTrending(XmR(counts)).to_dict())
+        self.assertEqual(
+            json.loads(results[3], parse_float=Decimal),
+            XmR(counts, moving_range_uses='median').to_dict(),
+        )
+        self.assertIsInstance(results[4], InvalidCountsError)
+
+    def test_lru_eviction(self):
+        for counts in ([1, 2], [3, 4], [1, 2], [5, 6], [1, 2], [3, 4]):
+            self.service.compute({'counts': counts})
+
+        self.assertEqual([p['counts'] for p in self.calls], [[1, 2], [3, 4], [5, 6], [3, 4]])
+
+    def test_request_key(self):
+        a = serve.request_key({'counts': [1, 2], 'limit_floor': 0, 'chart': 'xmr'})
+        b = serve.request_key({'chart': 'xmr', 'limit_floor': 0, 'counts': [1, 2]})
+        c = serve.request_key({'counts': [1, 2], 'limit_floor': 1, 'chart': 'xmr'})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_http(self):
+        server = serve.make_server(self.service, port=0)
+        self._serve(server)
+
+        url = f'http://127.0.0.1:{server.server_address[1]}/xmr'
+        body = json.dumps([{'counts': [3, 4, 5]}, {'counts': [3, 4, 5], 'chart': 'trending'}]).encode()
+        with urllib.request.urlopen(url, data=body) as response:
+            result = json.loads(response.read(), parse_float=Decimal)
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]['x_cl'], XmR([3, 4, 5]).x_central_line())
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets are not supported')
+    def test_unix_socket(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, 'statprocon.sock')
+        server = serve.make_server(self.service, socket_path=path)
+        self._serve(server)
+
+        body = json.dumps({'counts': [3, 4, 5]}).encode()
+        with socket.socket(socket.AF_UNIX) as s:
+            s.connect(path)
+            s.sendall(b'POST /xmr HTTP/1.0\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+            response = b''
+            while chunk := s.recv(4096):
+                response += chunk
+
+        self.assertTrue(response.startswith(b'HTTP/1.0 200'))
+
+    def _serve(self, server):
+        t = threading.Thread(target=server.serve_forever, daemon=True)
+        t.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
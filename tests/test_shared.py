@@ -0,0 +1,77 @@
+import random
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from statprocon import XmR, XmRTrending
+from statprocon.charts.xmr.shared import RULES, SharedChart
+from statprocon.snapshot import PackedDecimals
+
+
+def attached_to_dict(name):
+    with SharedChart.attach(name) as chart:
+        return chart.to_dict(), chart.rule_2_runs_about_central_line()
+
+
+class SharedChartTestCase(unittest.TestCase):
+    def setUp(self):
+        r = random.Random(0)
+        self.counts = [round(r.uniform(0, 100), 2) for _ in range(500)] + [None, 300, 1, 1]
+
+    def test_same_as_published(self):
+        xmr = XmR(self.counts, moving_range_uses='median', limit_floor=0)
+        with SharedChart.publish(xmr) as published:
+            chart = SharedChart.attach(published.name)
+            self.assertEqual(chart.to_dict(include_halfway_lines=True), xmr.to_dict(include_halfway_lines=True))
+            self.assertEqual(chart.to_csv(), xmr.to_csv())
+            for rule in RULES:
+                self.assertEqual(getattr(chart, rule)(), getattr(xmr, rule)())
+            self.assertEqual(
+                chart.rule_1_x_indices_beyond_limits(upper_limit=50),
+                xmr.rule_1_x_indices_beyond_limits(upper_limit=50),
+            )
+            chart.close()
+
+    def test_packed_columns_and_constant_lines(self):
+        xmr = XmR(self.counts)
+        with SharedChart.publish(xmr) as published:
+            self.assertIsInstance(published.counts, PackedDecimals)
+            self.assertIsInstance(published.moving_ranges(), PackedDecimals)
+            self.assertEqual(published.counts, xmr.counts)
+            self.assertEqual(published.counts[-4:], [None, Decimal('300'), Decimal('1'), Decimal('1')])
+            self.assertNotIn('x_central_line', published._offsets)
+
+            line = published.upper_natural_process_limit()
+            self.assertEqual(line, xmr.upper_natural_process_limit())
+            self.assertEqual(len({id(v) for v in line}), 1)
+            self.assertIsInstance(published.to_dict()['x_values'], list)
+
+    def test_trending(self):
+        trending = XmRTrending(XmR(self.counts[:40]))
+        with SharedChart.publish(trending) as published:
+            self.assertEqual(published.to_dict(), trending.to_dict())
+
+    def test_rule_mask(self):
+        xmr = XmR(self.counts)
+        with SharedChart.publish(xmr) as published:
+            mask = published.rule_mask('rule_1_x_indices_beyond_limits')
+            self.assertTrue(mask.readonly)
+            self.assertEqual(list(mask), [int(x) for x in xmr.rule_1_x_indices_beyond_limits()])
+            mask.release()
+
+    def test_other_process(self):
+        xmr = XmR(self.counts)
+        with SharedChart.publish(xmr) as published:
+            with ProcessPoolExecutor(1) as executor:
+                d, rule_2 = executor.submit(attached_to_dict, published.name).result()
+            self.assertEqual(d, xmr.to_dict())
+            self.assertEqual(rule_2, xmr.rule_2_runs_about_central_line())
+
+    def test_closed(self):
+        published = SharedChart.publish(XmR(self.counts))
+        published.unlink()
+        with self.assertRaises(ValueError):
+            published.to_dict()
+        with self.assertRaises(FileNotFoundError):
+            SharedChart.attach(published.name)
@@ -0,0 +1,39 @@
+import unittest
+
+from statprocon.charts.xmr.rules import WHEELER, RuleSet, Zone
+from statprocon.simulate import simulate
+
+RULE_1 = RuleSet({'rule_1': Zone(1, 1, 3)})
+
+
+class SimulateTestCase(unittest.TestCase):
+    def test_rule_1_shifted_arl(self):
+        # The ARL of points outside 3 sigma limits with a shift of 1 sigma is 43.9
+        result = simulate(RULE_1, shift=1, runs=2000, seed=1)
+        self.assertEqual(result.runs, 2000)
+        self.assertEqual(result.censored, 0)
+        self.assertTrue(40 < result.arl < 48, result.arl)
+        self.assertEqual(sum(result.distribution().values()), 2000)
+
+    def test_in_control(self):
+        # The in-control ARL of Rule 1 is 370 and about 256 for runs of 8
+        result = simulate(WHEELER, runs=300, seed=1)
+        self.assertTrue(300 < result.rule_arl('rule_1') < 450, result.rule_arl('rule_1'))
+        self.assertTrue(200 < result.rule_arl('rule_2') < 320, result.rule_arl('rule_2'))
+        self.assertLess(result.arl, min(result.rule_arl(k) for k in WHEELER.rules))
+        self.assertAlmostEqual(result.false_alarm_rate, 1 / result.arl)
+
+    def test_seed(self):
+        a = simulate(WHEELER, shift=2, runs=50, seed=3, batch_size=7)
+        b = simulate(WHEELER, shift=2, runs=50, seed=3, batch_size=7, workers=2)
+        self.assertEqual(a.run_lengths, b.run_lengths)
+        self.assertEqual(a.rule_run_lengths, b.rule_run_lengths)
+
+    def test_censored(self):
+        result = simulate(RULE_1, runs=20, max_length=5, seed=1)
+        self.assertGreater(result.censored, 0)
+        self.assertLessEqual(result.quantile(1), 5)
+
+    def test_baseline(self):
+        result = simulate(WHEELER, shift=3, runs=50, baseline=20, seed=1)
+        self.assertLess(result.arl, 5)
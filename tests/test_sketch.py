@@ -0,0 +1,70 @@
+import bisect
+import random
+import statistics
+import unittest
+
+from decimal import Decimal
+
+from statprocon.charts.xmr.exceptions import InvalidCountsError
+from statprocon.charts.xmr.sketch import KLLSketch
+
+
+def rank_error(sorted_values, value):
+    return abs(bisect.bisect_left(sorted_values, value) - len(sorted_values) / 2) / len(sorted_values)
+
+
+class KLLSketchTestCase(unittest.TestCase):
+    def setUp(self):
+        r = random.Random(0)
+        self.values = [Decimal(str(round(r.lognormvariate(3, 1), 3))) for _ in range(50000)]
+
+    def test_exact_until_compaction(self):
+        sketch = KLLSketch(seed=1)
+        for x in self.values[:100]:
+            sketch.update(x)
+        self.assertTrue(sketch.is_exact)
+        self.assertEqual(sketch.median(), statistics.median(self.values[:100]))
+
+    def test_approximate_median(self):
+        sketch = KLLSketch(seed=1)
+        for x in self.values:
+            sketch.update(x)
+        self.assertFalse(sketch.is_exact)
+        self.assertEqual(len(sketch), len(self.values))
+        self.assertLess(rank_error(sorted(self.values), sketch.median()), 0.02)
+
+    def test_bounded_memory(self):
+        sketch = KLLSketch(k=100, seed=1)
+        for x in self.values:
+            sketch.update(x)
+        self.assertLess(sum(map(len, sketch._compactors)), 400)
+
+    def test_merge(self):
+        shards = [KLLSketch(seed=i) for i in range(4)]
+        for i, x in enumerate(self.values):
+            shards[i % 4].update(x)
+        merged = shards[0]
+        for s in shards[1:]:
+            merged.merge(s)
+        self.assertEqual(len(merged), len(self.values))
+        self.assertLess(rank_error(sorted(self.values), merged.median()), 0.02)
+
+    def test_seed(self):
+        a = KLLSketch(seed=5)
+        b = KLLSketch(seed=5)
+        for x in self.values:
+            a.update(x)
+            b.update(x)
+        self.assertEqual(a.median(), b.median())
+
+    def test_quantile(self):
+        sketch = KLLSketch(seed=1)
+        for x in range(1, 101):
+            sketch.update(Decimal(x))
+        self.assertEqual(sketch.quantile(0), Decimal(1))
+        self.assertEqual(sketch.quantile(1), Decimal(100))
+        self.assertEqual(sketch.quantile(0.9), Decimal(91))
+
+    def test_empty(self):
+        with self.assertRaises(InvalidCountsError):
+            KLLSketch().median()
@@ -0,0 +1,79 @@
+import pickle
+import random
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR, XmRTrending, snapshot
+from statprocon.charts.xmr.streaming import Streaming
+from statprocon.charts.xmr.window import Window
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        r = random.Random(0)
+        self.counts = [round(r.uniform(0, 100), 2) for _ in range(2000)]
+
+    def _assert_same_counts(self, actual, expected):
+        self.assertEqual(actual, expected)
+        self.assertEqual([str(x) for x in actual], [str(x) for x in expected])
+
+    def test_xmr(self):
+        counts = self.counts[:100] + [None, 5, 7.5, -3]
+        xmr = XmR(counts, moving_range_uses='median', subset_start_index=3, subset_end_index=50, limit_floor=0)
+        restored = snapshot.loads(snapshot.dumps(xmr))
+        self.assertIs(type(restored), XmR)
+        self._assert_same_counts(restored.counts, xmr.counts)
+        self.assertEqual(restored.to_dict(), xmr.to_dict())
+        self.assertEqual(restored.to_csv(), xmr.to_csv())
+
+    def test_smaller_than_pickle(self):
+        xmr = XmR(self.counts)
+        self.assertLess(len(snapshot.dumps(xmr)), len(pickle.dumps(xmr)) / 2)
+
+    def test_trending(self):
+        trending = XmRTrending(XmR(self.counts[:40]))
+        restored = snapshot.loads(snapshot.dumps(trending))
+        self.assertIs(type(restored), XmRTrending)
+        self.assertEqual(restored.to_dict(), trending.to_dict())
+
+    def test_trending_pickle(self):
+        trending = XmRTrending(XmR(self.counts[:40]))
+        self.assertEqual(pickle.loads(pickle.dumps(trending)).to_dict(), trending.to_dict())
+
+    def test_columns(self):
+        columns = [
+            [],
+            [None],
+            [Decimal('1.5'), Decimal('2.25'), None, Decimal('5E+3'), Decimal('-0.001')],
+            [Decimal('1'), Decimal('-0'), Decimal('Infinity')],
+            [Decimal('12345678901234567890.5'), Decimal(3)],
+        ]
+        for values in columns:
+            encoded = snapshot.encode_decimals(values)
+            decoded, offset = snapshot.decode_decimals(memoryview(encoded), 0)
+            self.assertEqual(offset, len(encoded))
+            self._assert_same_counts(decoded, values)
+
+    def test_window_resumes(self):
+        for kwargs in [{}, {'x_central_line_uses': 'median'}]:
+            window = Window(50, self.counts[:120], **kwargs)
+            restored = snapshot.loads(snapshot.dumps(window))
+            window.extend(self.counts[120:200])
+            restored.extend(self.counts[120:200])
+            self.assertEqual(restored.to_dict(), window.to_dict())
+
+    def test_streaming_resumes(self):
+        stream = Streaming(x_central_line_uses='median', seed=1)
+        stream.extend(self.counts[:1000])
+        restored = snapshot.loads(snapshot.dumps(stream))
+        stream.extend(self.counts[1000:])
+        restored.extend(self.counts[1000:])
+        self.assertEqual(restored.to_dict(), stream.to_dict())
+        self.assertEqual(restored.n, stream.n)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            snapshot.loads(b'not a snapshot')
+        with self.assertRaises(TypeError):
+            snapshot.dumps([1, 2, 3])
@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR
+from statprocon.charts.xmr.exceptions import InvalidCountsError
+from statprocon.charts.xmr.streaming import Streaming
+
+
+def limits(xmr):
+    d = xmr.to_dict()
+    return {k: v[0] for k, v in d.items() if k in ['x_unpl', 'x_cl', 'x_lnpl', 'mr_url', 'mr_cl']}
+
+
+class StreamingTestCase(unittest.TestCase):
+    def setUp(self):
+        r = random.Random(0)
+        self.counts = [round(r.uniform(0, 100), 2) for _ in range(20000)]
+
+    def test_average_same_as_xmr(self):
+        counts = self.counts[:1000] + [None] + self.counts[1000:2000]
+        stream = Streaming()
+        stream.extend(counts)
+        self.assertEqual(stream.to_dict(), limits(XmR(counts)))
+
+    def test_median_exact_for_short_streams(self):
+        counts = [2.5, 2.3, 16.3, 6.3, 7.6, 16.3, 7.1, 7.8, 7.8, 9.9, 10.5, -4.8]
+        for kwargs in [{'x_central_line_uses': 'median'}, {'moving_range_uses': 'median'}]:
+            stream = Streaming(**kwargs)
+            stream.extend(counts)
+            self.assertEqual(stream.to_dict(), limits(XmR(counts, **kwargs)))
+
+    def test_median_approximation(self):
+        stream = Streaming(x_central_line_uses='median', seed=1)
+        stream.extend(self.counts)
+        expected = limits(XmR(self.counts, x_central_line_uses='median'))
+        actual = stream.to_dict()
+        # The counts are uniform between 0 and 100, so a rank error of 2% is at most 2 units
+        self.assertLess(abs(actual['x_cl'] - expected['x_cl']), 2)
+        self.assertLess(abs(actual['mr_cl'] - expected['mr_cl']), 2)
+
+    def test_merge(self):
+        shards = [Streaming(moving_range_uses='median', seed=i) for i in range(2)]
+        shards[0].extend(self.counts[:10000])
+        shards[1].extend(self.counts[10000:])
+        shards[0].merge(shards[1])
+
+        stream = Streaming(moving_range_uses='median', seed=1)
+        stream.extend(self.counts)
+        self.assertEqual(shards[0].n, stream.n)
+        self.assertEqual(shards[0].x_central_line(), stream.x_central_line())
+        self.assertLess(abs(shards[0].mr_central_line() - stream.mr_central_line()), 2)
+
+    def test_limit_floor(self):
+        stream = Streaming(limit_floor=0)
+        stream.extend([1, 10, 1, 10])
+        self.assertNotIn('x_lnpl', stream.to_dict())
+        self.assertEqual(stream.lower_natural_process_limit(), Decimal('-18.440'))
+
+    def test_not_enough_counts(self):
+        stream = Streaming()
+        stream.update(5)
+        with self.assertRaises(InvalidCountsError):
+            stream.to_dict()
@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR
+from statprocon.charts.xmr.exceptions import InvalidCountsError
+from statprocon.charts.xmr.sweep import RULES, sweep
+
+
+class SweepTestCase(unittest.TestCase):
+    def setUp(self):
+        r = random.Random(0)
+        self.counts = [round(r.gauss(50, 10), 2) + (20 if i > 150 else 0) for i in range(200)]
+        self.counts[40] = None
+
+    def test_same_as_xmr(self):
+        results = sweep(
+            self.counts,
+            limit_floors=[Decimal('-Infinity'), 20],
+            subsets=[(0, None), (10, 60), (100, 250)],
+        )
+        # 3 distinct combinations of central lines, 2 floors and 3 subsets
+        self.assertEqual(len(results), 18)
+
+        for row in results:
+            xmr = XmR(
+                self.counts,
+                x_central_line_uses=row['x_central_line_uses'],
+                moving_range_uses=row['moving_range_uses'],
+                subset_start_index=row['subset_start_index'],
+                subset_end_index=row['subset_end_index'],
+                limit_floor=row['limit_floor'],
+            )
+            self.assertEqual(row['x_cl'], xmr.x_central_line()[0])
+            self.assertEqual(row['mr_cl'], xmr.mr_central_line()[0])
+            self.assertEqual(row['unpl'], xmr.upper_natural_process_limit()[0])
+            self.assertEqual(row['url'], xmr.upper_range_limit()[0])
+            expected_lnpl = xmr.lower_natural_process_limit()[0] if xmr.is_lnpl_above_floor() else None
+            self.assertEqual(row['lnpl'], expected_lnpl)
+            for k, method in RULES.items():
+                self.assertEqual(row[k], sum(getattr(xmr, method)()), k)
+
+    def test_median_combinations(self):
+        results = sweep(self.counts, x_central_line_uses=['median'], moving_range_uses=['average', 'median'])
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['moving_range_uses'], 'median')
+
+    def test_empty_subset(self):
+        with self.assertRaises(InvalidCountsError):
+            sweep(self.counts, subsets=[(40, 41)])
+
+    def test_no_moving_range(self):
+        with self.assertRaises(InvalidCountsError):
+            sweep([3, None, 4, None, 5])
+        with self.assertRaises(InvalidCountsError):
+            sweep([1, 2, None, None, 5, 6], subsets=[(1, 5)])
@@ -0,0 +1,151 @@
+import random
+import threading
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR, snapshot
+from statprocon.charts.xmr.cache import ChartCache
+from statprocon.charts.xmr.ewma import ExponentialMovingAverage
+from statprocon.charts.xmr.streaming import Streaming
+from statprocon.charts.xmr.window import Window
+
+
+def run_threads(*targets):
+    threads = [threading.Thread(target=t) for t in targets]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+class ThreadsTestCase(unittest.TestCase):
+    def test_shared_xmr(self):
+        r = random.Random(0)
+        xmr = XmR([round(r.uniform(0, 100), 2) for _ in range(500)])
+        expected = xmr.to_dict()
+        results = []
+
+        def read():
+            for _ in range(5):
+                results.append(xmr.to_dict())
+
+        run_threads(*[read] * 4)
+        self.assertEqual(len(results), 20)
+        for result in results:
+            self.assertEqual(result, expected)
+
+    def test_window_snapshots_while_appending(self):
+        r = random.Random(1)
+        counts = [round(r.uniform(0, 100), 2) for _ in range(2000)]
+        window = Window(50, counts[:2])
+        errors = []
+
+        def append(values):
+            def target():
+                for c in values:
+                    window.append(c)
+            return target
+
+        def read():
+            for _ in range(200):
+                snapshot = window.snapshot()
+                try:
+                    self.assertEqual(snapshot.to_dict(), XmR(snapshot.counts).to_dict())
+                except AssertionError as e:
+                    errors.append(e)
+
+        run_threads(append(counts[2:1000]), append(counts[1000:]), read, read)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(window), 50)
+        self.assertEqual(window.to_dict(), XmR(window.counts).to_dict())
+
+    def test_window_snapshot_is_cached_until_append(self):
+        window = Window(5, [1, 2, 3])
+        snapshot = window.snapshot()
+        self.assertIs(window.snapshot(), snapshot)
+
+        window.append(4)
+        self.assertIsNot(window.snapshot(), snapshot)
+        self.assertEqual(snapshot.counts, [Decimal('1'), Decimal('2'), Decimal('3')])
+        self.assertEqual(window.snapshot().x_central_line(), [Decimal('2.500')] * 4)
+
+    def test_dumps_while_appending(self):
+        r = random.Random(4)
+        counts = [round(r.uniform(0, 100), 2) for _ in range(3000)]
+        window = Window(50, counts[:2])
+        stream = Streaming(x_central_line_uses='median', k=20, seed=1)
+        errors = []
+
+        def append():
+            for c in counts:
+                window.append(c)
+                stream.update(c)
+
+        def dump():
+            for _ in range(100):
+                restored = snapshot.loads(snapshot.dumps(window))
+                try:
+                    self.assertEqual(restored.to_dict(), XmR(restored.counts).to_dict())
+                except AssertionError as e:
+                    errors.append(e)
+                snapshot.loads(snapshot.dumps(stream))
+
+        run_threads(append, dump)
+        self.assertEqual(errors, [])
+
+    def test_streaming(self):
+        r = random.Random(2)
+        counts = [round(r.uniform(0, 100), 2) for _ in range(4000)]
+        for kwargs in [{}, {'x_central_line_uses': 'median'}]:
+            stream = Streaming(**kwargs, seed=1)
+            readings = []
+
+            def update(values):
+                def target():
+                    for c in values:
+                        stream.update(c)
+                return target
+
+            def read():
+                while stream.n < 10:
+                    pass
+                for _ in range(50):
+                    readings.append(stream.to_dict())
+
+            run_threads(*[update(counts[i::4]) for i in range(4)], read)
+            self.assertEqual(stream.n, len(counts))
+            self.assertEqual(len(readings), 50)
+            if not kwargs:
+                self.assertEqual(stream.x_central_line(), XmR(counts).x_central_line()[0])
+
+    def test_streaming_merge_both_ways(self):
+        a = Streaming()
+        b = Streaming()
+        a.extend([1, 2, 3])
+        b.extend([4, 5])
+
+        # The locks of both streams are never held together, so this doesn't deadlock
+        run_threads(lambda: a.merge(b), lambda: b.merge(a))
+        self.assertIn((a.n, b.n), [(5, 5), (5, 7), (8, 5)])
+
+    def test_exponential_moving_average(self):
+        ema = ExponentialMovingAverage((0.5,), rounding=None)
+        run_threads(*[lambda: ema.extend([Decimal('0')] * 1000)] * 4)
+        self.assertEqual(ema.values, [Decimal('0')])
+
+    def test_cache(self):
+        r = random.Random(3)
+        series = [[round(r.uniform(0, 100), 2) for _ in range(200)] for _ in range(4)]
+        cache = ChartCache(maxsize=8)
+        results = []
+
+        def request():
+            for counts in series * 3:
+                results.append((counts, cache.to_dict(counts)))
+
+        run_threads(*[request] * 4)
+        self.assertEqual(cache.hits + cache.misses, 48)
+        self.assertEqual(len(cache), 4)
+        for counts, result in results:
+            self.assertEqual(result, XmR(counts).to_dict())
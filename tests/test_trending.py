@@ -4,6 +4,7 @@ from decimal import Decimal
 
 from statprocon import XmR, XmRTrending
 from statprocon.charts.xmr.constants import INVALID
+from statprocon.charts.xmr.exceptions import InvalidCountsError
 
 
 class TrendingTestCase(unittest.TestCase):
@@ -133,6 +134,27 @@ class TrendingTestCase(unittest.TestCase):
         for val in xmr.lower_natural_process_limit(floor=0):
             self.assertGreaterEqual(val, 0)
 
+    def test_missing_values(self):
+        counts = [
+            539, 558, 591, 556, 540, 590, 606, 643, 657, 602,
+            596, 640, 691, 723, 701, 802, 749, 762, 807, 781,
+        ]
+        with_gaps = list(counts)
+        with_gaps[3] = None
+        with_gaps[16] = None
+
+        xmr = XmRTrending(XmR(with_gaps))
+
+        expected_ha1 = Decimal(sum(counts[:10]) - counts[3]) / 9
+        expected_ha2 = Decimal(sum(counts[10:]) - counts[16]) / 9
+        self.assertEqual(xmr.slope(), (expected_ha2 - expected_ha1) / 10)
+        self.assertNotIn(INVALID, xmr.x_central_line())
+        self._assert_cl_deltas_equals_slope(xmr)
+
+        xmr = XmRTrending(XmR([None, None, 1, 2]))
+        with self.assertRaises(InvalidCountsError):
+            xmr.x_central_line()
+
     def _assert_cl_deltas_equals_slope(self, xmr):
         cl = xmr.x_central_line()
         s = xmr.slope()
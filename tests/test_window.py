@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from decimal import Decimal
+
+from statprocon import XmR
+from statprocon.charts.xmr.exceptions import InvalidCountsError
+from statprocon.charts.xmr.window import Window
+
+
+class WindowTestCase(unittest.TestCase):
+    def test_same_as_xmr_of_last_counts(self):
+        r = random.Random(1)
+        counts = [round(r.uniform(0, 100), 2) for _ in range(60)]
+        window = Window(10)
+        for i, c in enumerate(counts):
+            window.append(c)
+            last = counts[max(0, i - 9):i + 1]
+            if len(last) < 2:
+                continue
+            self.assertEqual(window.counts, [Decimal(str(c)) for c in last])
+            self.assertEqual(window.to_dict(), XmR(last).to_dict())
+
+    def test_median(self):
+        r = random.Random(2)
+        counts = [r.randint(0, 20) for _ in range(40)]
+        for kwargs in [{'x_central_line_uses': 'median'}, {'moving_range_uses': 'median'}]:
+            window = Window(7, **kwargs)
+            for i, c in enumerate(counts):
+                window.append(c)
+                if i > 0:
+                    self.assertEqual(window.to_dict(), XmR(counts[max(0, i - 6):i + 1], **kwargs).to_dict())
+
+    def test_missing_values(self):
+        counts = [10, None, 30, 20, None, None, 40, 35, 50, 45]
+        window = Window(4)
+        for i, c in enumerate(counts):
+            window.append(c)
+            last = counts[max(0, i - 3):i + 1]
+            has_moving_range = any(a is not None and b is not None for a, b in zip(last, last[1:]))
+            if has_moving_range:
+                self.assertEqual(window.to_dict(), XmR(last).to_dict())
+            else:
+                with self.assertRaises(InvalidCountsError):
+                    window.to_dict()
+
+    def test_rules(self):
+        counts = [5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 30]
+        window = Window(12, counts)
+        xmr = XmR(counts[-12:])
+        self.assertEqual(window.rule_1_x_indices_beyond_limits(), xmr.rule_1_x_indices_beyond_limits())
+        self.assertEqual(window.rule_2_runs_about_central_line(), xmr.rule_2_runs_about_central_line())
+        self.assertEqual(window.rule_3_runs_near_limits(), xmr.rule_3_runs_near_limits())
+        self.assertEqual(window.rule_1_mr_indices_beyond_limits(), xmr.rule_1_mr_indices_beyond_limits())
+
+    def test_constant_memory(self):
+        window = Window(3, range(1000))
+        self.assertEqual(len(window), 3)
+        self.assertEqual(len(window._buffer), 3)
+        self.assertEqual(window.counts, [Decimal(997), Decimal(998), Decimal(999)])
+        self.assertEqual(window.x_central_line(), [Decimal('998.000')] * 3)
+        self.assertEqual(window.mr_central_line(), [Decimal('1.000')] * 3)
+
+    def test_not_enough_counts(self):
+        window = Window(5, [None, None])
+        with self.assertRaises(InvalidCountsError):
+            window.x_central_line()
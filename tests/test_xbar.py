@@ -0,0 +1,122 @@
+import statistics
+import unittest
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from statprocon import XbarR, XbarS
+from statprocon.charts.xbar.aggregate import Subgroup, subgroups_by_size, subgroups_by_time
+from statprocon.charts.xbar.exceptions import InvalidSubgroupsError
+
+# Subgroups of size 4
+READINGS = [
+    [4, 5, 6, 5], [3, 5, 7, 5], [5, 6, 4, 5], [6, 4, 5, 7], [5, 5, 3, 6],
+    [4, 6, 5, 5], [7, 5, 5, 4], [5, 3, 6, 5], [4, 5, 5, 6], [12, 11, 13, 12],
+]
+
+
+class XbarTestCase(unittest.TestCase):
+    def test_subgroup_statistics(self):
+        values = [1000000.1, 1000000.4, 999999.8, 1000000.3]
+        s = Subgroup.from_values(values)
+        decimals = [Decimal(str(x)) for x in values]
+
+        self.assertEqual(s.n, 4)
+        self.assertEqual(s.mean, statistics.mean(decimals))
+        self.assertEqual(s.standard_deviation, statistics.stdev(decimals))
+        self.assertEqual(s.range, Decimal('0.6'))
+
+        s = Subgroup.from_values([1000000000.1, Decimal('1000000000.2'), 1000000000.3])
+        self.assertEqual(s.standard_deviation, Decimal('0.1'))
+        self.assertEqual(s.total, Decimal('3000000000.6'))
+        self.assertEqual((s.minimum, s.maximum), (Decimal('1000000000.1'), Decimal('1000000000.3')))
+
+        s = Subgroup.from_values([2, -0.5, Decimal('1E+2')])
+        self.assertEqual(s.mean, Decimal('101.5') / 3)
+        self.assertEqual(s.range, Decimal('100.5'))
+        with self.assertRaises(ValueError):
+            s.add(float('nan'))
+
+    def test_values_are_exact(self):
+        d = XbarR([[0.3, 0.4], [0.1, 0.2]]).to_dict()
+        self.assertEqual(d['x_values'], [Decimal('0.35'), Decimal('0.15')])
+        self.assertEqual(d['r_values'], [Decimal('0.1'), Decimal('0.1')])
+
+    def test_subgroups_by_size(self):
+        readings = iter([1, 2, 3, 4, 5, 6, 7])
+
+        subgroups = list(subgroups_by_size(readings, 3))
+        self.assertEqual([(s.label, s.n, s.mean) for s in subgroups], [(0, 3, 2), (3, 3, 5)])
+
+        subgroups = list(subgroups_by_size([1, 2, 3, 4, 5, 6, 7], 3, include_partial=True))
+        self.assertEqual([s.n for s in subgroups], [3, 3, 1])
+
+    def test_subgroups_by_time(self):
+        start = datetime(2024, 1, 1)
+        readings = [(start + timedelta(milliseconds=ms), ms) for ms in [0, 10, 400, 1000, 1300, 3100, 3900]]
+
+        subgroups = list(subgroups_by_time(readings, timedelta(seconds=1)))
+
+        self.assertEqual([s.label for s in subgroups], [start + timedelta(seconds=i) for i in [0, 1, 3]])
+        self.assertEqual([s.n for s in subgroups], [3, 2, 2])
+        self.assertEqual(subgroups[2].range, 800)
+
+        numeric = list(subgroups_by_time([(0.5, 1), (1.5, 2), (2.4, 3)], 2, origin=0))
+        self.assertEqual([(s.label, s.n) for s in numeric], [(0, 2), (2, 1)])
+
+    def test_xbar_r_equal_sizes(self):
+        xbar_r = XbarR(READINGS[:-1])
+
+        r_bar = Decimal(statistics.mean(max(s) - min(s) for s in READINGS[:-1]))
+        grand_average = Decimal(statistics.mean(x for s in READINGS[:-1] for x in s))
+        a2 = Decimal('0.729')
+        d4 = Decimal('2.282')
+
+        self.assertEqual(xbar_r.x_central_line()[0], round(grand_average, 3))
+        self.assertEqual(xbar_r.r_central_line()[0], round(r_bar, 3))
+        self._assert_close(xbar_r.upper_natural_process_limit()[0], grand_average + a2 * r_bar)
+        self._assert_close(xbar_r.lower_natural_process_limit()[0], grand_average - a2 * r_bar)
+        self._assert_close(xbar_r.upper_range_limit()[0], d4 * r_bar)
+        self.assertEqual(xbar_r.lower_range_limit()[0], 0)
+
+    def test_xbar_s_equal_sizes(self):
+        xbar_s = XbarS(READINGS[:-1])
+
+        s_bar = Decimal(statistics.mean(statistics.stdev(s) for s in READINGS[:-1]))
+        a3 = Decimal('1.628')
+        b4 = Decimal('2.266')
+
+        self._assert_close(xbar_s.s_central_line()[0], s_bar)
+        self._assert_close(xbar_s.upper_natural_process_limit()[0] - xbar_s.x_central_line()[0], a3 * s_bar)
+        self._assert_close(xbar_s.upper_standard_deviation_limit()[0], b4 * s_bar)
+        self.assertEqual(xbar_s.lower_standard_deviation_limit()[0], 0)
+
+    def test_rule_1(self):
+        xbar_r = XbarR(subgroups_by_size((x for s in READINGS for x in s), 4))
+        expected = [False] * 9 + [True]
+        self.assertListEqual(xbar_r.rule_1_x_indices_beyond_limits(), expected)
+        self.assertListEqual(xbar_r.rule_1_r_indices_beyond_limits(), [False] * 10)
+        self.assertListEqual(XbarS(READINGS).rule_1_x_indices_beyond_limits(), expected)
+
+    def test_unequal_sizes(self):
+        xbar_r = XbarR([[1, 2, 3, 4], [2, 4], [3, 5, 4]])
+        unpl = xbar_r.upper_natural_process_limit()
+
+        self.assertGreater(unpl[1], unpl[2])
+        self.assertGreater(unpl[2], unpl[0])
+        self.assertEqual(xbar_r.x_central_line()[0], round(Decimal(28) / 9, 3))
+        self.assertEqual(len(xbar_r.to_dict()['r_url']), 3)
+        self.assertIsInstance(xbar_r.to_csv(), str)
+
+    def test_invalid_subgroups(self):
+        with self.assertRaises(InvalidSubgroupsError):
+            XbarR([[1, 2, 3]])
+
+        with self.assertRaises(InvalidSubgroupsError):
+            XbarS([[1, 2], [3]])
+
+        with self.assertRaises(InvalidSubgroupsError):
+            XbarR([list(range(26)), list(range(26))])
+
+    def _assert_close(self, actual: Decimal, expected: Decimal):
+        self.assertLess(abs(actual - expected), Decimal('0.01'), f'{actual} != {expected}')
@@ -323,6 +323,50 @@ mr_cl    : [1.000, 1.000, 1.000]
         self.assertEqual(unpl, xmr.upper_natural_process_limit()[0])
         self.assertEqual(url, xmr.upper_range_limit()[0])
 
+    def test_missing_values(self):
+        counts = [3, None, 4, 5, None, None, 6]
+        xmr = XmR(counts)
+
+        self.assertListEqual(xmr.moving_ranges(), [None, None, None, 1, None, None, None])
+        self._assert_func_output_equals_line(xmr, 'x_central_line', Decimal('4.500'))
+        self._assert_func_output_equals_line(xmr, 'mr_central_line', Decimal('1.000'))
+        self.assertListEqual(xmr.x_moving_average(2), [None, None, None, Decimal('4.5'), None, None, None])
+        self.assertEqual(xmr.x_exponential_moving_average()[1], None)
+        self.assertEqual(xmr.to_csv().splitlines()[2], ',7.160,4.500,1.840,,3.268,1.000')
+
+    def test_missing_values_all_but_one(self):
+        with self.assertRaises(InvalidCountsError):
+            XmR([None, 1, None])
+
+    def test_missing_values_without_moving_range(self):
+        for counts in ([3, None, 4], [3, None, 4, None, 5]):
+            for uses in ('average', 'median'):
+                with self.assertRaises(InvalidCountsError):
+                    XmR(counts, moving_range_uses=uses)
+
+    def test_subset_without_moving_range(self):
+        counts = [1, 2, None, None, 5, 6]
+        with self.assertRaises(InvalidCountsError):
+            XmR(counts, subset_start_index=2, subset_end_index=4)
+        with self.assertRaises(InvalidCountsError):
+            XmR(counts, subset_start_index=1, subset_end_index=5)
+        XmR(counts, subset_start_index=3, subset_end_index=6).to_dict()
+
+    def test_rule_2_missing_value_breaks_run(self):
+        percentages = [21.3, 20.2, 20.9, 21.0, 18.8, 19.6, 18.7, 18.6, 18.1, 18.9, 19.2, 18.2, 17.3, 19.0]
+        percentages[9] = None
+
+        xmr = XmR(percentages)
+
+        self.assertListEqual(xmr.rule_2_runs_about_central_line(), [False] * len(percentages))
+
+    def test_rule_3_missing_value_breaks_run(self):
+        counts = [1, 2, 1, 2, 1, 2, 1, 10, 10, 10, 1]
+        self.assertTrue(any(XmR(counts).rule_3_runs_near_limits()))
+
+        counts = [1, 2, 1, 2, 1, 2, 1, 10, 10, None, 10, 1]
+        self.assertFalse(any(XmR(counts).rule_3_runs_near_limits()))
+
     def _assert_func_output_equals_line(self, xmr: XmR, func: str, value: TYPE_COUNT_VALUE):
         actual = getattr(xmr, func)()
         self._assert_line_equals(actual, value)